@@ -4,11 +4,11 @@ from __future__ import annotations
 
 from typing import List
 
-import duckdb
-
 from pluto_duck_backend.agent.core import AgentState, MessageRole
 from pluto_duck_backend.agent.core.prompts import try_load_prompt
+from pluto_duck_backend.app.core import warehouse
 from pluto_duck_backend.app.core.config import get_settings
+from pluto_duck_backend.app.services.ingestion.duckdb_loader import INTERNAL_TABLE_PREFIX
 
 DEFAULT_SCHEMA_PROMPT = "Summarize available tables for the user."
 
@@ -18,9 +18,9 @@ def build_schema_node():
     prompt = try_load_prompt("schema_prompt") or DEFAULT_SCHEMA_PROMPT
 
     async def schema_node(state: AgentState) -> AgentState:
-        with duckdb.connect(str(settings.duckdb.path)) as con:
+        with warehouse.connect(settings.duckdb.path) as con:
             rows = con.execute("SHOW TABLES").fetchall()
-        tables = [row[0] for row in rows]
+        tables = [row[0] for row in rows if not row[0].startswith(INTERNAL_TABLE_PREFIX)]
         state.context["schema_preview"] = tables
         summary = f"Schema preview: {', '.join(tables)}" if tables else "No tables found."
         state.add_message(MessageRole.ASSISTANT, summary)
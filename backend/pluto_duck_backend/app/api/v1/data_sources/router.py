@@ -1,13 +1,34 @@
 """Data sources management endpoints."""
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
+import duckdb
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
-from pluto_duck_backend.app.services.data_sources import DataSourceRepository, get_data_source_repository
-from pluto_duck_backend.app.services.ingestion import IngestionJob, IngestionService, get_registry
+from pluto_duck_backend.app.core import table_versions, warehouse
 from pluto_duck_backend.app.core.config import get_settings
+from pluto_duck_backend.app.services.data_sources import (
+    DataSourceRepository,
+    get_data_source_repository,
+)
+from pluto_duck_backend.app.services.data_sources.repository import DataSource
+from pluto_duck_backend.app.services.ingestion import (
+    IngestionJob,
+    IngestionJobManager,
+    IngestionJobRecord,
+    IngestionJobStatus,
+    get_ingestion_job_manager,
+    get_registry,
+)
+from pluto_duck_backend.app.services.ingestion.duckdb_loader import DuckDBLoader, _quote_identifier
+from pluto_duck_backend.app.services.ingestion.preview import (
+    DEFAULT_PREVIEW_ROWS,
+    MAX_PREVIEW_ROWS,
+    PreviewCache,
+    get_preview_cache,
+    preview_source,
+)
 
 router = APIRouter(prefix="/data-sources", tags=["data-sources"])
 
@@ -17,10 +38,58 @@ class CreateDataSourceRequest(BaseModel):
 
     name: str = Field(..., description="Display name for the data source")
     description: Optional[str] = Field(None, description="Optional description")
-    connector_type: str = Field(..., description="Connector type: csv, parquet, postgres, sqlite")
+    connector_type: str = Field(
+        ..., description="Connector type: csv, json, parquet, postgres, sqlite"
+    )
     source_config: Dict[str, Any] = Field(..., description="Connector-specific configuration")
     target_table: str = Field(..., description="Target DuckDB table name")
     overwrite: bool = Field(False, description="Overwrite existing table")
+    sync_mode: Literal["full", "append", "upsert"] = Field(
+        "full",
+        description="full re-imports on sync; append/upsert merge rows past the watermark",
+    )
+    watermark_column: Optional[str] = Field(
+        None,
+        description="Monotonic column (e.g. updated_at or id) tracking incremental progress",
+    )
+    primary_key: Optional[List[str]] = Field(None, description="Key columns for upsert merges")
+    engine: Literal["auto", "scanner", "python"] = Field(
+        "auto",
+        description="auto uses DuckDB's scanner extensions when installed, else Python extraction",
+    )
+    schema_policy: Literal["evolve", "quarantine", "reject"] = Field(
+        "evolve",
+        description="evolve adds columns and widens types; quarantine also diverts rows "
+        "that no longer fit; reject fails on any schema change",
+    )
+
+
+class PreviewDataSourceRequest(BaseModel):
+    """Request to sample a source before importing it."""
+
+    connector_type: str = Field(
+        ..., description="Connector type: csv, json, parquet, postgres, sqlite"
+    )
+    source_config: Dict[str, Any] = Field(..., description="Connector-specific configuration")
+    limit: int = Field(
+        DEFAULT_PREVIEW_ROWS, ge=1, le=MAX_PREVIEW_ROWS, description="Maximum rows to read"
+    )
+    refresh: bool = Field(False, description="Bypass the short-lived preview cache")
+
+
+class PreviewColumn(BaseModel):
+    name: str
+    type: str
+
+
+class PreviewDataSourceResponse(BaseModel):
+    """Column types and sample rows read from a source without importing it."""
+
+    connector_type: str
+    columns: List[PreviewColumn]
+    rows: List[Dict[str, Any]]
+    elapsed_ms: float
+    cached: bool
 
 
 class DataSourceResponse(BaseModel):
@@ -38,6 +107,8 @@ class DataSourceResponse(BaseModel):
     error_message: Optional[str]
     created_at: str
     updated_at: str
+    # Per-stage timings of the last completed import (see IngestionService.run).
+    last_import_stages: Optional[Dict[str, Any]] = None
 
 
 class CreateDataSourceResponse(BaseModel):
@@ -47,14 +118,21 @@ class CreateDataSourceResponse(BaseModel):
     status: str
     rows_imported: Optional[int]
     message: str
+    job_id: Optional[str] = None
 
 
 class SyncResponse(BaseModel):
-    """Response after syncing a data source."""
+    """Response after syncing a data source.
+
+    Syncs run in the background; poll ``/api/v1/ingest/jobs/{job_id}`` for the
+    outcome, whose ``result`` reports ``rows_inserted``, ``rows_updated`` and
+    ``watermark`` for incremental syncs.
+    """
 
     status: str
     rows_imported: Optional[int]
     message: str
+    job_id: Optional[str] = None
 
 
 def get_repository() -> DataSourceRepository:
@@ -62,10 +140,61 @@ def get_repository() -> DataSourceRepository:
     return get_data_source_repository()
 
 
-def get_ingestion_service() -> IngestionService:
-    """Dependency to get ingestion service."""
-    registry = get_registry()
-    return IngestionService(registry)
+def _submit_import(
+    repo: DataSourceRepository,
+    manager: IngestionJobManager,
+    source_id: str,
+    job: IngestionJob,
+    *,
+    previous: Optional[DataSource] = None,
+) -> IngestionJobRecord:
+    """Queue an import for a data source and keep its status in step with the job."""
+
+    previous_metadata = (previous.metadata if previous else None) or {}
+    previous_rows = previous.rows_count if previous else None
+    had_data = previous is not None and previous.status == "active"
+
+    def on_finished(record: IngestionJobRecord) -> None:
+        if record.status == IngestionJobStatus.SUCCESS:
+            result = record.result or {}
+            rows_count = result.get("rows_ingested")
+            if result.get("skipped"):
+                # Source unchanged since the last import; the table was left as is.
+                rows_count = previous_rows
+            elif result.get("retried_files"):
+                rows_count = (previous_rows or 0) + (rows_count or 0)
+            elif job.sync_mode != "full" and previous is not None:
+                rows_count = (previous_rows or 0) + (result.get("rows_inserted") or 0)
+            repo.update_import_status(
+                source_id,
+                status="active",
+                rows_count=rows_count,
+                metadata={**previous_metadata, **(result.get("metadata") or {})},
+            )
+        elif record.status == IngestionJobStatus.CANCELLED and had_data:
+            # The load rolled back, so the previously imported table is still intact.
+            repo.update_import_status(source_id, status="active", rows_count=previous_rows)
+        else:
+            repo.update_import_status(
+                source_id,
+                status="error",
+                rows_count=previous_rows,
+                error_message=record.error or "Import cancelled",
+            )
+
+    # Mark the source before queueing: a fast job's on_finished must not be
+    # overwritten by a late "syncing".
+    repo.update_import_status(source_id, status="syncing", rows_count=previous_rows)
+    try:
+        return manager.submit(job, source_id=source_id, on_finished=on_finished)
+    except Exception as exc:
+        repo.update_import_status(
+            source_id,
+            status="active" if had_data else "error",
+            rows_count=previous_rows,
+            error_message=None if had_data else f"Could not queue import: {exc}",
+        )
+        raise
 
 
 @router.get("", response_model=List[DataSourceResponse])
@@ -85,23 +214,65 @@ def list_data_sources(
             target_table=source.target_table,
             rows_count=source.rows_count,
             status=source.status,
-            last_imported_at=source.last_imported_at.isoformat() if source.last_imported_at else None,
+            last_imported_at=(
+                source.last_imported_at.isoformat() if source.last_imported_at else None
+            ),
             error_message=source.error_message,
             created_at=source.created_at.isoformat(),
             updated_at=source.updated_at.isoformat(),
+            last_import_stages=(source.metadata or {}).get("stages"),
         )
         for source in sources
     ]
 
 
+@router.post("/preview", response_model=PreviewDataSourceResponse)
+def preview_data_source(
+    request: PreviewDataSourceRequest,
+    cache: PreviewCache = Depends(get_preview_cache),
+) -> PreviewDataSourceResponse:
+    """Read a few rows of a source and report the column types it would import as."""
+    registry = get_registry()
+    if request.connector_type not in registry.list_connectors():
+        raise HTTPException(status_code=400, detail=f"Unknown connector '{request.connector_type}'")
+    try:
+        result = preview_source(
+            registry,
+            request.connector_type,
+            request.source_config,
+            request.limit,
+            cache=cache,
+            refresh=request.refresh,
+        )
+    except KeyError as exc:
+        raise HTTPException(status_code=400, detail=f"Missing source_config key {exc}") from exc
+    except (ValueError, OSError, RuntimeError, duckdb.Error) as exc:
+        raise HTTPException(status_code=400, detail=f"Could not preview source: {exc}") from exc
+
+    return PreviewDataSourceResponse(
+        connector_type=result.connector,
+        columns=[PreviewColumn(**column) for column in result.columns],
+        rows=result.rows,
+        elapsed_ms=result.elapsed_ms,
+        cached=result.cached,
+    )
+
+
 @router.post("", response_model=CreateDataSourceResponse)
 def create_data_source(
     request: CreateDataSourceRequest,
     repo: DataSourceRepository = Depends(get_repository),
-    ingestion_service: IngestionService = Depends(get_ingestion_service),
+    manager: IngestionJobManager = Depends(get_ingestion_job_manager),
 ) -> CreateDataSourceResponse:
-    """Create a new data source and import data."""
+    """Create a new data source and queue its initial import."""
     settings = get_settings()
+    sync_settings = {
+        "mode": request.sync_mode,
+        "watermark_column": request.watermark_column,
+        "primary_key": request.primary_key,
+        "engine": request.engine,
+        "schema_policy": request.schema_policy,
+    }
     
     # Create data source record
     source_id = repo.create(
@@ -110,55 +281,47 @@ def create_data_source(
         source_config=request.source_config,
         target_table=request.target_table,
         description=request.description,
+        metadata={"sync": sync_settings},
     )
     
-    # Run ingestion
-    try:
-        job = IngestionJob(
-            connector=request.connector_type,
-            target_table=request.target_table,
-            warehouse_path=settings.duckdb.path,
-            overwrite=request.overwrite,
-            config=request.source_config,
-        )
-        
-        result = ingestion_service.run(job)
-        rows_imported = result.get("rows_ingested")
-        
-        # Update status to active
-        repo.update_import_status(
-            source_id,
-            status="active",
-            rows_count=rows_imported,
-        )
-        
-        return CreateDataSourceResponse(
-            id=source_id,
-            status="active",
-            rows_imported=rows_imported,
-            message=f"Successfully imported {rows_imported} rows",
-        )
-    except Exception as exc:
-        # Update status to error
-        repo.update_import_status(
-            source_id,
-            status="error",
-            error_message=str(exc),
-        )
-        
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to import data: {str(exc)}",
-        ) from exc
+    # Queue ingestion; the job drives the status from here on
+    job = IngestionJob(
+        connector=request.connector_type,
+        target_table=request.target_table,
+        warehouse_path=settings.duckdb.path,
+        overwrite=request.overwrite,
+        config=request.source_config,
+        sync_mode=request.sync_mode,
+        watermark_column=request.watermark_column,
+        primary_key=request.primary_key,
+        engine=request.engine,
+        schema_policy=request.schema_policy,
+        rollback_window_seconds=settings.ingestion.rollback_window_seconds,
+    )
+    record = _submit_import(repo, manager, source_id, job, previous=repo.get(source_id))
+
+    return CreateDataSourceResponse(
+        id=source_id,
+        status="syncing",
+        rows_imported=None,
+        message="Import queued",
+        job_id=record.job_id,
+    )
 
 
 @router.post("/{source_id}/sync", response_model=SyncResponse)
 def sync_data_source(
     source_id: str,
+    force: bool = False,
+    retry_failed: bool = False,
     repo: DataSourceRepository = Depends(get_repository),
-    ingestion_service: IngestionService = Depends(get_ingestion_service),
+    manager: IngestionJobManager = Depends(get_ingestion_job_manager),
 ) -> SyncResponse:
-    """Re-import data from an existing data source."""
+    """Queue a re-import of an existing data source.
+
+    File sources whose fingerprint is unchanged are skipped unless ``force`` is set;
+    ``retry_failed`` appends only the files that failed on the previous run.
+    """
     settings = get_settings()
     
     # Get existing source
@@ -166,45 +329,64 @@ def sync_data_source(
     if not source:
         raise HTTPException(status_code=404, detail="Data source not found")
     
-    # Run ingestion
-    try:
-        repo.update_import_status(source_id, status="syncing")
-        
-        job = IngestionJob(
-            connector=source.connector_type,
-            target_table=source.target_table,
-            warehouse_path=settings.duckdb.path,
-            overwrite=True,  # Always overwrite on sync
-            config=source.source_config,
-        )
-        
-        result = ingestion_service.run(job)
-        rows_imported = result.get("rows_ingested")
-        
-        # Update status to active
-        repo.update_import_status(
-            source_id,
-            status="active",
-            rows_count=rows_imported,
-        )
-        
-        return SyncResponse(
-            status="active",
-            rows_imported=rows_imported,
-            message=f"Successfully synced {rows_imported} rows",
-        )
-    except Exception as exc:
-        # Update status to error
-        repo.update_import_status(
-            source_id,
-            status="error",
-            error_message=str(exc),
-        )
-        
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to sync data: {str(exc)}",
-        ) from exc
+    sync_settings = (source.metadata or {}).get("sync") or {}
+    sync_mode = sync_settings.get("mode", "full")
+    
+    if source.status == "syncing":
+        raise HTTPException(status_code=409, detail="Data source is already syncing")
+
+    job = IngestionJob(
+        connector=source.connector_type,
+        target_table=source.target_table,
+        warehouse_path=settings.duckdb.path,
+        overwrite=sync_mode == "full",  # Full syncs re-import the whole table
+        config=source.source_config,
+        state=source.metadata,
+        sync_mode=sync_mode,
+        watermark_column=sync_settings.get("watermark_column"),
+        primary_key=sync_settings.get("primary_key"),
+        engine=sync_settings.get("engine", "auto"),
+        schema_policy=sync_settings.get("schema_policy", "evolve"),
+        rollback_window_seconds=settings.ingestion.rollback_window_seconds,
+        force=force,
+        retry_failed_files=retry_failed,
+    )
+    record = _submit_import(repo, manager, source_id, job, previous=source)
+
+    return SyncResponse(
+        status="syncing",
+        rows_imported=None,
+        message="Sync queued",
+        job_id=record.job_id,
+    )
+
+
+@router.post("/{source_id}/rollback", response_model=SyncResponse)
+def rollback_data_source(
+    source_id: str,
+    repo: DataSourceRepository = Depends(get_repository),
+) -> SyncResponse:
+    """Restore the table version replaced by the last overwrite sync."""
+    source = repo.get(source_id)
+    if not source:
+        raise HTTPException(status_code=404, detail="Data source not found")
+    if source.status == "syncing":
+        raise HTTPException(status_code=409, detail="Data source is syncing")
+
+    loader = DuckDBLoader(get_settings().duckdb.path)
+    if not loader.rollback_table(source.target_table):
+        raise HTTPException(status_code=404, detail="No previous version is retained")
+    with warehouse.connect(loader.database_path) as con:
+        rows_count = con.execute(
+            f"SELECT COUNT(*) FROM {_quote_identifier(source.target_table)}"
+        ).fetchone()[0]
+    repo.update_import_status(source_id, status="active", rows_count=rows_count)
+
+    return SyncResponse(
+        status="active",
+        rows_imported=rows_count,
+        message=f"Rolled back to the previous version ({rows_count} rows)",
+    )
 
 
 @router.delete("/{source_id}")
@@ -222,9 +404,10 @@ def delete_data_source(
     if drop_table:
         settings = get_settings()
         try:
-            with duckdb.connect(str(settings.duckdb.path)) as con:
+            with warehouse.connect(settings.duckdb.path) as con:
                 con.execute(f"DROP TABLE IF EXISTS {source.target_table}")
-        except Exception as exc:
+                table_versions.bump(con, [source.target_table])
+        except Exception:
             # Log but don't fail the deletion
             pass
     
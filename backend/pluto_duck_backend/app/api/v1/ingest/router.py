@@ -2,12 +2,24 @@
 
 from __future__ import annotations
 
+import json
+import time
+from dataclasses import asdict
 from pathlib import Path
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from pluto_duck_backend.app.core.config import get_settings
-from pluto_duck_backend.app.services.ingestion import IngestionJob, IngestionService, get_registry
+from pluto_duck_backend.app.services.ingestion import (
+    ConnectorUnavailable,
+    IngestionJob,
+    IngestionJobManager,
+    IngestionService,
+    get_ingestion_job_manager,
+    get_registry,
+)
 
 router = APIRouter()
 
@@ -17,28 +29,117 @@ def get_ingestion_service() -> IngestionService:
     return IngestionService(registry)
 
 
-@router.post("", response_model=dict)
-def run_ingestion(payload: dict, service: IngestionService = Depends(get_ingestion_service)) -> dict:
+def _job_from_payload(payload: dict) -> IngestionJob:
     connector = payload.get("connector")
     target_table = payload.get("target_table")
-    config = payload.get("config", {})
-    overwrite = payload.get("overwrite", False)
     if not connector or not target_table:
         raise HTTPException(status_code=400, detail="connector and target_table are required")
     settings = get_settings()
-    job = IngestionJob(
+    return IngestionJob(
         connector=connector,
         target_table=target_table,
         warehouse_path=settings.duckdb.path,
-        overwrite=overwrite,
-        config=config,
+        overwrite=payload.get("overwrite", False),
+        config=payload.get("config", {}),
+        engine=payload.get("engine", "auto"),
+        rollback_window_seconds=settings.ingestion.rollback_window_seconds,
+        force=bool(payload.get("force", False)),
+        retry_failed_files=bool(payload.get("retry_failed_files", False)),
+        schema_policy=payload.get("schema_policy", "evolve"),
     )
-    result = service.run(job)
+
+
+@router.get("/connectors", response_model=list)
+def list_connectors() -> list:
+    """Registered connectors, including plugins, and whether each can be imported here."""
+
+    return [asdict(info) for info in get_registry().describe()]
+
+
+@router.post("", response_model=dict)
+def run_ingestion(payload: dict, service: IngestionService = Depends(get_ingestion_service)) -> dict:
+    """Run an ingestion synchronously; prefer ``POST /jobs`` for large sources."""
+
+    job = _job_from_payload(payload)
+    connector, target_table = job.connector, job.target_table
+    try:
+        result = service.run(job)
+    except (ValueError, ConnectorUnavailable) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     response = {
         "connector": connector,
         "target_table": target_table,
         "rows_ingested": result.get("rows_ingested"),
         "metadata": result.get("metadata"),
+        "stages": result.get("stages"),
     }
     return response
 
+
+
+@router.post("/jobs", response_model=dict, status_code=202)
+def submit_ingestion_job(
+    payload: dict,
+    manager: IngestionJobManager = Depends(get_ingestion_job_manager),
+) -> dict:
+    record = manager.submit(_job_from_payload(payload))
+    return record.to_dict()
+
+
+@router.get("/jobs", response_model=list)
+def list_ingestion_jobs(
+    source_id: Optional[str] = None,
+    limit: int = 50,
+    manager: IngestionJobManager = Depends(get_ingestion_job_manager),
+) -> list:
+    return [record.to_dict() for record in manager.list_jobs(source_id=source_id, limit=limit)]
+
+
+@router.get("/jobs/{job_id}", response_model=dict)
+def get_ingestion_job(
+    job_id: str,
+    manager: IngestionJobManager = Depends(get_ingestion_job_manager),
+) -> dict:
+    record = manager.fetch(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return record.to_dict()
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=dict)
+def cancel_ingestion_job(
+    job_id: str,
+    manager: IngestionJobManager = Depends(get_ingestion_job_manager),
+) -> dict:
+    record = manager.cancel(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return record.to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+def stream_ingestion_job_events(
+    job_id: str,
+    poll_interval: float = Query(default=0.5, ge=0.1, le=30),
+    manager: IngestionJobManager = Depends(get_ingestion_job_manager),
+) -> StreamingResponse:
+    if manager.fetch(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    def event_stream():
+        last = None
+        while True:
+            record = manager.fetch(job_id)
+            if record is None:
+                return
+            payload = record.to_dict()
+            snapshot = (payload["status"], payload["rows"], payload["batches"])
+            if record.status.finished:
+                yield "data: " + json.dumps({"event": "completed", **payload}, default=str) + "\n\n"
+                return
+            if snapshot != last:
+                yield "data: " + json.dumps({"event": "progress", **payload}, default=str) + "\n\n"
+                last = snapshot
+            time.sleep(poll_interval)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
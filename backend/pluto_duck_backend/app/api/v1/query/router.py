@@ -2,14 +2,30 @@
 
 from __future__ import annotations
 
+import io
 import json
+from dataclasses import asdict
+from typing import Dict, Iterable, Iterator, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+import duckdb
+import pyarrow as pa
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 
 from pluto_duck_backend.app.core.config import get_settings
-from pluto_duck_backend.app.services.execution import QueryExecutionService
+from pluto_duck_backend.app.services.execution import (
+    QueryExecutionService,
+    QueryJob,
+    QueryJobStatus,
+    QueryMode,
+    ResultRetention,
+    ResultSlice,
+    get_result_cache,
+    get_result_retention,
+)
 from pluto_duck_backend.app.services.execution.manager import (
     QueryExecutionManager,
     get_execution_manager,
@@ -17,22 +33,46 @@ from pluto_duck_backend.app.services.execution.manager import (
 
 router = APIRouter()
 
+RESULT_MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+
 
 def get_execution_service() -> QueryExecutionService:
     settings = get_settings()
-    return QueryExecutionService(settings.duckdb.path)
+    return QueryExecutionService(settings.duckdb.path, cache=get_result_cache())
 
 
 @router.post("", response_model=dict)
 def submit_query(
     payload: dict,
+    accept: Optional[str] = Header(default=None),
     manager: QueryExecutionManager = Depends(get_execution_manager),
     service: QueryExecutionService = Depends(get_execution_service),
-) -> dict:
+):
+    """Run SQL.
+
+    ``mode="materialize"`` (the default) writes the result to a table and returns
+    its name. ``mode="stream"`` runs the query inline and streams NDJSON or Arrow
+    IPC; the result is only kept as a table with ``persist`` or once it exceeds
+    ``spill_rows`` rows. The run id is returned in the ``X-Run-Id`` header.
+    Materialized queries reuse a cached result table unless ``bypass_cache`` is set.
+    """
     sql = payload.get("sql")
     if not sql:
         raise HTTPException(status_code=400, detail="sql field is required")
-    run_id = manager.submit_sql(sql)
+    mode_name = payload.get("mode", QueryMode.MATERIALIZE.value)
+    try:
+        mode = QueryMode(mode_name)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Unknown mode '{mode_name}'") from exc
+    if mode == QueryMode.STREAM:
+        return _stream_query(sql, payload, accept, service)
+    run_id = manager.submit_sql(sql, use_cache=not payload.get("bypass_cache", False))
     job = manager.wait_for(run_id)
     if not job:
         raise HTTPException(status_code=500, detail="job missing")
@@ -43,19 +83,208 @@ def submit_query(
     }
 
 
-@router.get("/{run_id}", response_model=dict)
-def get_query(run_id: str, service: QueryExecutionService = Depends(get_execution_service)) -> dict:
-    job = service.fetch(run_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
+@router.get("/cache", response_model=dict)
+def get_cache_stats(service: QueryExecutionService = Depends(get_execution_service)) -> dict:
+    """Hit rate and size of the query result cache."""
+    return service.cache_stats()
+
+
+@router.post("/gc", response_model=dict)
+def sweep_results(retention: ResultRetention = Depends(get_result_retention)) -> dict:
+    """Drop result tables past the retention policy now instead of at the next sweep."""
+    return asdict(retention.sweep())
+
+
+def _job_payload(job: QueryJob) -> dict:
     return {
         "run_id": job.run_id,
         "status": job.status,
         "result_table": job.result_table,
         "error": job.error,
+        "pinned": job.pinned,
+        "expired_at": job.expired_at.isoformat() if job.expired_at else None,
     }
 
 
+@router.get("/{run_id}", response_model=dict)
+def get_query(run_id: str, service: QueryExecutionService = Depends(get_execution_service)) -> dict:
+    job = service.fetch(run_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_payload(job)
+
+
+@router.put("/{run_id}/pin", response_model=dict)
+def pin_query(run_id: str, service: QueryExecutionService = Depends(get_execution_service)) -> dict:
+    """Keep the query's result table until it is unpinned."""
+    return _set_pinned(service, run_id, True)
+
+
+@router.delete("/{run_id}/pin", response_model=dict)
+def unpin_query(
+    run_id: str, service: QueryExecutionService = Depends(get_execution_service)
+) -> dict:
+    return _set_pinned(service, run_id, False)
+
+
+def _set_pinned(service: QueryExecutionService, run_id: str, pinned: bool) -> dict:
+    job = service.fetch(run_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if pinned and job.expired_at is not None:
+        raise HTTPException(status_code=410, detail="Query result has expired")
+    job = service.pin(run_id, pinned)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_payload(job)
+
+
+def _negotiate_format(format: Optional[str], accept: Optional[str]) -> str:
+    if format:
+        if format not in RESULT_MEDIA_TYPES:
+            raise HTTPException(
+                status_code=406,
+                detail=f"Unsupported format '{format}'; use one of {', '.join(RESULT_MEDIA_TYPES)}",
+            )
+        return format
+    for media_range in (accept or "").split(","):
+        media_type = media_range.split(";")[0].strip()
+        for name, candidate in RESULT_MEDIA_TYPES.items():
+            if media_type == candidate:
+                return name
+    return "json"
+
+
+def _slice_headers(result: ResultSlice) -> Dict[str, str]:
+    headers = {"X-Row-Count": str(result.rows)}
+    if result.next_cursor:
+        headers["X-Next-Cursor"] = result.next_cursor
+    return headers
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+def _ndjson_chunks(batches: Iterable[pa.RecordBatch]) -> Iterator[str]:
+    for batch in batches:
+        yield "".join(json.dumps(jsonable_encoder(row)) + "\n" for row in batch.to_pylist())
+
+
+def _arrow_chunks(schema: pa.Schema, batches: Iterable[pa.RecordBatch]) -> Iterator[bytes]:
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield _drain(sink)
+    yield _drain(sink)
+
+
+def _stream_query(
+    sql: str,
+    payload: dict,
+    accept: Optional[str],
+    service: QueryExecutionService,
+) -> StreamingResponse:
+    output = _negotiate_format(payload.get("format"), accept)
+    if output == "json":
+        output = "ndjson"
+    spill_rows = payload.get("spill_rows")
+    if spill_rows is not None and (not isinstance(spill_rows, int) or spill_rows < 0):
+        raise HTTPException(status_code=400, detail="spill_rows must be a non-negative integer")
+    run_id = str(payload.get("run_id") or uuid4())
+    service.submit(run_id, sql)
+    try:
+        stream = service.stream(
+            run_id, persist=bool(payload.get("persist", False)), spill_rows=spill_rows
+        )
+    except duckdb.Error as exc:
+        # Failures before the query ran are not recorded by the stream itself.
+        service.fail(run_id, exc)
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    def body():
+        with stream:
+            if output == "arrow":
+                yield from _arrow_chunks(stream.schema, stream)
+            else:
+                yield from _ndjson_chunks(stream)
+
+    chunks = body()
+
+    def finish() -> None:
+        # The stream holds a warehouse cursor. Return it even when the client
+        # disconnects before the body is read; Starlette runs this afterwards.
+        chunks.close()
+        stream.close()
+
+    return StreamingResponse(
+        chunks,
+        media_type=RESULT_MEDIA_TYPES[output],
+        headers={"X-Run-Id": run_id},
+        background=BackgroundTask(finish),
+    )
+
+
+@router.get("/{run_id}/rows")
+def get_query_rows(
+    run_id: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1),
+    columns: Optional[str] = Query(default=None, description="Comma-separated projection"),
+    format: Optional[str] = Query(default=None, description="json, ndjson or arrow"),
+    accept: Optional[str] = Header(default=None),
+    service: QueryExecutionService = Depends(get_execution_service),
+) -> Response:
+    """Page through a query's result table.
+
+    JSON returns one page (``limit`` defaults to 1000) with ``next_cursor``; NDJSON
+    and Arrow IPC stream every row after ``cursor`` unless ``limit`` is given, and
+    report the next cursor in the ``X-Next-Cursor`` header.
+    """
+
+    output = _negotiate_format(format, accept)
+    job = service.fetch(run_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != QueryJobStatus.SUCCESS:
+        raise HTTPException(status_code=409, detail=f"Query is {job.status.value}")
+    if job.expired_at is not None:
+        raise HTTPException(status_code=410, detail="Query result has expired")
+    if output == "json":
+        limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    projection = [name.strip() for name in columns.split(",") if name.strip()] if columns else None
+    try:
+        result = service.result_slice(job, cursor=cursor, limit=limit, columns=projection)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    headers = _slice_headers(result)
+    if output == "json":
+        with service.open_result(result) as reader:
+            rows = reader.read_all().to_pylist()
+        payload = {
+            "run_id": run_id,
+            "columns": [{"name": name, "type": type_} for name, type_ in result.columns],
+            "rows": rows,
+            "row_count": result.rows,
+            "next_cursor": result.next_cursor,
+        }
+        return JSONResponse(jsonable_encoder(payload), headers=headers)
+
+    def body():
+        with service.open_result(result) as reader:
+            if output == "arrow":
+                yield from _arrow_chunks(reader.schema, reader)
+            else:
+                yield from _ndjson_chunks(reader)
+
+    return StreamingResponse(body(), media_type=RESULT_MEDIA_TYPES[output], headers=headers)
+
+
 @router.get("/{run_id}/events")
 def stream_query_events(
     run_id: str,
@@ -5,8 +5,7 @@ import shutil
 import sys
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field, HttpUrl
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -49,6 +48,59 @@ class DuckDBSettings(BaseModel):
 
     path: Path = Field(default_factory=lambda: DEFAULT_DATA_ROOT / "data" / "warehouse.duckdb")
     threads: int = Field(default=4, ge=1, description="Number of DuckDB threads to use")
+    memory_limit: Optional[str] = Field(
+        default=None,
+        description="DuckDB memory_limit, e.g. '4GB'; DuckDB's default (80% of RAM) when unset",
+    )
+
+
+class IngestionSettings(BaseModel):
+    """Settings for background ingestion jobs."""
+
+    worker_count: int = Field(default=2, ge=1, description="Concurrent ingestion jobs")
+    rollback_window_seconds: float = Field(
+        default=3600,
+        ge=0,
+        description="How long a table replaced by an overwrite sync is kept for rollback",
+    )
+    preview_cache_seconds: float = Field(
+        default=30,
+        ge=0,
+        description="How long a data source preview is reused before the source is read again",
+    )
+
+
+class QuerySettings(BaseModel):
+    """Settings for SQL query execution and its materialized results."""
+
+    result_cache_enabled: bool = Field(
+        default=True, description="Reuse results of identical queries over unchanged tables"
+    )
+    result_cache_max_bytes: int = Field(
+        default=1024**3,
+        ge=0,
+        description="Estimated size of cached result tables kept before LRU eviction",
+    )
+    result_retention_seconds: Optional[float] = Field(
+        default=7 * 24 * 3600,
+        ge=0,
+        description="Drop unpinned result tables not used for this long; unset keeps them",
+    )
+    result_max_tables: Optional[int] = Field(
+        default=1000,
+        ge=0,
+        description="Unpinned result tables kept; the least recently used are dropped first",
+    )
+    result_max_bytes: Optional[int] = Field(
+        default=5 * 1024**3,
+        ge=0,
+        description="Estimated total size of unpinned result tables kept",
+    )
+    result_gc_interval_seconds: float = Field(
+        default=600,
+        ge=0,
+        description="Seconds between background sweeps of result tables; 0 disables them",
+    )
 
 
 class DbtSettings(BaseModel):
@@ -103,6 +155,8 @@ class PlutoDuckSettings(BaseSettings):
     data_dir: DataDirectory = Field(default_factory=DataDirectory)
     duckdb: DuckDBSettings = Field(default_factory=DuckDBSettings)
     dbt: DbtSettings = Field(default_factory=DbtSettings)
+    ingestion: IngestionSettings = Field(default_factory=IngestionSettings)
+    query: QuerySettings = Field(default_factory=QuerySettings)
     agent: AgentSettings = Field(default_factory=AgentSettings)
     log_level: str = Field(default="INFO", description="Log verbosity")
     enable_telemetry: bool = Field(default=False, description="Send anonymous usage metrics")
@@ -0,0 +1,61 @@
+"""Version stamps of warehouse tables, used to tell when cached results went stale.
+
+Writers bump the version of every table they change: ingestion bumps its target
+table, while dbt runs and arbitrary DML (whose targets are not known up front)
+bump the :data:`ANY_TABLE` epoch that every cached result also depends on.
+Tables that were never bumped are at version 0.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable
+
+import duckdb
+
+# Pseudo-table bumped when any table may have changed.
+ANY_TABLE = "*"
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def ensure_table(con: duckdb.DuckDBPyConnection) -> None:
+    con.execute(_DDL)
+
+
+def bump(con: duckdb.DuckDBPyConnection, tables: Iterable[str]) -> None:
+    """Increment the version of each of ``tables`` (names are case-insensitive)."""
+
+    names = sorted({table.lower() for table in tables})
+    if not names:
+        return
+    ensure_table(con)
+    con.executemany(
+        """
+        INSERT INTO table_versions (table_name, version, updated_at)
+        VALUES (?, 1, CURRENT_TIMESTAMP)
+        ON CONFLICT (table_name) DO UPDATE
+        SET version = table_versions.version + 1, updated_at = excluded.updated_at
+        """,
+        [[name] for name in names],
+    )
+
+
+def current(con: duckdb.DuckDBPyConnection, tables: Iterable[str]) -> Dict[str, int]:
+    """Current version of each of ``tables``, plus :data:`ANY_TABLE`."""
+
+    names = sorted({table.lower() for table in tables} | {ANY_TABLE})
+    ensure_table(con)
+    rows = con.execute(
+        "SELECT table_name, version FROM table_versions WHERE table_name IN "
+        f"({', '.join('?' for _ in names)})",
+        names,
+    ).fetchall()
+    versions = {name: 0 for name in names}
+    versions.update({name: int(version) for name, version in rows})
+    return versions
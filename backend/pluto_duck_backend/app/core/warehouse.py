@@ -0,0 +1,298 @@
+"""Process-wide DuckDB connections shared by every repository and service.
+
+Opening a DuckDB file is not free: the catalog is read, the WAL replayed and a
+checkpoint may run when the last connection closes. Instead of connecting per
+call, the :class:`WarehouseManager` keeps one root connection per database file
+open for the life of the process and hands out a ``cursor()`` of it for each
+unit of work. Cursors are cheap, independent connections to the same database
+instance, so every thread gets its own transaction state.
+
+Usage::
+
+    with warehouse.connect(settings.duckdb.path) as con:
+        con.execute("SELECT 1")
+
+Because the root connection holds the file lock, other processes (the dbt CLI)
+cannot open the database while it is held; wrap such work in
+:meth:`WarehouseManager.release`. A release waits for every checked-out cursor,
+including ones held by long streaming responses, and gives up with
+:class:`WarehouseBusyError` after ``timeout`` seconds.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import ContextManager, Dict, Iterator, Optional, Union
+
+import duckdb
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0
+SLOW_CHECKOUT_SECONDS = 0.5
+DEFAULT_RELEASE_TIMEOUT = 60.0
+
+
+class WarehouseBusyError(TimeoutError):
+    """Raised when a release gives up waiting for checked-out cursors."""
+
+
+@dataclass
+class CheckoutStats:
+    checkouts: int = 0
+    active: int = 0
+    reconnects: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        stats = asdict(self)
+        stats["total_wait_seconds"] = round(self.total_wait_seconds, 6)
+        stats["max_wait_seconds"] = round(self.max_wait_seconds, 6)
+        stats["mean_wait_seconds"] = (
+            round(self.total_wait_seconds / self.checkouts, 6) if self.checkouts else 0.0
+        )
+        return stats
+
+
+class _Database:
+    """The root connection of one database file and the cursors checked out of it."""
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        threads: Optional[int],
+        memory_limit: Optional[str],
+        health_check_interval: float,
+    ) -> None:
+        self.path = path
+        self.threads = threads
+        self.memory_limit = memory_limit
+        self.health_check_interval = health_check_interval
+        self.stats = CheckoutStats()
+        self._root: Optional[duckdb.DuckDBPyConnection] = None
+        self._checked_at = 0.0
+        self._released = False
+        self._condition = threading.Condition()
+        # Cursors held per thread; nested checkouts must not wait for a release
+        # that is itself waiting for the outer cursor to be returned.
+        self._holders: Dict[int, int] = {}
+
+    def _open(self) -> duckdb.DuckDBPyConnection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        con = duckdb.connect(str(self.path))
+        try:
+            # SET rather than connect(config=...) so ad-hoc connections to the same
+            # file elsewhere in the process do not clash on configuration.
+            if self.threads:
+                con.execute(f"SET threads = {int(self.threads)}")
+            if self.memory_limit:
+                con.execute("SET memory_limit = ?", [self.memory_limit])
+        except duckdb.Error:
+            con.close()
+            raise
+        self._checked_at = time.monotonic()
+        return con
+
+    def _reopen(self) -> duckdb.DuckDBPyConnection:
+        if self._root is not None:
+            try:
+                self._root.close()
+            except duckdb.Error:
+                pass
+        self._root = self._open()
+        self.stats.reconnects += 1
+        return self._root
+
+    def _healthy_root(self) -> duckdb.DuckDBPyConnection:
+        if self._root is None:
+            self._root = self._open()
+            return self._root
+        if time.monotonic() - self._checked_at >= self.health_check_interval:
+            try:
+                self._root.execute("SELECT 1").fetchone()
+                self._checked_at = time.monotonic()
+            except duckdb.Error as exc:
+                logger.warning("Reconnecting to %s after failed health check: %s", self.path, exc)
+                return self._reopen()
+        return self._root
+
+    def checkout(self, owner: int) -> duckdb.DuckDBPyConnection:
+        started = time.perf_counter()
+        with self._condition:
+            while self._released and not self._holders.get(owner):
+                self._condition.wait()
+            root = self._healthy_root()
+            try:
+                cursor = root.cursor()
+            except duckdb.Error:
+                cursor = self._reopen().cursor()
+            self.stats.active += 1
+            self._holders[owner] = self._holders.get(owner, 0) + 1
+            waited = time.perf_counter() - started
+            self.stats.checkouts += 1
+            self.stats.total_wait_seconds += waited
+            self.stats.max_wait_seconds = max(self.stats.max_wait_seconds, waited)
+        if waited >= SLOW_CHECKOUT_SECONDS:
+            logger.info("Waited %.3fs for a connection to %s", waited, self.path)
+        return cursor
+
+    def checkin(self, cursor: duckdb.DuckDBPyConnection, owner: int) -> None:
+        try:
+            cursor.close()
+        finally:
+            with self._condition:
+                if self._holders[owner] > 1:
+                    self._holders[owner] -= 1
+                else:
+                    del self._holders[owner]
+                self.stats.active -= 1
+                if not self.stats.active:
+                    self._condition.notify_all()
+
+    def _wait(self, deadline: Optional[float]) -> bool:
+        if deadline is None:
+            self._condition.wait()
+            return True
+        remaining = deadline - time.monotonic()
+        return remaining > 0 and self._condition.wait(remaining)
+
+    @contextmanager
+    def release(self, timeout: Optional[float] = None) -> Iterator[None]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._released:
+                if not self._wait(deadline) and self._released:
+                    raise WarehouseBusyError(
+                        f"{self.path} is still released by another caller after {timeout}s"
+                    )
+            self._released = True
+            while self.stats.active:
+                if not self._wait(deadline) and self.stats.active:
+                    # Let the checkouts queued behind this release proceed again.
+                    self._released = False
+                    self._condition.notify_all()
+                    raise WarehouseBusyError(
+                        f"{self.stats.active} connection(s) to {self.path} were not "
+                        f"returned within {timeout}s"
+                    )
+            self.close()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._released = False
+                self._condition.notify_all()
+
+    def close(self) -> None:
+        if self._root is not None:
+            self._root.close()
+            self._root = None
+
+
+class WarehouseManager:
+    """One shared root connection per database file, handing out cursors."""
+
+    def __init__(
+        self,
+        *,
+        threads: Optional[int] = None,
+        memory_limit: Optional[str] = None,
+        health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+    ) -> None:
+        self.threads = threads
+        self.memory_limit = memory_limit
+        self.health_check_interval = health_check_interval
+        self._databases: Dict[Path, _Database] = {}
+        self._lock = threading.Lock()
+
+    def _database(self, path: Union[str, Path]) -> _Database:
+        key = Path(path).expanduser().resolve()
+        with self._lock:
+            database = self._databases.get(key)
+            if database is None:
+                database = _Database(
+                    key,
+                    threads=self.threads,
+                    memory_limit=self.memory_limit,
+                    health_check_interval=self.health_check_interval,
+                )
+                self._databases[key] = database
+            return database
+
+    @contextmanager
+    def connect(self, path: Union[str, Path]) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Check out a cursor of the database at ``path`` for the duration of the block."""
+
+        database = self._database(path)
+        # The block may be resumed on another thread (a streaming response), so
+        # the cursor is returned on behalf of the thread that checked it out.
+        owner = threading.get_ident()
+        cursor = database.checkout(owner)
+        try:
+            yield cursor
+        finally:
+            database.checkin(cursor, owner)
+
+    @contextmanager
+    def release(
+        self,
+        path: Union[str, Path],
+        timeout: Optional[float] = DEFAULT_RELEASE_TIMEOUT,
+    ) -> Iterator[None]:
+        """Close the database at ``path`` for the block so another process can open it.
+
+        Waits for checked-out cursors to be returned; new checkouts wait until the
+        block exits. A cursor is held for as long as its ``connect`` block runs,
+        which for a streamed query result is until the client has read it, so the
+        wait is bounded by ``timeout`` seconds (None waits indefinitely), after
+        which :class:`WarehouseBusyError` is raised and checkouts resume. Must not
+        be entered while the calling thread holds a cursor of the same database.
+        """
+
+        with self._database(path).release(timeout):
+            yield
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            databases = list(self._databases.values())
+        return {str(database.path): database.stats.to_dict() for database in databases}
+
+    def close(self, path: Optional[Union[str, Path]] = None) -> None:
+        """Close and forget the database at ``path``, or every database.
+
+        Like :meth:`release`, waits for checked-out cursors to be returned first,
+        without a timeout.
+        """
+
+        with self._lock:
+            if path is None:
+                databases = list(self._databases.values())
+                self._databases.clear()
+            else:
+                database = self._databases.pop(Path(path).expanduser().resolve(), None)
+                databases = [database] if database is not None else []
+        for database in databases:
+            with database.release():
+                pass
+
+
+@lru_cache(maxsize=1)
+def get_warehouse_manager() -> WarehouseManager:
+    settings = get_settings().duckdb
+    return WarehouseManager(threads=settings.threads, memory_limit=settings.memory_limit)
+
+
+def connect(path: Union[str, Path]) -> ContextManager[duckdb.DuckDBPyConnection]:
+    """Shorthand for ``get_warehouse_manager().connect(path)``."""
+
+    return get_warehouse_manager().connect(path)
@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import logging
 
 from pluto_duck_backend import __version__
 from pluto_duck_backend.app.api.router import api_router
-from pluto_duck_backend.app.core.config import get_settings, PlutoDuckSettings
+from pluto_duck_backend.app.core.config import PlutoDuckSettings, get_settings
 
 
 def _configure_logging(settings: PlutoDuckSettings) -> None:
@@ -44,6 +45,10 @@ def create_app() -> FastAPI:
     except Exception as e:
         logging.error(f"Failed to initialize database tables: {e}")
 
+    # Start the background sweep that drops old query result tables
+    from pluto_duck_backend.app.services.execution import get_result_retention
+    get_result_retention()
+
     app = FastAPI(
         title="Pluto-Duck API",
         version=__version__,
@@ -5,11 +5,13 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Callable, Dict, List, Optional
 
+import duckdb
+
+from pluto_duck_backend.app.core import warehouse
 from pluto_duck_backend.app.core.config import get_settings
 from pluto_duck_backend.app.services.execution.manager import get_execution_manager
 from pluto_duck_backend.app.services.ingestion import IngestionJob, IngestionService, get_registry
 from pluto_duck_backend.app.services.transformation import DbtService
-import duckdb
 
 
 @dataclass
@@ -77,6 +79,7 @@ def _build_default_catalog() -> ActionCatalog:
             warehouse_path=settings.duckdb.path,
             overwrite=overwrite,
             config=config or {},
+            rollback_window_seconds=settings.ingestion.rollback_window_seconds,
         )
         return service.run(job)
 
@@ -146,29 +149,27 @@ def _persist_catalog(catalog: ActionCatalog) -> None:
     warehouse_path = settings.duckdb.path
     if not warehouse_path.exists():
         return
-    con = duckdb.connect(str(warehouse_path))
     try:
-        con.execute(
-            """
-            CREATE TABLE IF NOT EXISTS action_catalog (
-                subject TEXT,
-                action TEXT,
-                description TEXT,
-                PRIMARY KEY (subject, action)
-            )
-            """
-        )
-        con.execute("DELETE FROM action_catalog")
-        for action in catalog.list_actions():
+        with warehouse.connect(warehouse_path) as con:
             con.execute(
-                "INSERT INTO action_catalog (subject, action, description) VALUES (?, ?, ?)",
-                [action.subject, action.action, action.description],
+                """
+                CREATE TABLE IF NOT EXISTS action_catalog (
+                    subject TEXT,
+                    action TEXT,
+                    description TEXT,
+                    PRIMARY KEY (subject, action)
+                )
+                """
             )
+            con.execute("DELETE FROM action_catalog")
+            for action in catalog.list_actions():
+                con.execute(
+                    "INSERT INTO action_catalog (subject, action, description) VALUES (?, ?, ?)",
+                    [action.subject, action.action, action.description],
+                )
     except duckdb.IOException:
         # Warehouse might not exist yet (e.g., during tests); skip persistence.
         pass
-    finally:
-        con.close()
 
 
 _DEFAULT_CATALOG = _build_default_catalog()
@@ -2,15 +2,17 @@ from __future__ import annotations
 
 import json
 import re
+import threading
+from contextlib import nullcontext
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, ContextManager, Dict, List, Optional
 
 import duckdb
-import threading
 
+from pluto_duck_backend.app.core import warehouse
 from pluto_duck_backend.app.core.config import get_settings
 
 _table_init_lock = threading.Lock()
@@ -135,8 +137,12 @@ class ChatRepository:
         self._default_project_id = self._ensure_default_project()
         self.ensure_default_settings(DEFAULT_SETTINGS)
 
-    def _connect(self) -> duckdb.DuckDBPyConnection:
-        return duckdb.connect(str(self.warehouse_path))
+    def _connect(
+        self, connection: Optional[duckdb.DuckDBPyConnection] = None
+    ) -> ContextManager[duckdb.DuckDBPyConnection]:
+        if connection is not None:
+            return nullcontext(connection)
+        return warehouse.connect(self.warehouse_path)
 
     def _ensure_tables(self) -> None:
         with _table_init_lock:
@@ -233,9 +239,7 @@ class ChatRepository:
         *,
         connection: Optional[duckdb.DuckDBPyConnection] = None,
     ) -> None:
-        owns_connection = connection is None
-        con = connection or self._connect()
-        try:
+        with self._connect(connection) as con:
             seq = self._next_seq(conversation_id, connection=con)
             message_id = self._generate_uuid()
             con.execute(
@@ -250,9 +254,6 @@ class ChatRepository:
                 last_message_preview=self._preview_from_content(content),
                 connection=con,
             )
-        finally:
-            if owns_connection:
-                con.close()
 
     def log_event(self, conversation_id: str, event: Dict[str, Any]) -> None:
         event_id = self._generate_uuid()
@@ -349,17 +350,12 @@ class ChatRepository:
         *,
         connection: Optional[duckdb.DuckDBPyConnection] = None,
     ) -> int:
-        owns_connection = connection is None
-        con = connection or self._connect()
-        try:
+        with self._connect(connection) as con:
             seq_row = con.execute(
                 "SELECT COALESCE(MAX(seq), 0) + 1 FROM agent_messages WHERE conversation_id = ?",
                 [conversation_id],
             ).fetchone()
             return seq_row[0] if seq_row else 1
-        finally:
-            if owns_connection:
-                con.close()
 
     def _touch_conversation(
         self,
@@ -369,9 +365,7 @@ class ChatRepository:
         last_message_preview: Optional[str] = None,
         connection: Optional[duckdb.DuckDBPyConnection] = None,
     ) -> None:
-        owns_connection = connection is None
-        con = connection or self._connect()
-        try:
+        with self._connect(connection) as con:
             if status is not None and last_message_preview is not None:
                 con.execute(
                     "UPDATE agent_conversations SET status = ?, last_message_preview = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
@@ -392,9 +386,6 @@ class ChatRepository:
                     "UPDATE agent_conversations SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
                     [conversation_id],
                 )
-        finally:
-            if owns_connection:
-                con.close()
 
     def list_conversations(self, limit: int = 50, offset: int = 0) -> List[ConversationSummary]:
         with self._connect() as con:
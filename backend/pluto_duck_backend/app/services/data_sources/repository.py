@@ -7,11 +7,12 @@ from dataclasses import dataclass
 from datetime import UTC, datetime
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, ContextManager, Dict, List, Optional
 from uuid import uuid4
 
 import duckdb
 
+from pluto_duck_backend.app.core import warehouse
 from pluto_duck_backend.app.core.config import get_settings
 
 
@@ -42,8 +43,8 @@ class DataSourceRepository:
         self.warehouse_path = warehouse_path
         self.default_project_id = default_project_id
 
-    def _connect(self) -> duckdb.DuckDBPyConnection:
-        return duckdb.connect(str(self.warehouse_path))
+    def _connect(self) -> ContextManager[duckdb.DuckDBPyConnection]:
+        return warehouse.connect(self.warehouse_path)
 
     def create(
         self,
@@ -139,8 +140,13 @@ class DataSourceRepository:
         status: str,
         rows_count: Optional[int] = None,
         error_message: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
     ) -> None:
-        """Update import status after sync/import."""
+        """Update import status after sync/import.
+
+        ``metadata`` replaces the stored metadata when given; it carries state such
+        as inferred schemas from one run to the next.
+        """
         now = datetime.now(UTC)
         
         with self._connect() as con:
@@ -153,6 +159,11 @@ class DataSourceRepository:
                 """,
                 [status, rows_count, now, error_message, now, source_id],
             )
+            if metadata is not None:
+                con.execute(
+                    "UPDATE data_sources SET metadata = ? WHERE id = ?",
+                    [json.dumps(metadata, default=str), source_id],
+                )
 
     def delete(self, source_id: str) -> bool:
         """Delete a data source record."""
@@ -1,12 +1,30 @@
 """Query execution services for Pluto-Duck."""
 
+from .cache import ResultCache, get_result_cache
 from .manager import QueryExecutionManager, get_execution_manager
-from .service import QueryExecutionService, QueryJob, QueryJobStatus
+from .retention import ResultRetention, RetentionPolicy, SweepResult, get_result_retention
+from .service import (
+    QueryExecutionService,
+    QueryJob,
+    QueryJobStatus,
+    QueryMode,
+    QueryStream,
+    ResultSlice,
+)
 
 __all__ = [
     "QueryExecutionService",
     "QueryJob",
     "QueryJobStatus",
+    "QueryMode",
+    "QueryStream",
+    "ResultSlice",
+    "ResultCache",
+    "get_result_cache",
+    "ResultRetention",
+    "RetentionPolicy",
+    "SweepResult",
+    "get_result_retention",
     "QueryExecutionManager",
     "get_execution_manager",
 ]
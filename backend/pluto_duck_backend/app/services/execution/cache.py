@@ -0,0 +1,357 @@
+"""Reuse of materialized query results across identical queries.
+
+A query is cacheable when it is a single SELECT over warehouse tables: no table
+functions or file scans (their inputs are not versioned) and no volatile
+functions such as ``random()`` or ``now()``. Its cache key is a hash of the
+parsed statement from ``json_serialize_sql`` with source positions removed, so
+whitespace, comments and keyword case do not matter. Each entry remembers the
+:mod:`table_versions` of the tables it read (views are expanded to the tables
+behind them); a lookup only hits while all of them are unchanged.
+
+Entries and their ``query_result_*`` tables are evicted least recently used
+first once their estimated total size exceeds the configured budget.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+
+import duckdb
+
+from pluto_duck_backend.app.core import table_versions
+from pluto_duck_backend.app.core.config import get_settings
+from pluto_duck_backend.app.services.ingestion.batches import arrow_reader
+from pluto_duck_backend.app.services.ingestion.duckdb_loader import _quote_identifier
+
+logger = logging.getLogger(__name__)
+
+VOLATILE_FUNCTIONS = frozenset(
+    {
+        "current_date",
+        "current_localtime",
+        "current_localtimestamp",
+        "current_time",
+        "current_timestamp",
+        "currval",
+        "gen_random_uuid",
+        "get_current_time",
+        "get_current_timestamp",
+        "nextval",
+        "now",
+        "random",
+        "setseed",
+        "today",
+        "transaction_timestamp",
+        "uuid",
+        "uuidv4",
+        "uuidv7",
+    }
+)
+# Bookkeeping tables the backend updates in place without bumping versions.
+UNVERSIONED_TABLES = frozenset(
+    {
+        "action_catalog",
+        "agent_conversations",
+        "agent_events",
+        "agent_messages",
+        "data_sources",
+        "dbt_models",
+        "dbt_run_history",
+        "ingestion_jobs",
+        "projects",
+        "query_history",
+        "query_result_cache",
+        "table_versions",
+        "user_settings",
+    }
+)
+CATALOG_SCHEMAS = frozenset({"information_schema", "pg_catalog"})
+READ_ONLY_STATEMENTS = frozenset({"SELECT", "EXPLAIN"})
+# Views are expanded at most this deep when collecting the tables a query reads.
+_MAX_VIEW_DEPTH = 8
+# Rows read to estimate the bytes per row of a result table.
+_SIZE_SAMPLE_ROWS = 1024
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS query_result_cache (
+    cache_key TEXT PRIMARY KEY,
+    sql TEXT,
+    result_relation TEXT,
+    table_versions TEXT,
+    rows_affected BIGINT,
+    size_bytes BIGINT,
+    created_at TIMESTAMP,
+    last_used_at TIMESTAMP,
+    hits BIGINT DEFAULT 0
+)
+"""
+
+
+@dataclass
+class CachePlan:
+    """What a cacheable query depends on, captured before it runs."""
+
+    key: str
+    versions: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class CacheHit:
+    result_relation: str
+    rows_affected: Optional[int]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    # Queries that were not cacheable or ran with the bypass flag.
+    bypassed: int = 0
+    stored: int = 0
+    evictions: int = 0
+
+
+def is_read_only(sql: str) -> bool:
+    """Whether every statement in ``sql`` only reads the warehouse."""
+
+    try:
+        statements = duckdb.extract_statements(sql)
+    except duckdb.Error:
+        return False
+    return all(statement.type.name in READ_ONLY_STATEMENTS for statement in statements)
+
+
+def _parse(con: duckdb.DuckDBPyConnection, sql: str) -> Optional[List[object]]:
+    row = con.execute("SELECT json_serialize_sql(?)", [sql]).fetchone()
+    parsed = json.loads(row[0]) if row else {"error": True}
+    if parsed.get("error") or len(parsed.get("statements") or []) != 1:
+        return None
+    return parsed["statements"]
+
+
+def _strip_locations(node: object) -> object:
+    if isinstance(node, dict):
+        return {
+            key: _strip_locations(value) for key, value in node.items() if key != "query_location"
+        }
+    if isinstance(node, list):
+        return [_strip_locations(item) for item in node]
+    return node
+
+
+def _collect_tables(node: object, tables: Set[str]) -> bool:
+    """Add the base tables referenced by ``node``; False if the query is not cacheable."""
+
+    if isinstance(node, list):
+        return all(_collect_tables(item, tables) for item in node)
+    if not isinstance(node, dict):
+        return True
+    if node.get("type") == "TABLE_FUNCTION":
+        return False
+    if node.get("type") == "BASE_TABLE":
+        name = str(node.get("table_name", "")).lower()
+        # Replacement scans such as FROM 'data.csv' read files, not tables.
+        if "." in name or "/" in name or name in UNVERSIONED_TABLES:
+            return False
+        if str(node.get("schema_name", "")).lower() in CATALOG_SCHEMAS:
+            return False
+        tables.add(name)
+    if node.get("class") == "FUNCTION":
+        if str(node.get("function_name", "")).lower() in VOLATILE_FUNCTIONS:
+            return False
+    return all(_collect_tables(value, tables) for value in node.values())
+
+
+def plan_query(con: duckdb.DuckDBPyConnection, sql: str) -> Optional[CachePlan]:
+    """The cache key and table versions of ``sql``, or None when it is not cacheable."""
+
+    statements = _parse(con, sql)
+    if statements is None:
+        return None
+    tables: Set[str] = set()
+    if not _collect_tables(statements, tables):
+        return None
+
+    views = {
+        str(name).lower(): view_sql
+        for name, view_sql in con.execute(
+            "SELECT view_name, sql FROM duckdb_views() WHERE NOT internal"
+        ).fetchall()
+    }
+    expanded: Set[str] = set()
+    for _ in range(_MAX_VIEW_DEPTH):
+        for view in (tables & views.keys()) - expanded:
+            expanded.add(view)
+            # duckdb_views() reports the full CREATE VIEW statement.
+            view_statements = _parse(con, views[view].split(" AS ", 1)[-1])
+            if view_statements is None or not _collect_tables(view_statements, tables):
+                return None
+    if (tables & views.keys()) - expanded:
+        return None
+
+    fingerprint = json.dumps(_strip_locations(statements), sort_keys=True)
+    return CachePlan(
+        key=hashlib.sha256(fingerprint.encode()).hexdigest(),
+        versions=table_versions.current(con, tables),
+    )
+
+
+class ResultCache:
+    """LRU of materialized query results, bounded by their estimated size."""
+
+    def __init__(self, max_bytes: int, *, enabled: bool = True) -> None:
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self._stats, counter, getattr(self._stats, counter) + amount)
+
+    def ensure_tables(self, con: duckdb.DuckDBPyConnection) -> None:
+        con.execute(_DDL)
+        table_versions.ensure_table(con)
+
+    def plan(
+        self, con: duckdb.DuckDBPyConnection, sql: str, *, bypass: bool = False
+    ) -> Optional[CachePlan]:
+        plan = None if bypass or not self.enabled else plan_query(con, sql)
+        if plan is None:
+            self._count("bypassed")
+        return plan
+
+    def lookup(self, con: duckdb.DuckDBPyConnection, plan: CachePlan) -> Optional[CacheHit]:
+        row = con.execute(
+            "SELECT result_relation, table_versions, rows_affected FROM query_result_cache "
+            "WHERE cache_key = ?",
+            [plan.key],
+        ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        relation, versions, rows_affected = row
+        fresh = json.loads(versions) == plan.versions
+        if not fresh or not _table_exists(con, relation):
+            self._evict(con, plan.key, relation)
+            self._count("misses")
+            return None
+        con.execute(
+            "UPDATE query_result_cache SET last_used_at = ?, hits = hits + 1 WHERE cache_key = ?",
+            [datetime.now(UTC), plan.key],
+        )
+        self._count("hits")
+        return CacheHit(result_relation=relation, rows_affected=rows_affected)
+
+    def store(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        plan: CachePlan,
+        sql: str,
+        result_relation: str,
+        rows_affected: int,
+        size: int,
+    ) -> None:
+        if size > self.max_bytes:
+            return
+        now = datetime.now(UTC)
+        con.execute(
+            """
+            INSERT OR REPLACE INTO query_result_cache
+                (cache_key, sql, result_relation, table_versions, rows_affected, size_bytes,
+                 created_at, last_used_at, hits)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
+            """,
+            [
+                plan.key,
+                sql,
+                result_relation,
+                json.dumps(plan.versions, sort_keys=True),
+                rows_affected,
+                size,
+                now,
+                now,
+            ],
+        )
+        self._count("stored")
+        entries = con.execute(
+            "SELECT cache_key, result_relation, size_bytes FROM query_result_cache "
+            "ORDER BY last_used_at DESC"
+        ).fetchall()
+        total = 0
+        for key, relation, entry_size in entries:
+            total += int(entry_size or 0)
+            if total > self.max_bytes and key != plan.key:
+                self._evict(con, key, relation)
+
+    def _evict(self, con: duckdb.DuckDBPyConnection, key: str, relation: str) -> None:
+        con.execute("DELETE FROM query_result_cache WHERE cache_key = ?", [key])
+        con.execute(f"DROP TABLE IF EXISTS {_quote_identifier(relation)}")
+        # Jobs that returned this result can no longer page through it.
+        con.execute(
+            "UPDATE query_history SET result_expired_at = ? "
+            "WHERE result_relation = ? AND result_expired_at IS NULL",
+            [datetime.now(UTC), relation],
+        )
+        self._count("evictions")
+        logger.debug("Evicted cached query result %s", relation)
+
+    def forget(self, con: duckdb.DuckDBPyConnection, relations: List[str]) -> None:
+        """Stop tracking ``relations``, which were dropped or pinned by someone else."""
+
+        if relations:
+            con.executemany(
+                "DELETE FROM query_result_cache WHERE result_relation = ?",
+                [[relation] for relation in relations],
+            )
+
+    def stats(self, con: duckdb.DuckDBPyConnection) -> Dict[str, object]:
+        entries, size = con.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM query_result_cache"
+        ).fetchone()
+        with self._lock:
+            stats: Dict[str, object] = asdict(self._stats)
+        hits, misses = self._stats.hits, self._stats.misses
+        stats.update(
+            {
+                "enabled": self.enabled,
+                "entries": int(entries),
+                "size_bytes": int(size),
+                "max_bytes": self.max_bytes,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            }
+        )
+        return stats
+
+
+def _table_exists(con: duckdb.DuckDBPyConnection, table: str) -> bool:
+    row = con.execute(
+        "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = ? AND NOT temporary", [table]
+    ).fetchone()
+    return bool(row and row[0])
+
+
+def estimate_bytes(con: duckdb.DuckDBPyConnection, relation: str, rows: int) -> int:
+    """Approximate in-memory size of a result from a sample of its rows."""
+
+    if rows <= 0:
+        return 0
+    sample = arrow_reader(
+        con.execute(f"SELECT * FROM {_quote_identifier(relation)} LIMIT {_SIZE_SAMPLE_ROWS}")
+    ).read_all()
+    if not sample.num_rows:
+        return 0
+    return int(sample.nbytes / sample.num_rows * rows)
+
+
+@lru_cache(maxsize=1)
+def get_result_cache() -> ResultCache:
+    settings = get_settings().query
+    return ResultCache(settings.result_cache_max_bytes, enabled=settings.result_cache_enabled)
@@ -7,10 +7,11 @@ import time
 from functools import lru_cache
 from queue import Queue
 from threading import Thread
-from typing import Optional
+from typing import Optional, Tuple
 
 from pluto_duck_backend.app.core.config import get_settings
 
+from .cache import get_result_cache
 from .service import QueryExecutionService
 
 logger = logging.getLogger(__name__)
@@ -21,7 +22,7 @@ class QueryExecutionManager:
 
     def __init__(self, service: QueryExecutionService, worker_count: int = 1) -> None:
         self.service = service
-        self._queue: Queue[str] = Queue()
+        self._queue: Queue[Tuple[str, bool]] = Queue()
         self._workers = [
             Thread(target=self._worker, name=f"query-worker-{idx}", daemon=True)
             for idx in range(worker_count)
@@ -29,16 +30,18 @@ class QueryExecutionManager:
         for worker in self._workers:
             worker.start()
 
-    def enqueue(self, run_id: str) -> None:
+    def enqueue(self, run_id: str, *, use_cache: bool = True) -> None:
         logger.debug("Enqueuing query job %s", run_id)
-        self._queue.put(run_id)
+        self._queue.put((run_id, use_cache))
 
-    def submit_sql(self, sql: str, run_id: Optional[str] = None) -> str:
+    def submit_sql(
+        self, sql: str, run_id: Optional[str] = None, *, use_cache: bool = True
+    ) -> str:
         from uuid import uuid4
 
         run_identifier = run_id or str(uuid4())
         self.service.submit(run_identifier, sql)
-        self.enqueue(run_identifier)
+        self.enqueue(run_identifier, use_cache=use_cache)
         return run_identifier
 
     def wait_for(self, run_id: str, timeout: float = 10.0, poll_interval: float = 0.1):
@@ -52,10 +55,10 @@ class QueryExecutionManager:
 
     def _worker(self) -> None:
         while True:
-            run_id = self._queue.get()
+            run_id, use_cache = self._queue.get()
             try:
                 logger.debug("Executing queued query job %s", run_id)
-                self.service.execute(run_id)
+                self.service.execute(run_id, use_cache=use_cache)
             except Exception:  # pragma: no cover - logging only
                 logger.exception("Query job %s failed during execution", run_id)
             finally:
@@ -65,6 +68,6 @@ class QueryExecutionManager:
 @lru_cache(maxsize=1)
 def get_execution_manager() -> QueryExecutionManager:
     settings = get_settings()
-    service = QueryExecutionService(settings.duckdb.path)
+    service = QueryExecutionService(settings.duckdb.path, cache=get_result_cache())
     return QueryExecutionManager(service)
 
@@ -0,0 +1,238 @@
+"""Garbage collection of materialized ``query_result_*`` tables.
+
+Every materialized or spilled query leaves a result table behind. A sweep looks
+at the tables recorded in ``query_history`` and drops the unpinned ones that
+are past the configured age, then the least recently used ones until at most
+``max_tables`` of them, with at most ``max_bytes`` estimated in total, remain.
+A table shared by several jobs (through the result cache) counts as used when
+the last of them completed, and is kept if any of them is pinned. Dropped jobs
+get ``result_expired_at`` set. A ``CHECKPOINT`` afterwards lets DuckDB reuse
+the freed blocks.
+
+Tables that are not recorded in ``query_history`` (for example a spill that is
+still being written) are never touched.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+import duckdb
+
+from pluto_duck_backend.app.core import warehouse
+from pluto_duck_backend.app.core.config import get_settings
+from pluto_duck_backend.app.services.ingestion.duckdb_loader import _quote_identifier
+
+from .cache import ResultCache, estimate_bytes, get_result_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionPolicy:
+    # None disables the corresponding limit.
+    max_age_seconds: Optional[float] = None
+    max_tables: Optional[int] = None
+    max_bytes: Optional[int] = None
+
+
+@dataclass
+class SweepResult:
+    dropped: List[str] = field(default_factory=list)
+    freed_bytes: int = 0
+    retained: int = 0
+    pinned: int = 0
+
+
+@dataclass
+class _ResultTable:
+    relation: str
+    pinned: bool
+    last_used: Optional[datetime]
+    size: int
+
+
+class ResultRetention:
+    """Drops old result tables on demand or from a background thread."""
+
+    def __init__(
+        self,
+        warehouse_path: Path,
+        policy: RetentionPolicy,
+        *,
+        cache: Optional[ResultCache] = None,
+        interval: float = 0,
+    ) -> None:
+        self.warehouse_path = warehouse_path
+        self.policy = policy
+        self.cache = cache
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Sweep every ``interval`` seconds in a daemon thread (no-op when 0)."""
+
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="query-result-gc", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception:  # pragma: no cover - logging only
+                logger.exception("Sweeping query result tables failed")
+
+    def sweep(self, now: Optional[datetime] = None) -> SweepResult:
+        now = now or datetime.now(UTC)
+        result = SweepResult()
+        with self._lock, warehouse.connect(self.warehouse_path) as con:
+            if not _has_history(con):
+                return result
+            tables = self._tables(con, now)
+            candidates: List[_ResultTable] = []
+            for table in tables:
+                if table.pinned:
+                    result.pinned += 1
+                elif self._expired(table, now):
+                    self._drop(con, table, now, result)
+                else:
+                    candidates.append(table)
+
+            max_tables = self.policy.max_tables
+            max_bytes = self.policy.max_bytes
+            total = sum(table.size for table in candidates)
+            # Oldest first; tables never recorded as completed sort first.
+            candidates.sort(key=lambda table: table.last_used or datetime.min.replace(tzinfo=UTC))
+            while candidates and (
+                (max_tables is not None and len(candidates) > max_tables)
+                or (max_bytes is not None and total > max_bytes)
+            ):
+                table = candidates.pop(0)
+                total -= table.size
+                self._drop(con, table, now, result)
+            result.retained = len(candidates)
+
+            if result.dropped:
+                if self.cache is not None:
+                    self.cache.forget(con, result.dropped)
+                try:
+                    con.execute("CHECKPOINT")
+                except duckdb.Error as exc:
+                    # Another transaction is open; the next checkpoint reclaims the space.
+                    logger.debug("Skipped checkpoint after dropping result tables: %s", exc)
+        if result.dropped:
+            logger.info(
+                "Dropped %d query result tables (~%d bytes)",
+                len(result.dropped),
+                result.freed_bytes,
+            )
+        return result
+
+    def _expired(self, table: _ResultTable, now: datetime) -> bool:
+        max_age = self.policy.max_age_seconds
+        if max_age is None or table.last_used is None:
+            return False
+        return (now - table.last_used).total_seconds() > max_age
+
+    def _tables(self, con: duckdb.DuckDBPyConnection, now: datetime) -> List[_ResultTable]:
+        rows = con.execute(
+            """
+            SELECT result_relation, bool_or(COALESCE(pinned, FALSE)), MAX(completed_at),
+                   MAX(result_bytes), MAX(rows_affected)
+            FROM query_history
+            WHERE status = 'success' AND result_relation IS NOT NULL
+              AND result_expired_at IS NULL
+            GROUP BY result_relation
+            """
+        ).fetchall()
+        existing = {
+            name
+            for (name,) in con.execute(
+                "SELECT table_name FROM duckdb_tables() "
+                "WHERE starts_with(table_name, 'query_result_') AND NOT temporary"
+            ).fetchall()
+        }
+        tables: List[_ResultTable] = []
+        for relation, pinned, last_used, size, row_count in rows:
+            if relation not in existing:
+                # Dropped outside a sweep, e.g. by hand.
+                self._mark_expired(con, relation, now)
+                continue
+            if size is None:
+                # Results materialized before sizes were recorded.
+                if row_count is None:
+                    row_count = con.execute(
+                        f"SELECT COUNT(*) FROM {_quote_identifier(relation)}"
+                    ).fetchone()[0]
+                size = estimate_bytes(con, relation, int(row_count))
+                con.execute(
+                    "UPDATE query_history SET result_bytes = ? WHERE result_relation = ?",
+                    [size, relation],
+                )
+            if isinstance(last_used, datetime) and last_used.tzinfo is None:
+                last_used = last_used.replace(tzinfo=UTC)
+            tables.append(_ResultTable(relation, bool(pinned), last_used, int(size)))
+        return tables
+
+    def _drop(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        table: _ResultTable,
+        now: datetime,
+        result: SweepResult,
+    ) -> None:
+        con.execute(f"DROP TABLE IF EXISTS {_quote_identifier(table.relation)}")
+        self._mark_expired(con, table.relation, now)
+        result.dropped.append(table.relation)
+        result.freed_bytes += table.size
+
+    def _mark_expired(self, con: duckdb.DuckDBPyConnection, relation: str, now: datetime) -> None:
+        con.execute(
+            "UPDATE query_history SET result_expired_at = ? "
+            "WHERE result_relation = ? AND result_expired_at IS NULL",
+            [now, relation],
+        )
+
+
+def _has_history(con: duckdb.DuckDBPyConnection) -> bool:
+    row = con.execute(
+        "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = 'query_history'"
+    ).fetchone()
+    return bool(row and row[0])
+
+
+@lru_cache(maxsize=1)
+def get_result_retention() -> ResultRetention:
+    """The warehouse's retention sweeper, started on first use."""
+
+    settings = get_settings()
+    query = settings.query
+    retention = ResultRetention(
+        settings.duckdb.path,
+        RetentionPolicy(
+            max_age_seconds=query.result_retention_seconds,
+            max_tables=query.result_max_tables,
+            max_bytes=query.result_max_bytes,
+        ),
+        cache=get_result_cache(),
+        interval=query.result_gc_interval_seconds,
+    )
+    retention.start()
+    return retention
@@ -2,13 +2,40 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import base64
+import binascii
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 import duckdb
+import pyarrow as pa
+
+from pluto_duck_backend.app.core import table_versions, warehouse
+from pluto_duck_backend.app.services.ingestion.batches import arrow_reader
+from pluto_duck_backend.app.services.ingestion.duckdb_loader import _quote_identifier
+
+from .cache import ResultCache, estimate_bytes, is_read_only
+
+DEFAULT_RESULT_BATCH_SIZE = 8192
+# Columns added to query_history after its first release.
+_HISTORY_MIGRATIONS = {
+    "rows_affected": "BIGINT",
+    "result_bytes": "BIGINT",
+    "pinned": "BOOLEAN DEFAULT FALSE",
+    "result_expired_at": "TIMESTAMP",
+}
+
+
+class QueryMode(str, Enum):
+    # CREATE TABLE AS into query_result_<run_id>, read back through /rows.
+    MATERIALIZE = "materialize"
+    # Run the query directly and hand batches to the caller; a result table is
+    # only written when asked for or when the result outgrows a threshold.
+    STREAM = "stream"
 
 
 class QueryJobStatus(str, Enum):
@@ -28,17 +55,61 @@ class QueryJob:
     error: Optional[str] = None
     completed_at: Optional[datetime] = None
     rows_affected: Optional[int] = None
+    # Pinned results are never dropped by the retention sweep.
+    pinned: bool = False
+    # When the result table was dropped; its rows can no longer be read.
+    expired_at: Optional[datetime] = None
+
+
+@dataclass
+class ResultSlice:
+    """A contiguous range of a materialized result, addressed by ``rowid``.
+
+    Result tables are written once in query order, so their ``rowid`` is a stable
+    position; a cursor is the ``rowid`` of the last row already returned.
+    """
+
+    run_id: str
+    relation: str
+    columns: List[Tuple[str, str]] = field(default_factory=list)
+    after: Optional[int] = None
+    # rowid of the last row in the slice; None when the slice is empty.
+    last_rowid: Optional[int] = None
+    rows: int = 0
+    has_more: bool = False
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if not self.has_more or self.last_rowid is None:
+            return None
+        return encode_cursor(self.last_rowid)
+
+
+def encode_cursor(rowid: int) -> str:
+    return base64.urlsafe_b64encode(f"rowid:{rowid}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, _, value = decoded.partition(":")
+        if prefix != "rowid":
+            raise ValueError
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor '{cursor}'") from None
 
 
 class QueryExecutionService:
     """Execute SQL queries against the local DuckDB warehouse."""
 
-    def __init__(self, warehouse_path: Path):
+    def __init__(self, warehouse_path: Path, cache: Optional[ResultCache] = None):
         self.warehouse_path = warehouse_path
+        self.cache = cache
         self._ensure_tables()
 
     def _ensure_tables(self) -> None:
-        with duckdb.connect(str(self.warehouse_path)) as con:
+        with warehouse.connect(self.warehouse_path) as con:
             con.execute(
                 """
                 CREATE TABLE IF NOT EXISTS query_history (
@@ -49,13 +120,19 @@ class QueryExecutionService:
                     completed_at TIMESTAMP,
                     result_relation TEXT,
                     error TEXT,
-                    rows_affected BIGINT
+                    rows_affected BIGINT,
+                    result_bytes BIGINT,
+                    pinned BOOLEAN DEFAULT FALSE,
+                    result_expired_at TIMESTAMP
                 )
                 """
             )
             columns = {row[0] for row in con.execute("DESCRIBE query_history").fetchall()}
-            if "rows_affected" not in columns:
-                con.execute("ALTER TABLE query_history ADD COLUMN rows_affected BIGINT")
+            for column, type_ in _HISTORY_MIGRATIONS.items():
+                if column not in columns:
+                    con.execute(f"ALTER TABLE query_history ADD COLUMN {column} {type_}")
+            if self.cache is not None:
+                self.cache.ensure_tables(con)
 
     def _sanitize_relation(self, run_id: str) -> str:
         sanitized = "".join(ch for ch in run_id if ch.isalnum() or ch == "_")
@@ -65,15 +142,22 @@ class QueryExecutionService:
 
     def submit(self, run_id: str, sql: str) -> QueryJob:
         submitted_at = datetime.now(UTC)
-        with duckdb.connect(str(self.warehouse_path)) as con:
+        with warehouse.connect(self.warehouse_path) as con:
             con.execute(
-                "INSERT OR REPLACE INTO query_history (job_id, sql, status, submitted_at) VALUES (?, ?, ?, ?)",
+                "INSERT OR REPLACE INTO query_history (job_id, sql, status, submitted_at) "
+                "VALUES (?, ?, ?, ?)",
                 [run_id, sql, QueryJobStatus.PENDING.value, submitted_at],
             )
-        return QueryJob(run_id=run_id, sql=sql, status=QueryJobStatus.PENDING, submitted_at=submitted_at)
+        return QueryJob(
+            run_id=run_id, sql=sql, status=QueryJobStatus.PENDING, submitted_at=submitted_at
+        )
 
-    def execute(self, run_id: str) -> QueryJob:
-        with duckdb.connect(str(self.warehouse_path)) as con:
+    def execute(self, run_id: str, *, use_cache: bool = True) -> QueryJob:
+        """Materialize a submitted query, reusing a cached result when one is fresh.
+
+        ``use_cache=False`` bypasses the result cache for this run.
+        """
+        with warehouse.connect(self.warehouse_path) as con:
             row = con.execute(
                 "SELECT sql, submitted_at FROM query_history WHERE job_id = ?",
                 [run_id],
@@ -81,29 +165,109 @@ class QueryExecutionService:
             if not row:
                 raise ValueError(f"Unknown run_id {run_id}")
             sql, submitted_at = row
-            submitted_at = submitted_at.replace(tzinfo=UTC) if submitted_at.tzinfo is None else submitted_at
+            if submitted_at.tzinfo is None:
+                submitted_at = submitted_at.replace(tzinfo=UTC)
             result_relation = self._sanitize_relation(run_id)
             try:
-                con.execute(f"CREATE OR REPLACE TABLE {result_relation} AS {sql}")
-                rows_affected = con.execute(f"SELECT COUNT(*) FROM {result_relation}").fetchone()[0]
-                completed_at = datetime.now(UTC)
-                con.execute(
-                    "UPDATE query_history SET status=?, completed_at=?, result_relation=?, error=NULL, rows_affected=? WHERE job_id=?",
-                    [QueryJobStatus.SUCCESS.value, completed_at, result_relation, rows_affected, run_id],
-                )
+                plan = self.cache.plan(con, sql, bypass=not use_cache) if self.cache else None
+                hit = self.cache.lookup(con, plan) if self.cache and plan else None
+                if hit is not None:
+                    self._record_success(con, run_id, hit.result_relation, hit.rows_affected)
+                    return self.fetch(run_id)  # type: ignore[return-value]
+                # CREATE TABLE AS reports the rows it wrote; no second scan needed.
+                row = con.execute(f"CREATE OR REPLACE TABLE {result_relation} AS {sql}").fetchone()
+                rows_affected = int(row[0]) if row else 0
+                size = estimate_bytes(con, result_relation, rows_affected)
+                self._record_success(con, run_id, result_relation, rows_affected, size)
             except duckdb.Error as exc:
-                completed_at = datetime.now(UTC)
-                con.execute(
-                    "UPDATE query_history SET status=?, completed_at=?, error=?, rows_affected=NULL WHERE job_id=?",
-                    [QueryJobStatus.FAILED.value, completed_at, str(exc), run_id],
-                )
+                self._record_failure(con, run_id, exc)
                 raise
+            if self.cache and plan:
+                self.cache.store(con, plan, sql, result_relation, rows_affected, size)
         return self.fetch(run_id)  # type: ignore[return-value]
 
+    def cache_stats(self) -> Dict[str, object]:
+        if self.cache is None:
+            return {"enabled": False}
+        with warehouse.connect(self.warehouse_path) as con:
+            return self.cache.stats(con)
+
+    def _query_sql(self, con: duckdb.DuckDBPyConnection, run_id: str) -> str:
+        row = con.execute("SELECT sql FROM query_history WHERE job_id = ?", [run_id]).fetchone()
+        if not row:
+            raise ValueError(f"Unknown run_id {run_id}")
+        return row[0]
+
+    def _record_success(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        run_id: str,
+        result_relation: Optional[str],
+        rows_affected: Optional[int],
+        result_bytes: Optional[int] = None,
+    ) -> None:
+        con.execute(
+            "UPDATE query_history SET status=?, completed_at=?, result_relation=?, error=NULL, "
+            "rows_affected=?, result_bytes=? WHERE job_id=?",
+            [
+                QueryJobStatus.SUCCESS.value,
+                datetime.now(UTC),
+                result_relation,
+                rows_affected,
+                result_bytes,
+                run_id,
+            ],
+        )
+
+    def fail(self, run_id: str, exc: Exception) -> None:
+        """Record ``run_id`` as failed with ``exc`` unless it already finished."""
+
+        with warehouse.connect(self.warehouse_path) as con:
+            con.execute(
+                "UPDATE query_history SET status=?, completed_at=?, error=?, rows_affected=NULL "
+                "WHERE job_id=? AND status IN (?, ?)",
+                [
+                    QueryJobStatus.FAILED.value,
+                    datetime.now(UTC),
+                    str(exc),
+                    run_id,
+                    QueryJobStatus.PENDING.value,
+                    QueryJobStatus.RUNNING.value,
+                ],
+            )
+
+    def _record_failure(self, con: duckdb.DuckDBPyConnection, run_id: str, exc: Exception) -> None:
+        con.execute(
+            "UPDATE query_history SET status=?, completed_at=?, error=?, rows_affected=NULL "
+            "WHERE job_id=?",
+            [QueryJobStatus.FAILED.value, datetime.now(UTC), str(exc), run_id],
+        )
+
+    def stream(
+        self,
+        run_id: str,
+        *,
+        persist: bool = False,
+        spill_rows: Optional[int] = None,
+        batch_size: int = DEFAULT_RESULT_BATCH_SIZE,
+    ) -> "QueryStream":
+        """Run a submitted query and stream its batches without CREATE TABLE AS.
+
+        With ``persist`` every batch is also written to ``query_result_<run_id>``;
+        with ``spill_rows`` that only starts once more than ``spill_rows`` rows
+        have been produced (up to that many rows are held in memory until then).
+        Use as a context manager; see :class:`QueryStream`.
+        """
+
+        return QueryStream(
+            self, run_id, persist=persist, spill_rows=spill_rows, batch_size=batch_size
+        )
+
     def fetch(self, run_id: str) -> Optional[QueryJob]:
-        with duckdb.connect(str(self.warehouse_path)) as con:
+        with warehouse.connect(self.warehouse_path) as con:
             row = con.execute(
-                "SELECT job_id, sql, status, submitted_at, completed_at, result_relation, error, rows_affected FROM query_history WHERE job_id=?",
+                "SELECT job_id, sql, status, submitted_at, completed_at, result_relation, error, "
+                "rows_affected, pinned, result_expired_at FROM query_history WHERE job_id=?",
                 [run_id],
             ).fetchone()
         if not row:
@@ -114,6 +278,9 @@ class QueryExecutionService:
         completed_at = row[4]
         if isinstance(completed_at, datetime) and completed_at.tzinfo is None:
             completed_at = completed_at.replace(tzinfo=UTC)
+        expired_at = row[9]
+        if isinstance(expired_at, datetime) and expired_at.tzinfo is None:
+            expired_at = expired_at.replace(tzinfo=UTC)
         status = QueryJobStatus(row[2])
         return QueryJob(
             run_id=row[0],
@@ -124,6 +291,245 @@ class QueryExecutionService:
             result_table=row[5],
             error=row[6],
             rows_affected=row[7],
+            pinned=bool(row[8]),
+            expired_at=expired_at,
+        )
+
+    def pin(self, run_id: str, pinned: bool = True) -> Optional[QueryJob]:
+        """Keep (or stop keeping) a job's result table through retention sweeps.
+
+        Returns None for an unknown run. A pinned result is also removed from the
+        result cache, so cache eviction cannot drop it either.
+        """
+
+        with warehouse.connect(self.warehouse_path) as con:
+            row = con.execute(
+                "UPDATE query_history SET pinned = ? WHERE job_id = ? RETURNING result_relation",
+                [pinned, run_id],
+            ).fetchone()
+            if row is None:
+                return None
+            if pinned and row[0] and self.cache is not None:
+                self.cache.forget(con, [row[0]])
+        return self.fetch(run_id)
+
+    def result_slice(
+        self,
+        job: QueryJob,
+        *,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> ResultSlice:
+        """Resolve which rows and columns of a finished job's result to return.
+
+        ``limit=None`` means every row after ``cursor``. Raises ``ValueError`` for an
+        unknown column or a malformed cursor.
+        """
+
+        if job.status != QueryJobStatus.SUCCESS or not job.result_table:
+            raise ValueError(f"Query {job.run_id} has no result (status {job.status.value})")
+        if job.expired_at is not None:
+            raise ValueError(f"The result of query {job.run_id} has expired")
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be at least 1")
+        after = decode_cursor(cursor) if cursor else None
+        relation = _quote_identifier(job.result_table)
+        with warehouse.connect(self.warehouse_path) as con:
+            described = [
+                (row[0], str(row[1])) for row in con.execute(f"DESCRIBE {relation}").fetchall()
+            ]
+            if columns:
+                types = dict(described)
+                unknown = [name for name in columns if name not in types]
+                if unknown:
+                    raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+                described = [(name, types[name]) for name in dict.fromkeys(columns)]
+            # Scans return rows in insertion (rowid) order as long as DuckDB's
+            # preserve_insertion_order is on, so no ORDER BY (and no sort) is needed.
+            window = f"SELECT rowid FROM {relation} WHERE rowid > ?"
+            if limit is not None:
+                window += f" LIMIT {int(limit)}"
+            rows, last_rowid = con.execute(
+                f"SELECT COUNT(*), MAX(rowid) FROM ({window})", [-1 if after is None else after]
+            ).fetchone()
+            has_more = last_rowid is not None and bool(
+                con.execute(
+                    f"SELECT EXISTS (SELECT 1 FROM {relation} WHERE rowid > ?)", [last_rowid]
+                ).fetchone()[0]
+            )
+        return ResultSlice(
+            run_id=job.run_id,
+            relation=job.result_table,
+            columns=described,
+            after=after,
+            last_rowid=last_rowid,
+            rows=int(rows),
+            has_more=has_more,
+        )
+
+    @contextmanager
+    def open_result(
+        self, result: ResultSlice, batch_size: int = DEFAULT_RESULT_BATCH_SIZE
+    ) -> Iterator[pa.RecordBatchReader]:
+        """Stream the rows of ``result`` as Arrow batches straight from DuckDB."""
+
+        projection = ", ".join(_quote_identifier(name) for name, _ in result.columns)
+        sql = (
+            f"SELECT {projection} FROM {_quote_identifier(result.relation)} "
+            "WHERE rowid > ? AND rowid <= ?"
+        )
+        # An empty slice still yields a reader, so clients get the schema.
+        bounds = [
+            -1 if result.after is None else result.after,
+            -1 if result.last_rowid is None else result.last_rowid,
+        ]
+        with warehouse.connect(self.warehouse_path) as con:
+            reader = arrow_reader(con.execute(sql, bounds), batch_size)
+            try:
+                yield reader
+            finally:
+                reader.close()
+
+
+class QueryStream:
+    """Batches of a query streamed straight from DuckDB, optionally spilled to a table.
+
+    Iterating yields the query's record batches as DuckDB produces them. The row
+    count recorded in ``query_history`` is summed from those batches. Once a
+    result table is being written, closing the stream early still drains the
+    rest of the query into it, so ``result_table`` always holds the full result;
+    otherwise an abandoned stream is recorded with an unknown row count.
+    """
+
+    def __init__(
+        self,
+        service: QueryExecutionService,
+        run_id: str,
+        *,
+        persist: bool,
+        spill_rows: Optional[int],
+        batch_size: int,
+    ) -> None:
+        self.service = service
+        self.run_id = run_id
+        self.persist = persist
+        self.spill_rows = spill_rows
+        self.rows = 0
+        self.result_table: Optional[str] = None
+        self._relation = service._sanitize_relation(run_id)
+        self._pending: List[pa.RecordBatch] = []
+        self._writes = False
+        self._exhausted = False
+        self._closed = False
+        self._resources = ExitStack()
+        try:
+            self._con = self._resources.enter_context(warehouse.connect(service.warehouse_path))
+            sql = service._query_sql(self._con, run_id)
+            self._writes = not is_read_only(sql)
+            try:
+                self._reader = arrow_reader(self._con.execute(sql), batch_size)
+            except duckdb.Error as exc:
+                service._record_failure(self._con, run_id, exc)
+                raise
+        except BaseException:
+            self._resources.close()
+            raise
+        self._writer: Optional[duckdb.DuckDBPyConnection] = None
+
+    @property
+    def schema(self) -> pa.Schema:
+        return self._reader.schema
+
+    def __enter__(self) -> "QueryStream":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close(exc if isinstance(exc, Exception) else None)
+
+    def __iter__(self) -> Iterator[pa.RecordBatch]:
+        for batch in self._reader:
+            self.rows += batch.num_rows
+            self._write(batch)
+            yield batch
+        self._exhausted = True
+
+    def _write(self, batch: pa.RecordBatch) -> None:
+        if self._writer is not None:
+            self._append(batch)
+            return
+        if self.persist or (self.spill_rows is not None and self.rows > self.spill_rows):
+            self._start_table(self._pending + [batch])
+            self._pending = []
+        elif self.spill_rows is not None:
+            self._pending.append(batch)
+
+    def _start_table(self, batches: List[pa.RecordBatch]) -> None:
+        self._writer = self._resources.enter_context(
+            warehouse.connect(self.service.warehouse_path)
         )
+        self._writer.begin()
+        table = pa.Table.from_batches(batches, schema=self._reader.schema)
+        self._writer.register("__pluto_stream_batch", table)
+        try:
+            self._writer.execute(
+                f"CREATE OR REPLACE TABLE {_quote_identifier(self._relation)} AS "
+                "SELECT * FROM __pluto_stream_batch"
+            )
+        finally:
+            self._writer.unregister("__pluto_stream_batch")
+
+    def _append(self, batch: pa.RecordBatch) -> None:
+        assert self._writer is not None
+        self._writer.register("__pluto_stream_batch", batch)
+        try:
+            self._writer.execute(
+                f"INSERT INTO {_quote_identifier(self._relation)} "
+                "SELECT * FROM __pluto_stream_batch"
+            )
+        finally:
+            self._writer.unregister("__pluto_stream_batch")
 
+    def close(self, error: Optional[Exception] = None) -> None:
+        """Finish the result table (if any) and record the outcome in ``query_history``."""
 
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if error is None:
+                try:
+                    if self._writer is not None and not self._exhausted:
+                        for batch in self._reader:
+                            self.rows += batch.num_rows
+                            self._append(batch)
+                        self._exhausted = True
+                    if self._writer is None and self.persist and self._exhausted:
+                        self._start_table([])
+                    if self._writer is not None:
+                        self._writer.commit()
+                        self.result_table = self._relation
+                except duckdb.Error as exc:
+                    error = exc
+            self._reader.close()
+            if error is not None:
+                if self._writer is not None:
+                    self._writer.rollback()
+                self.result_table = None
+                self.service._record_failure(self._con, self.run_id, error)
+            else:
+                size = None
+                if self.result_table is not None:
+                    size = estimate_bytes(self._con, self.result_table, self.rows)
+                self.service._record_success(
+                    self._con,
+                    self.run_id,
+                    self.result_table,
+                    self.rows if self._exhausted else None,
+                    size,
+                )
+            if self._writes:
+                # DML/DDL may have changed any table; cached results must not be reused.
+                table_versions.bump(self._con, [table_versions.ANY_TABLE])
+        finally:
+            self._resources.close()
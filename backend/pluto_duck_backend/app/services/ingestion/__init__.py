@@ -1,22 +1,48 @@
 """Ingestion service package with connector registry."""
 
-from .registry import ConnectorRegistry, get_registry
+from .jobs import (
+    IngestionJobManager,
+    IngestionJobRecord,
+    IngestionJobStatus,
+    get_ingestion_job_manager,
+)
+from .registry import ConnectorInfo, ConnectorRegistry, ConnectorUnavailable, get_registry
 from .service import IngestionJob, IngestionService
 
-__all__ = ["ConnectorRegistry", "get_registry", "IngestionService", "IngestionJob"]
+__all__ = [
+    "ConnectorInfo",
+    "ConnectorRegistry",
+    "ConnectorUnavailable",
+    "get_registry",
+    "IngestionService",
+    "IngestionJob",
+    "IngestionJobManager",
+    "IngestionJobRecord",
+    "IngestionJobStatus",
+    "get_ingestion_job_manager",
+]
+
+
+# Bundled connectors are imported on first use so that a missing optional driver
+# (e.g. psycopg) only disables its own connector.
+_BUNDLED_CONNECTORS = {
+    "csv": f"{__name__}.connectors.csv:CSVConnector",
+    "json": f"{__name__}.connectors.json:JSONConnector",
+    "parquet": f"{__name__}.connectors.parquet:ParquetConnector",
+    "postgres": f"{__name__}.connectors.postgres:PostgresConnector",
+    "sqlite": f"{__name__}.connectors.sqlite:SQLiteConnector",
+}
 
 
 def _register_bundled_connectors() -> None:
-    from .connectors import CSVConnector, ParquetConnector, PostgresConnector, SQLiteConnector
-
     registry = get_registry()
-    for connector in (CSVConnector, ParquetConnector, PostgresConnector, SQLiteConnector):
+    for name, target in _BUNDLED_CONNECTORS.items():
         try:
-            registry.register(connector)
+            registry.register_lazy(name, target)
         except ValueError:
             # Already registered
             pass
+    registry.discover_entry_points()
 
 
 _register_bundled_connectors()
-
@@ -4,8 +4,16 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional, Protocol
+from typing import Any, Dict, Iterable, List, Optional, Protocol
+
+import pyarrow as pa
+
+from .batches import DEFAULT_CHUNK_SIZE, chunked, rows_to_record_batch
+from .duckdb_loader import DuckDBLoader, ProgressCallback
+from .metrics import profile_batches, profile_rows
+from .scanner import ScannerSource
 
 
 @dataclass
@@ -15,15 +23,33 @@ class IngestionContext:
     target_table: str
     warehouse_path: Path
     overwrite: bool = False
+    chunk_size: Optional[int] = None
+    progress: Optional[ProgressCallback] = None
+
+
+@dataclass
+class Watermark:
+    """Incremental-sync position: only rows with ``column`` greater than ``value``."""
+
+    column: str
+    value: Any
 
 
 class BaseConnector(ABC):
     """Abstract base for all ingestion connectors."""
 
     name: str
+    # Connectors that set this filter their own extraction by ``self.watermark``.
+    supports_watermark: bool = False
+    # Connectors that set this load only ``self.retry_files`` when it is given.
+    supports_file_retry: bool = False
 
     def __init__(self, config: Dict[str, Any]) -> None:
         self.config = config
+        # Metadata persisted from this source's previous run (e.g. cached schemas).
+        self.state: Dict[str, Any] = {}
+        self.watermark: Optional[Watermark] = None
+        self.retry_files: Optional[List[str]] = None
 
     def open(self) -> None:  # pragma: no cover - overridable hook
         """Optional setup hook before ingestion begins."""
@@ -39,16 +65,85 @@ class BaseConnector(ABC):
     def stream_rows(self) -> Iterable[Dict[str, Any]]:
         """Yield rows as dictionaries."""
 
+    def stream_batches(self, batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterable[pa.RecordBatch]:
+        """Yield Arrow record batches of at most ``batch_size`` rows.
+
+        The default converts ``stream_rows`` chunk by chunk; connectors that can
+        produce columnar data directly override it.
+        """
+
+        for chunk in chunked(self.stream_rows(), batch_size):
+            yield rows_to_record_batch(chunk)
+
+    @property
+    def supports_batches(self) -> bool:
+        """Whether this connector produces batches natively (overrides ``stream_batches``)."""
+
+        return type(self).stream_batches is not BaseConnector.stream_batches
+
+    def fingerprint(self) -> Optional[str]:
+        """Cheap digest of the source contents, or None when it cannot be computed.
+
+        When it matches the fingerprint stored from the previous run the sync is
+        skipped, so it must change whenever the data might have.
+        """
+
+        return None
+
+    def preview(self, limit: int) -> pa.Table:
+        """At most ``limit`` rows for a schema probe, reading as little as possible.
+
+        Called between ``open`` and ``close``. The default takes the first batches
+        of ``stream_batches`` (or rows of ``stream_rows``) and stops reading there;
+        connectors override it to push the limit down to the source.
+        """
+
+        if not self.supports_batches:
+            return pa.Table.from_pylist(list(islice(self.stream_rows(), limit)))
+        batches: List[pa.RecordBatch] = []
+        remaining = limit
+        stream = iter(self.stream_batches(limit))
+        try:
+            for batch in stream:
+                batches.append(batch.slice(0, remaining))
+                remaining -= batches[-1].num_rows
+                if remaining <= 0:
+                    break
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        return pa.Table.from_batches(batches) if batches else pa.table({})
+
+    def scanner_source(self) -> Optional[ScannerSource]:
+        """Describe the source for DuckDB's attach-and-copy engine, if supported."""
+
+        return None
+
     def materialize(self, context: IngestionContext) -> int:
-        """Materialize the streamed rows into DuckDB (default implementation)."""
+        """Materialize the source into DuckDB, preferring Arrow batches over rows."""
+
+        if self.supports_batches:
+            return self._materialize_batches(context)
+        return self._materialize_rows(context)
 
-        from .duckdb_loader import DuckDBLoader
+    def _materialize_batches(self, context: IngestionContext) -> int:
+        loader = DuckDBLoader(context.warehouse_path)
+        return loader.load_batches(
+            context.target_table,
+            profile_batches(self.stream_batches(context.chunk_size or DEFAULT_CHUNK_SIZE)),
+            overwrite=context.overwrite,
+            progress=context.progress,
+        )
 
+    def _materialize_rows(self, context: IngestionContext) -> int:
         loader = DuckDBLoader(context.warehouse_path)
         return loader.load_dicts(
             context.target_table,
-            self.stream_rows(),
+            profile_rows(self.stream_rows()),
             overwrite=context.overwrite,
+            chunk_size=context.chunk_size,
+            progress=context.progress,
         )
 
 
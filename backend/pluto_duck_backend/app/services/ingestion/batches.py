@@ -0,0 +1,85 @@
+"""Helpers for turning Python rows into Arrow record batches."""
+
+from __future__ import annotations
+
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+import pyarrow as pa
+
+from .metrics import profile_stage
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def chunked(
+    rows: Iterable[Dict[str, object]], chunk_size: int
+) -> Iterator[List[Dict[str, object]]]:
+    """Yield lists of at most ``chunk_size`` rows without materializing the iterable."""
+
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _to_array(values: Sequence[object]) -> pa.Array:
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed Python types in one column; keep the data as text rather than failing.
+        return pa.array(
+            [None if value is None else str(value) for value in values], type=pa.string()
+        )
+
+
+def rows_to_record_batch(rows: Sequence[Dict[str, object]]) -> pa.RecordBatch:
+    """Convert a chunk of dict rows into a single record batch, column by column."""
+
+    with profile_stage("convert", len(rows)):
+        columns: Dict[str, List[object]] = {}
+        for index, row in enumerate(rows):
+            for key in row:
+                if key not in columns:
+                    # Column first seen mid-chunk: backfill earlier rows with nulls.
+                    columns[key] = [None] * index
+            for key, values in columns.items():
+                values.append(row.get(key))
+        return pa.RecordBatch.from_arrays(
+            [_to_array(values) for values in columns.values()],
+            names=list(columns.keys()),
+        )
+
+
+
+def tuples_to_record_batch(
+    names: Sequence[str], rows: Sequence[Sequence[object]]
+) -> pa.RecordBatch:
+    """Convert a chunk of positional rows (DB-API style) into a record batch.
+
+    Types are inferred from this chunk's values alone; :class:`DuckDBLoader`
+    widens the target table when a later chunk infers a wider type.
+    """
+
+    with profile_stage("convert", len(rows)):
+        columns = list(zip(*rows, strict=True)) if rows else [() for _ in names]
+        return pa.RecordBatch.from_arrays(
+            [_to_array(list(values)) for values in columns],
+            names=list(names),
+        )
+
+
+def arrow_reader(result: object, batch_size: int = DEFAULT_CHUNK_SIZE) -> pa.RecordBatchReader:
+    """Stream a DuckDB query result as Arrow record batches.
+
+    ``to_arrow_reader`` replaced ``fetch_record_batch`` in DuckDB 1.4.
+    """
+
+    reader_for = getattr(result, "to_arrow_reader", None)
+    if reader_for is None:
+        reader_for = result.fetch_record_batch  # type: ignore[attr-defined]
+    return reader_for(batch_size)
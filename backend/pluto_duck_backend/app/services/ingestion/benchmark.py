@@ -0,0 +1,331 @@
+"""Ingestion throughput benchmarks for the bundled connectors.
+
+Synthetic datasets are generated by DuckDB (``range()`` plus deterministic
+expressions) in a ``narrow`` (4 columns) or ``wide`` (40 columns) shape, written
+once per scale as CSV, Parquet, NDJSON and SQLite files under ``work_dir`` and
+reused by later runs. Postgres is benchmarked only when a DSN for a disposable
+local server is given.
+
+Every connector/engine path is then ingested into a fresh warehouse while wall
+time and peak RSS are recorded; :func:`run_benchmarks` returns a JSON-friendly
+report so results can be diffed across commits.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import platform
+import sqlite3
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+from uuid import uuid4
+
+import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from pluto_duck_backend.app.core.warehouse import get_warehouse_manager
+
+from .batches import arrow_reader
+from .duckdb_loader import _quote_identifier
+from .files import sql_string
+from .metrics import RSSSampler
+from .registry import ConnectorRegistry, get_registry
+from .service import IngestionJob, IngestionService
+
+logger = logging.getLogger(__name__)
+
+SHAPES = ("narrow", "wide")
+DEFAULT_SCALES = (10_000,)
+_SCALE_SUFFIXES = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+_SQLITE_INSERT_BATCH = 50_000
+
+
+@dataclass(frozen=True)
+class BenchmarkPath:
+    """One way of ingesting a dataset: a connector, a job engine and config overrides."""
+
+    connector: str
+    label: str
+    engine: str = "auto"
+    config: Dict[str, object] = field(default_factory=dict)
+
+
+BENCHMARK_PATHS = (
+    BenchmarkPath("csv", "duckdb"),
+    BenchmarkPath("csv", "python", config={"engine": "python"}),
+    BenchmarkPath("parquet", "duckdb"),
+    BenchmarkPath("json", "duckdb"),
+    BenchmarkPath("sqlite", "scanner", engine="scanner"),
+    BenchmarkPath("sqlite", "python", engine="python"),
+    BenchmarkPath("postgres", "scanner", engine="scanner"),
+    BenchmarkPath("postgres", "cursor", engine="python"),
+    BenchmarkPath("postgres", "copy", engine="python", config={"fetch_mode": "copy"}),
+)
+
+
+@dataclass
+class BenchmarkResult:
+    connector: str
+    path: str
+    shape: str
+    rows: int
+    rows_ingested: int = 0
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
+    input_bytes: Optional[int] = None
+    mb_per_second: Optional[float] = None
+    peak_rss_bytes: Optional[int] = None
+    peak_rss_delta_bytes: Optional[int] = None
+    error: Optional[str] = None
+
+
+def parse_scale(value: str) -> int:
+    """``"10K"`` -> 10000, ``"100M"`` -> 100000000; plain integers pass through."""
+
+    text = value.strip().upper().replace("_", "")
+    multiplier = _SCALE_SUFFIXES.get(text[-1:], 1)
+    number = text[:-1] if text[-1:] in _SCALE_SUFFIXES else text
+    try:
+        return int(float(number) * multiplier)
+    except ValueError as exc:
+        raise ValueError(f"Invalid benchmark scale '{value}'") from exc
+
+
+def dataset_sql(rows: int, shape: str) -> str:
+    """A deterministic SELECT producing ``rows`` synthetic rows."""
+
+    if shape == "narrow":
+        columns = [
+            "i AS id",
+            "TIMESTAMP '2024-01-01' + to_seconds(i) AS created_at",
+            "'category_' || (i % 50) AS category",
+            "((i * 7919) % 100000) / 100.0::DOUBLE AS amount",
+        ]
+    elif shape == "wide":
+        columns = ["i AS id"]
+        columns += [f"(i * {31 + n}) % 1000003 AS int_{n}" for n in range(9)]
+        columns += [f"((i * {17 + n}) % 100000) / 7.0::DOUBLE AS float_{n}" for n in range(10)]
+        columns += [f"'value_' || ((i + {n}) % 997) AS text_{n}" for n in range(10)]
+        columns += [f"TIMESTAMP '2024-01-01' + to_seconds(i + {n}) AS ts_{n}" for n in range(5)]
+        columns += [f"(i + {n}) % 3 = 0 AS flag_{n}" for n in range(5)]
+    else:
+        raise ValueError(f"Unknown benchmark shape '{shape}'")
+    return f"SELECT {', '.join(columns)} FROM range({int(rows)}) AS t(i)"
+
+
+class BenchmarkDatasets:
+    """Synthetic source files under ``directory``, generated on first use."""
+
+    def __init__(self, directory: Path, postgres_dsn: Optional[str] = None) -> None:
+        self.directory = directory
+        self.postgres_dsn = postgres_dsn
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, rows: int, shape: str, extension: str) -> Path:
+        return self.directory / f"{shape}_{rows}.{extension}"
+
+    def _copy(self, rows: int, shape: str, extension: str, options: str) -> Path:
+        path = self._file(rows, shape, extension)
+        if not path.exists():
+            partial = path.with_name(path.name + ".partial")
+            con = duckdb.connect()
+            try:
+                con.execute(
+                    f"COPY ({dataset_sql(rows, shape)}) TO {sql_string(str(partial))} ({options})"
+                )
+            finally:
+                con.close()
+            partial.rename(path)
+        return path
+
+    def csv(self, rows: int, shape: str) -> Path:
+        return self._copy(rows, shape, "csv", "FORMAT CSV, HEADER")
+
+    def parquet(self, rows: int, shape: str) -> Path:
+        return self._copy(rows, shape, "parquet", "FORMAT PARQUET")
+
+    def json(self, rows: int, shape: str) -> Path:
+        return self._copy(rows, shape, "ndjson", "FORMAT JSON")
+
+    def sqlite(self, rows: int, shape: str) -> Path:
+        path = self._file(rows, shape, "sqlite")
+        if path.exists():
+            return path
+        partial = path.with_name(path.name + ".partial")
+        partial.unlink(missing_ok=True)
+        con = duckdb.connect()
+        target = sqlite3.connect(partial)
+        try:
+            reader = arrow_reader(con.execute(dataset_sql(rows, shape)), _SQLITE_INSERT_BATCH)
+            names = reader.schema.names
+            target.execute(
+                f"CREATE TABLE data ({', '.join(_quote_identifier(name) for name in names)})"
+            )
+            insert = f"INSERT INTO data VALUES ({', '.join('?' for _ in names)})"
+            for batch in reader:
+                target.executemany(insert, _python_rows(batch, timestamps_as_text=True))
+            target.commit()
+        finally:
+            target.close()
+            con.close()
+        partial.rename(path)
+        return path
+
+    def postgres_table(self, rows: int, shape: str) -> str:
+        """Name of a Postgres table holding the dataset, created on first use."""
+
+        import psycopg
+
+        table = f"pluto_benchmark_{shape}_{rows}"
+        with psycopg.connect(self.postgres_dsn) as conn:
+            exists = conn.execute("SELECT to_regclass(%s) IS NOT NULL", [table]).fetchone()[0]
+            if exists:
+                return table
+            con = duckdb.connect()
+            try:
+                reader = arrow_reader(con.execute(dataset_sql(rows, shape)))
+                columns = ", ".join(
+                    f"{_quote_identifier(item.name)} {_postgres_type(item.type)}"
+                    for item in reader.schema
+                )
+                conn.execute(f"CREATE TABLE {table} ({columns})")
+                with conn.cursor().copy(f"COPY {table} FROM STDIN") as copy:
+                    for batch in reader:
+                        for row in _python_rows(batch):
+                            copy.write_row(row)
+            finally:
+                con.close()
+        return table
+
+    def input_bytes(self, connector: str, rows: int, shape: str) -> Optional[int]:
+        if connector == "postgres":
+            import psycopg
+
+            with psycopg.connect(self.postgres_dsn) as conn:
+                table = f"pluto_benchmark_{shape}_{rows}"
+                return int(conn.execute("SELECT pg_relation_size(%s)", [table]).fetchone()[0])
+        extension = {"json": "ndjson"}.get(connector, connector)
+        return self._file(rows, shape, extension).stat().st_size
+
+    def config(self, connector: str, rows: int, shape: str) -> Dict[str, object]:
+        if connector == "csv":
+            return {"path": str(self.csv(rows, shape))}
+        if connector == "parquet":
+            return {"path": str(self.parquet(rows, shape))}
+        if connector == "json":
+            return {"path": str(self.json(rows, shape))}
+        if connector == "sqlite":
+            return {"path": str(self.sqlite(rows, shape)), "query": "SELECT * FROM data"}
+        if connector == "postgres":
+            table = self.postgres_table(rows, shape)
+            return {"dsn": self.postgres_dsn, "query": f"SELECT * FROM {table}"}
+        raise ValueError(f"No benchmark dataset for connector '{connector}'")
+
+
+def _python_rows(batch: pa.RecordBatch, *, timestamps_as_text: bool = False) -> Iterable[tuple]:
+    columns = []
+    for column in batch.columns:
+        if timestamps_as_text and pa.types.is_timestamp(column.type):
+            # sqlite3's implicit datetime adapter is deprecated; store ISO text instead.
+            column = pc.strftime(column, format="%Y-%m-%d %H:%M:%S")
+        columns.append(column.to_pylist())
+    return zip(*columns, strict=True)
+
+
+def _postgres_type(data_type: pa.DataType) -> str:
+    if pa.types.is_integer(data_type):
+        return "BIGINT"
+    if pa.types.is_floating(data_type):
+        return "DOUBLE PRECISION"
+    if pa.types.is_timestamp(data_type):
+        return "TIMESTAMP"
+    if pa.types.is_boolean(data_type):
+        return "BOOLEAN"
+    return "TEXT"
+
+
+def run_benchmark(
+    datasets: BenchmarkDatasets,
+    path: BenchmarkPath,
+    rows: int,
+    shape: str,
+    *,
+    registry: Optional[ConnectorRegistry] = None,
+) -> BenchmarkResult:
+    """Ingest one dataset through one path into a throwaway warehouse."""
+
+    result = BenchmarkResult(connector=path.connector, path=path.label, shape=shape, rows=rows)
+    warehouse = datasets.directory / f"warehouse_{uuid4().hex[:8]}.duckdb"
+    try:
+        config = {**datasets.config(path.connector, rows, shape), **path.config}
+        result.input_bytes = datasets.input_bytes(path.connector, rows, shape)
+        service = IngestionService(registry or get_registry())
+        job = IngestionJob(
+            connector=path.connector,
+            target_table="benchmark",
+            warehouse_path=warehouse,
+            config=config,
+            engine=path.engine,
+        )
+        with RSSSampler() as sampler:
+            started = time.perf_counter()
+            outcome = service.run(job)
+            result.seconds = time.perf_counter() - started
+        result.rows_ingested = int(outcome.get("rows_ingested") or 0)
+        result.peak_rss_bytes = sampler.peak_rss
+        result.peak_rss_delta_bytes = sampler.peak_delta
+        if result.seconds > 0:
+            result.rows_per_second = round(result.rows_ingested / result.seconds, 1)
+            if result.input_bytes is not None:
+                result.mb_per_second = round(result.input_bytes / 1e6 / result.seconds, 2)
+        result.seconds = round(result.seconds, 4)
+    except Exception as exc:  # noqa: BLE001 - a failing path is reported, not fatal
+        logger.warning("Benchmark %s/%s failed: %s", path.connector, path.label, exc)
+        result.error = f"{type(exc).__name__}: {exc}"
+    finally:
+        get_warehouse_manager().close(warehouse)
+        for leftover in (warehouse, warehouse.with_name(warehouse.name + ".wal")):
+            leftover.unlink(missing_ok=True)
+    return result
+
+
+def run_benchmarks(
+    work_dir: Path,
+    *,
+    scales: Sequence[int] = DEFAULT_SCALES,
+    shapes: Sequence[str] = SHAPES,
+    connectors: Optional[Sequence[str]] = None,
+    postgres_dsn: Optional[str] = None,
+    registry: Optional[ConnectorRegistry] = None,
+) -> Dict[str, object]:
+    """Benchmark every selected path at every scale and shape; returns the JSON report."""
+
+    datasets = BenchmarkDatasets(work_dir, postgres_dsn=postgres_dsn)
+    paths: List[BenchmarkPath] = [
+        path
+        for path in BENCHMARK_PATHS
+        if (connectors is None or path.connector in connectors)
+        and (path.connector != "postgres" or postgres_dsn)
+    ]
+    results = [
+        run_benchmark(datasets, path, rows, shape, registry=registry)
+        for rows in scales
+        for shape in shapes
+        for path in paths
+    ]
+    return {
+        "generated_at": datetime.now(UTC).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "duckdb": duckdb.__version__,
+            "pyarrow": pa.__version__,
+        },
+        "results": [asdict(result) for result in results],
+    }
@@ -1,14 +1,40 @@
-"""Bundled ingestion connectors."""
+"""Bundled ingestion connectors.
 
-from .csv import CSVConnector
-from .parquet import ParquetConnector
-from .postgres import PostgresConnector
-from .sqlite import SQLiteConnector
+Connector modules are imported on attribute access so that importing this
+package does not require every connector's optional driver to be installed.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .csv import CSVConnector
+    from .json import JSONConnector
+    from .parquet import ParquetConnector
+    from .postgres import PostgresConnector
+    from .sqlite import SQLiteConnector
+
+_MODULES = {
+    "CSVConnector": ".csv",
+    "JSONConnector": ".json",
+    "ParquetConnector": ".parquet",
+    "PostgresConnector": ".postgres",
+    "SQLiteConnector": ".sqlite",
+}
 
 __all__ = [
     "CSVConnector",
+    "JSONConnector",
     "ParquetConnector",
     "PostgresConnector",
     "SQLiteConnector",
 ]
 
+
+def __getattr__(name: str) -> Any:
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
@@ -3,10 +3,45 @@
 from __future__ import annotations
 
 import csv
+import io
+import logging
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
 
-from ..base import BaseConnector
+import duckdb
+import pyarrow as pa
+
+from ..base import BaseConnector, IngestionContext
+from ..batches import DEFAULT_CHUNK_SIZE, chunked
+from ..duckdb_loader import DuckDBLoader
+from ..files import (
+    combined_fingerprint,
+    is_glob,
+    resolve_paths,
+    sampled_fingerprint,
+    sql_file_list,
+    sql_string,
+)
+from ..inference import (
+    DEFAULT_INFERENCE_ROWS,
+    ColumnConversionError,
+    convert_rows,
+    infer_schema,
+    normalize_type,
+)
+from ..multifile import (
+    DEFAULT_FILE_WORKERS,
+    SOURCE_FILE_COLUMN,
+    FileLoadReport,
+    load_files,
+    report_metadata,
+)
+from ..sources import SourceOptions, is_remote, open_decompressed, open_source, source_fingerprint
+
+logger = logging.getLogger(__name__)
+
+_CSV_SUFFIXES = (".csv", ".tsv", ".txt", ".gz", ".zst", ".bz2")
 
 
 def _coerce(value: str | None) -> object:
@@ -23,21 +58,323 @@ def _coerce(value: str | None) -> object:
 
 
 class CSVConnector(BaseConnector):
+    """CSV files loaded through DuckDB's parallel ``read_csv``.
+
+    ``path`` may be a file, a directory or a glob; gzip/zstd inputs are
+    decompressed by DuckDB on the fly. Dialect options (``delimiter``, ``quote``,
+    ``escape``, ``header``) and ``column_types`` (partial name -> DuckDB type
+    overrides) are passed through; anything not given is sniffed. Set
+    ``engine: "python"`` to force the pure-Python reader, which is also used as a
+    fallback when DuckDB rejects the file.
+
+    The Python reader fixes one type per column from the first ``inference_rows``
+    rows plus an optional systematic ``sample_ratio`` of the remainder, then
+    converts column chunks with Arrow casts. The inferred schema is reported as
+    ``inferred_schema`` and reused from ``state`` on later runs.
+
+    Directory and glob sources are loaded file by file on ``file_workers`` threads
+    with a ``_source_file`` column, unioned by name; per-file row counts and
+    failures are reported so failed files can be retried (``on_file_error`` is
+    ``"skip"`` by default, or ``"fail"``).
+
+    ``path`` may also be an ``http(s)://`` URL or an ``s3://bucket/key`` resolved
+    against ``s3_endpoint``; those are always read by the Python reader through
+    range requests (``block_size``, ``read_ahead``, ``max_parallel_requests``,
+    ``headers``). The Python reader decompresses gzip, bz2 and zstd as a stream and
+    can memory-map local files with ``mmap: true``.
+    """
+
     name = "csv"
+    supports_file_retry = True
 
     def __init__(self, config: Dict[str, object]) -> None:
         super().__init__(config)
-        self.path = Path(config["path"])
+        self.location = str(config["path"])
+        self.remote = is_remote(self.location)
+        self.path = Path(self.location)
+        self.source_options = SourceOptions.from_config(config)
+        self.delimiter = str(config["delimiter"]) if config.get("delimiter") else None
+        self.quote = str(config["quote"]) if config.get("quote") else None
+        self.escape = str(config["escape"]) if config.get("escape") else None
+        self.header = config.get("header")
+        self.compression = str(config["compression"]) if config.get("compression") else None
+        self.column_types: Dict[str, str] = {}
+        for key, value in dict(config.get("column_types") or {}).items():
+            try:
+                self.column_types[str(key)] = normalize_type(str(value))
+            except ValueError as exc:
+                raise ValueError(f"column_types['{key}']: {exc}") from exc
+        self.sample_size = int(config["sample_size"]) if config.get("sample_size") else None
+        self.engine = "python" if self.remote else str(config.get("engine", "duckdb"))
+        self.inference_rows = int(config.get("inference_rows", DEFAULT_INFERENCE_ROWS))
+        self.sample_ratio = float(config.get("sample_ratio", 0.0))
+        self._sniffed: Optional[Dict[str, object]] = None
+        self._inferred_schema: Optional[Dict[str, str]] = None
+        self._engine_used: Optional[str] = None
+        self.file_workers = int(config.get("file_workers", DEFAULT_FILE_WORKERS))
+        self.on_file_error = str(config.get("on_file_error", "skip"))
+        self._file_report: Optional[FileLoadReport] = None
+
+    @property
+    def multi_file(self) -> bool:
+        return not self.remote and (is_glob(self.location) or self.path.is_dir())
+
+    def files(self) -> List[Path]:
+        return resolve_paths(self.location, _CSV_SUFFIXES)
+
+    def inputs(self) -> List[Union[Path, str]]:
+        """Local files, or the single remote URL."""
+
+        return [self.location] if self.remote else list(self.files())
+
+    def _load_files(self) -> List[Union[Path, str]]:
+        """Inputs to load this run: only previously failed files when retrying."""
+
+        return [Path(file) for file in self.retry_files] if self.retry_files else self.inputs()
+
+    def fingerprint(self) -> Optional[str]:
+        if self.remote:
+            return source_fingerprint(open_source(self.location, self.source_options))
+        return combined_fingerprint(self.files(), sampled_fingerprint)
 
     def fetch_metadata(self) -> Dict[str, object]:
-        return {
-            "path": str(self.path),
+        metadata: Dict[str, object] = {
+            "path": self.location,
+            "files": len(self.inputs()),
         }
+        if self._engine_used:
+            metadata["engine"] = self._engine_used
+        if self._inferred_schema is not None:
+            metadata["inferred_schema"] = dict(self._inferred_schema)
+        if self._file_report is not None:
+            metadata.update(
+                report_metadata(self._file_report, self.state if self.retry_files else None)
+            )
+        sniffed = self.sniff()
+        if sniffed:
+            metadata.update(sniffed)
+        return metadata
 
-    def stream_rows(self) -> Iterable[Dict[str, object]]:
-        with self.path.open("r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                yield {key: _coerce(value) for key, value in row.items()}
+    def sniff(self) -> Optional[Dict[str, object]]:
+        """Dialect and column types detected by DuckDB from a sample of the first file.
 
+        Cached on the connector, so reporting metadata after a load costs no extra pass.
+        """
+
+        if self._sniffed is not None:
+            return self._sniffed or None
+        if self.remote:
+            self._sniffed = {}
+            return None
+        options = ""
+        if self.sample_size:
+            options = f", sample_size = {self.sample_size}"
+        try:
+            con = duckdb.connect()
+            try:
+                row = con.execute(
+                    f"SELECT Delimiter, Quote, HasHeader, Columns "
+                    f"FROM sniff_csv({sql_string(str(self.files()[0]))}{options})"
+                ).fetchone()
+            finally:
+                con.close()
+        except duckdb.Error:
+            logger.debug("DuckDB could not sniff %s", self.path, exc_info=True)
+            self._sniffed = {}
+            return None
+        delimiter, quote, has_header, columns = row
+        schema = {column["name"]: column["type"] for column in columns}
+        schema.update(self.column_types)
+        self._sniffed = {
+            "dialect": {"delimiter": delimiter, "quote": quote, "header": has_header},
+            "schema": schema,
+        }
+        return self._sniffed
+
+    def scan_sql(self, files: Optional[List[Path]] = None) -> str:
+        """SELECT over ``read_csv`` with the configured dialect and type overrides."""
+
+        options = []
+        if self.delimiter:
+            options.append(f"delim = {sql_string(self.delimiter)}")
+        if self.quote:
+            options.append(f"quote = {sql_string(self.quote)}")
+        if self.escape:
+            options.append(f"escape = {sql_string(self.escape)}")
+        if self.header is not None:
+            options.append(f"header = {'true' if self.header else 'false'}")
+        if self.compression:
+            options.append(f"compression = {sql_string(self.compression)}")
+        if self.sample_size:
+            options.append(f"sample_size = {self.sample_size}")
+        if self.column_types:
+            types = ", ".join(
+                f"{sql_string(column)}: {sql_string(column_type)}"
+                for column, column_type in self.column_types.items()
+            )
+            options.append(f"types = {{{types}}}")
+        rendered = "".join(f", {option}" for option in options)
+        return f"SELECT * FROM read_csv({sql_file_list(files or self.files())}{rendered})"
+
+    def materialize(self, context: IngestionContext) -> int:
+        if self.multi_file and self.engine != "python":
+            self._engine_used = "duckdb"
+            self._file_report = load_files(
+                context.warehouse_path,
+                context.target_table,
+                self._load_files(),
+                lambda file: self.scan_sql([file]),
+                overwrite=context.overwrite,
+                max_workers=self.file_workers,
+                on_error=self.on_file_error,
+            )
+            return self._file_report.rows
+        if self.engine != "python":
+            loader = DuckDBLoader(context.warehouse_path)
+            try:
+                rows = loader.load_query(
+                    context.target_table, self.scan_sql(), overwrite=context.overwrite
+                )
+            except duckdb.Error as exc:
+                logger.warning(
+                    "DuckDB read_csv failed for %s (%s); using Python reader", self.path, exc
+                )
+            else:
+                self._engine_used = "duckdb"
+                return rows
+        self._engine_used = "python"
+        schema = self.infer_schema()
+        while True:
+            try:
+                return super().materialize(context)
+            except ColumnConversionError as exc:
+                # The sample missed a non-conforming value; widen just that column and
+                # reload (the failed attempt was rolled back).
+                logger.info("Widening CSV column %s to VARCHAR: %s", exc.column, exc)
+                schema[exc.column] = "VARCHAR"
+
+    def _read_options(self) -> Dict[str, str]:
+        options: Dict[str, str] = {}
+        if self.delimiter:
+            options["delimiter"] = self.delimiter
+        if self.quote:
+            options["quotechar"] = self.quote
+        if self.escape:
+            options["escapechar"] = self.escape
+        return options
+
+    def _open_text(self, file: Union[Path, str]) -> io.TextIOWrapper:
+        source = open_source(file, self.source_options)
+        stream = open_decompressed(source, self.compression or "auto")
+        return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+    def _read_file(self, file: Union[Path, str]) -> Iterator[List[str]]:
+        """Rows of ``file``, header first; ``header: false`` names columns like DuckDB."""
+
+        with self._open_text(file) as f:
+            reader = csv.reader(f, **self._read_options())
+            if self.header is not None and not self.header:
+                first = next(reader, None)
+                if first is None:
+                    return
+                yield [f"column{index}" for index in range(len(first))]
+                yield first
+            yield from reader
+
+    def _header(self) -> List[str]:
+        """Columns of every input file by name, in the order they are first seen."""
+
+        columns: Dict[str, None] = {}
+        for file in self.inputs():
+            rows = self._read_file(file)
+            try:
+                columns.update(dict.fromkeys(next(rows, [])))
+            finally:
+                rows.close()
+        return list(columns)
+
+    def _sample(self, columns: Sequence[str]) -> Iterator[List[str]]:
+        """First ``inference_rows`` data rows, then every n-th row if ``sample_ratio`` is set."""
+
+        stride = round(1 / self.sample_ratio) if self.sample_ratio > 0 else 0
+        taken = 0
+        for file in self.inputs():
+            rows = self._read_file(file)
+            header = next(rows, [])
+            positions = [header.index(column) if column in header else None for column in columns]
+            for index, row in enumerate(rows):
+                if taken < self.inference_rows:
+                    taken += 1
+                elif not stride:
+                    return
+                elif index % stride:
+                    continue
+                yield [
+                    row[pos] if pos is not None and pos < len(row) else None for pos in positions
+                ]
+
+    def infer_schema(self) -> Dict[str, str]:
+        """Per-column DuckDB types for the Python reader, inferred once and cached."""
+
+        if self._inferred_schema is not None:
+            return self._inferred_schema
+        columns = self._header()
+        cached = self.state.get("inferred_schema")
+        if isinstance(cached, dict) and list(cached.keys()) == columns:
+            schema = {str(key): str(value) for key, value in cached.items()}
+        else:
+            schema = infer_schema(columns, self._sample(columns))
+        schema.update((key, value) for key, value in self.column_types.items() if key in schema)
+        self._inferred_schema = schema
+        return schema
+
+    def preview(self, limit: int) -> pa.Table:
+        """Types inferred from, and rows of, only the first ``limit`` lines of the first file."""
+
+        rows = self._read_file(self.inputs()[0])
+        try:
+            header = next(rows, [])
+            sample = list(islice(rows, limit))
+        finally:
+            rows.close()
+        schema = infer_schema(header, sample)
+        schema.update((key, value) for key, value in self.column_types.items() if key in schema)
+        return pa.Table.from_batches([convert_rows(schema, sample)])
+
+    def stream_rows(self) -> Iterable[Dict[str, object]]:
+        for file in self.inputs():
+            rows = self._read_file(file)
+            header = next(rows, [])
+            for row in rows:
+                if row:
+                    yield {
+                        key: _coerce(row[index] if index < len(row) else None)
+                        for index, key in enumerate(header)
+                    }
 
+    def stream_batches(self, batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterable[pa.RecordBatch]:
+        schema = self.infer_schema()
+        columns = list(schema.keys())
+        tag_files = self.multi_file
+        if tag_files:
+            self._file_report = FileLoadReport()
+        for file in self._load_files():
+            rows = self._read_file(file)
+            header = next(rows, [])
+            positions = [header.index(column) if column in header else None for column in columns]
+            for chunk in chunked(rows, batch_size):
+                projected = [
+                    [row[pos] if pos is not None and pos < len(row) else None for pos in positions]
+                    for row in chunk
+                ]
+                batch = convert_rows(schema, projected)
+                if tag_files:
+                    batch = pa.RecordBatch.from_arrays(
+                        [*batch.columns, pa.array([str(file)] * batch.num_rows, pa.string())],
+                        names=[*batch.schema.names, SOURCE_FILE_COLUMN],
+                    )
+                    report = self._file_report
+                    key = str(file)
+                    report.file_rows[key] = report.file_rows.get(key, 0) + batch.num_rows
+                    report.rows += batch.num_rows
+                yield batch
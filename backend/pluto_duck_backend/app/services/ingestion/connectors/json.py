@@ -0,0 +1,277 @@
+"""JSON / newline-delimited JSON file connector."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pa_json
+
+from ..base import BaseConnector, IngestionContext
+from ..batches import DEFAULT_CHUNK_SIZE, arrow_reader
+from ..duckdb_loader import DuckDBLoader, _quote_identifier
+from ..files import (
+    combined_fingerprint,
+    is_glob,
+    resolve_paths,
+    sampled_fingerprint,
+    sql_file_list,
+    sql_string,
+)
+from ..multifile import DEFAULT_FILE_WORKERS, FileLoadReport, load_files, report_metadata
+from ..sources import SourceOptions, is_remote, open_decompressed, open_source, source_fingerprint
+
+_JSON_SUFFIXES = tuple(
+    base + compressed
+    for base in (".json", ".jsonl", ".ndjson")
+    for compressed in ("", ".gz", ".zst", ".bz2")
+)
+JSON_FORMATS = ("auto", "newline_delimited", "array")
+
+# (path of struct field names from the top-level column, output column name)
+FlatColumn = Tuple[Tuple[str, ...], str]
+
+
+def flattened_columns(schema: pa.Schema, depth: int, separator: str = "_") -> List[FlatColumn]:
+    """Output columns after expanding struct fields up to ``depth`` levels.
+
+    ``{"user": {"id": 1, "geo": {"lat": 0}}}`` flattened with depth 1 yields
+    ``user_id`` and ``user_geo`` (still a struct); lists are kept as lists.
+    """
+
+    columns: List[FlatColumn] = []
+
+    def visit(path: Tuple[str, ...], data_type: pa.DataType, remaining: int) -> None:
+        if pa.types.is_struct(data_type) and remaining > 0 and data_type.num_fields:
+            for index in range(data_type.num_fields):
+                child = data_type.field(index)
+                visit(path + (child.name,), child.type, remaining - 1)
+        else:
+            columns.append((path, separator.join(path)))
+
+    for field in schema:
+        visit((field.name,), field.type, depth)
+    return columns
+
+
+def flatten_batch(batch: pa.RecordBatch, columns: Sequence[FlatColumn]) -> pa.RecordBatch:
+    arrays = []
+    for path, _ in columns:
+        array = batch.column(path[0])
+        for name in path[1:]:
+            array = pc.struct_field(array, name)
+        arrays.append(array)
+    return pa.RecordBatch.from_arrays(arrays, names=[name for _, name in columns])
+
+
+class JSONConnector(BaseConnector):
+    """JSON and newline-delimited JSON files parsed by DuckDB's ``read_json``.
+
+    ``path`` may be a file, a directory, a glob or an ``http(s)://`` / ``s3://``
+    URL. ``format`` is ``"auto"`` (default), ``"newline_delimited"`` or ``"array"``;
+    nested objects become STRUCT columns and arrays LIST columns. ``flatten``
+    (``true`` for every level, or a depth) expands struct fields into top-level
+    columns joined with ``flatten_separator`` (``"_"``).
+
+    Local files are loaded entirely inside DuckDB (parallel for NDJSON, gzip/zstd
+    decompressed on the fly) and streamed out as Arrow batches when batches are
+    requested. Remote NDJSON, and bz2 files which DuckDB cannot decompress, are
+    parsed with Arrow's streaming JSON reader over the byte-source layer. Directory
+    and glob sources are loaded per file with a ``_source_file`` column like the CSV
+    and Parquet connectors.
+    """
+
+    name = "json"
+    supports_file_retry = True
+
+    def __init__(self, config: Dict[str, object]) -> None:
+        super().__init__(config)
+        self.location = str(config["path"])
+        self.remote = is_remote(self.location)
+        self.path = Path(self.location)
+        self.source_options = SourceOptions.from_config(config)
+        self.format = str(config.get("format", "auto"))
+        if self.format not in JSON_FORMATS:
+            raise ValueError(f"Unknown JSON format '{self.format}'")
+        flatten = config.get("flatten", False)
+        self.flatten_depth = 0 if not flatten else 64 if flatten is True else int(flatten)
+        self.flatten_separator = str(config.get("flatten_separator", "_"))
+        self.compression = str(config["compression"]) if config.get("compression") else None
+        self.sample_size = int(config["sample_size"]) if config.get("sample_size") else None
+        self.file_workers = int(config.get("file_workers", DEFAULT_FILE_WORKERS))
+        self.on_file_error = str(config.get("on_file_error", "skip"))
+        self._file_report: Optional[FileLoadReport] = None
+        self._schema: Optional[pa.Schema] = None
+
+    @property
+    def multi_file(self) -> bool:
+        return not self.remote and (is_glob(self.location) or self.path.is_dir())
+
+    def files(self) -> List[Path]:
+        return resolve_paths(self.location, _JSON_SUFFIXES)
+
+    def _parsed_by_arrow(self, location: Union[Path, str]) -> bool:
+        """Whether ``location`` is read by Arrow rather than DuckDB's ``read_json``."""
+
+        if isinstance(location, str) and is_remote(location):
+            return True
+        return self.compression == "bz2" or str(location).lower().endswith(".bz2")
+
+    def _duckdb_files(self) -> List[Path]:
+        return [file for file in self.files() if not self._parsed_by_arrow(file)]
+
+    @property
+    def streamed(self) -> bool:
+        """Whether the whole source goes through the Arrow reader."""
+
+        return self.remote or (not self.multi_file and self._parsed_by_arrow(self.location))
+
+    def inputs(self) -> List[Union[Path, str]]:
+        """Local files, or the single remote URL."""
+
+        return [self.location] if self.remote else list(self.files())
+
+    def fingerprint(self) -> Optional[str]:
+        if self.remote:
+            return source_fingerprint(open_source(self.location, self.source_options))
+        return combined_fingerprint(self.files(), sampled_fingerprint)
+
+    def fetch_metadata(self) -> Dict[str, object]:
+        metadata: Dict[str, object] = {
+            "path": self.location,
+            "files": len(self.inputs()),
+            "engine": "python" if self.streamed else "duckdb",
+        }
+        if self._schema is not None:
+            metadata["schema"] = {field.name: str(field.type) for field in self._schema}
+        if self._file_report is not None:
+            metadata.update(
+                report_metadata(self._file_report, self.state if self.retry_files else None)
+            )
+        return metadata
+
+    def _read_json_sql(self, files: Sequence[Path]) -> str:
+        options = [f"format = {sql_string(self.format)}"]
+        if self.compression:
+            options.append(f"compression = {sql_string(self.compression)}")
+        if self.sample_size:
+            options.append(f"sample_size = {self.sample_size}")
+        if len(files) > 1:
+            options.append("union_by_name = true")
+        rendered = "".join(f", {option}" for option in options)
+        return f"SELECT * FROM read_json({sql_file_list(files)}{rendered})"
+
+    def scan_sql(self, files: Optional[List[Path]] = None) -> str:
+        """SELECT over ``read_json`` with struct fields flattened when configured."""
+
+        raw = self._read_json_sql(files or self._duckdb_files())
+        if not self.flatten_depth:
+            return raw
+        con = duckdb.connect()
+        try:
+            result = con.execute(f"SELECT * FROM ({raw}) AS pluto_json LIMIT 0")
+            schema = arrow_reader(result).schema
+        finally:
+            con.close()
+        projection = []
+        for path, name in flattened_columns(schema, self.flatten_depth, self.flatten_separator):
+            expression = _quote_identifier(path[0])
+            for field_name in path[1:]:
+                expression = f"struct_extract({expression}, {sql_string(field_name)})"
+            projection.append(f"{expression} AS {_quote_identifier(name)}")
+        return f"SELECT {', '.join(projection)} FROM ({raw}) AS pluto_json"
+
+    def materialize(self, context: IngestionContext) -> int:
+        if self.multi_file:
+            files = [Path(file) for file in self.retry_files] if self.retry_files else self.files()
+            self._file_report = load_files(
+                context.warehouse_path,
+                context.target_table,
+                files,
+                self._scan_file,
+                overwrite=context.overwrite,
+                max_workers=self.file_workers,
+                on_error=self.on_file_error,
+            )
+            rows = self._file_report.rows
+        elif self.streamed:
+            return super().materialize(context)
+        else:
+            rows = DuckDBLoader(context.warehouse_path).load_query(
+                context.target_table, self.scan_sql(), overwrite=context.overwrite
+            )
+        # DuckDB loaded the files without streaming batches; report the schema it chose.
+        self._schema = DuckDBLoader(context.warehouse_path).table_schema(context.target_table)
+        return rows
+
+    def _scan_file(self, file: Path) -> Union[str, pa.RecordBatchReader]:
+        return self._arrow_reader(file) if self._parsed_by_arrow(file) else self.scan_sql([file])
+
+    def stream_batches(self, batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterable[pa.RecordBatch]:
+        if self.streamed:
+            yield from self._stream_arrow(self.location, batch_size)
+            return
+        if self._duckdb_files():
+            con = duckdb.connect()
+            try:
+                reader = arrow_reader(con.execute(self.scan_sql()), batch_size)
+                self._schema = reader.schema
+                yield from reader
+            finally:
+                con.close()
+        for file in self.files():
+            if self._parsed_by_arrow(file):
+                yield from self._stream_arrow(file, batch_size)
+
+    def _stream_arrow(
+        self, location: Union[Path, str], batch_size: int
+    ) -> Iterable[pa.RecordBatch]:
+        reader = self._arrow_reader(location)
+        self._schema = reader.schema
+        for batch in reader:
+            for offset in range(0, batch.num_rows, batch_size):
+                yield batch.slice(offset, batch_size)
+
+    def _arrow_reader(self, location: Union[Path, str]) -> pa.RecordBatchReader:
+        """Arrow's streaming JSON reader over ``location``, flattened when configured."""
+
+        if self.format == "array":
+            raise ValueError("Remote and bz2 JSON sources must be newline-delimited")
+        stream = open_decompressed(
+            open_source(location, self.source_options), self.compression or "auto"
+        )
+        try:
+            reader = pa_json.open_json(
+                stream, read_options=pa_json.ReadOptions(block_size=self.source_options.block_size)
+            )
+        except BaseException:
+            stream.close()
+            raise
+        columns = flattened_columns(reader.schema, self.flatten_depth, self.flatten_separator)
+        schema = reader.schema
+        if self.flatten_depth:
+            schema = flatten_batch(pa.RecordBatch.from_pylist([], schema=schema), columns).schema
+
+        def batches() -> Iterable[pa.RecordBatch]:
+            with stream:
+                for batch in reader:
+                    yield flatten_batch(batch, columns) if self.flatten_depth else batch
+
+        return pa.RecordBatchReader.from_batches(schema, batches())
+
+    def preview(self, limit: int) -> pa.Table:
+        if self.streamed or not self._duckdb_files():
+            return super().preview(limit)
+        con = duckdb.connect()
+        try:
+            preview_sql = f"SELECT * FROM ({self.scan_sql()}) AS pluto_preview LIMIT {int(limit)}"
+            return arrow_reader(con.execute(preview_sql)).read_all()
+        finally:
+            con.close()
+
+    def stream_rows(self) -> Iterable[Dict[str, object]]:
+        for batch in self.stream_batches():
+            yield from batch.to_pylist()
@@ -2,33 +2,210 @@
 
 from __future__ import annotations
 
+import hashlib
+import struct
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 
+import duckdb
+import pyarrow as pa
 import pyarrow.parquet as pq
 
-from ..base import BaseConnector
+from ..base import BaseConnector, IngestionContext
+from ..batches import DEFAULT_CHUNK_SIZE, arrow_reader
+from ..duckdb_loader import DuckDBLoader, _quote_identifier
+from ..files import combined_fingerprint, is_glob, resolve_paths, sql_file_list
+from ..multifile import DEFAULT_FILE_WORKERS, FileLoadReport, load_files, report_metadata
+from ..sources import SourceOptions, is_remote, open_source, source_fingerprint
 
 
 class ParquetConnector(BaseConnector):
+    """Parquet files scanned natively by DuckDB.
+
+    ``path`` may be a single file, a directory (searched recursively) or a glob.
+    Optional config: ``columns`` (projection), ``filter`` (SQL predicate pushed
+    into the scan so DuckDB can skip row groups via min/max statistics),
+    ``hive_partitioning`` and ``union_by_name``.
+
+    Directory and glob sources are loaded file by file on ``file_workers`` threads
+    and tagged with a ``_source_file`` column; per-file row counts and failures
+    are reported so failed files can be retried on their own. ``on_file_error``
+    is ``"skip"`` (default) or ``"fail"``.
+
+    An ``http(s)://`` or ``s3://`` (with ``s3_endpoint``) ``path`` is read with
+    pyarrow over range requests, so only the footer and the projected column
+    chunks are fetched; ``mmap: true`` memory-maps local files for batch reads.
+    """
+
     name = "parquet"
+    supports_file_retry = True
 
     def __init__(self, config: Dict[str, object]) -> None:
         super().__init__(config)
-        self.path = Path(config["path"])
+        self.location = str(config["path"])
+        self.remote = is_remote(self.location)
+        self.path = Path(self.location)
+        self.source_options = SourceOptions.from_config(config)
+        columns = config.get("columns")
+        self.columns: Optional[List[str]] = [str(column) for column in columns] if columns else None
+        self.filter = str(config["filter"]) if config.get("filter") else None
+        self.hive_partitioning = bool(config.get("hive_partitioning", False))
+        self.union_by_name = bool(config.get("union_by_name", False))
+        self.file_workers = int(config.get("file_workers", DEFAULT_FILE_WORKERS))
+        self.on_file_error = str(config.get("on_file_error", "skip"))
+        self._file_report: Optional[FileLoadReport] = None
+
+    @property
+    def multi_file(self) -> bool:
+        return not self.remote and (is_glob(self.location) or self.path.is_dir())
+
+    def files(self) -> List[Path]:
+        return resolve_paths(self.location, (".parquet", ".parq"))
+
+    def inputs(self) -> List[Union[Path, str]]:
+        """Local files, or the single remote URL."""
+
+        return [self.location] if self.remote else list(self.files())
+
+    def fingerprint(self) -> Optional[str]:
+        if self.remote:
+            return source_fingerprint(open_source(self.location, self.source_options))
+        return combined_fingerprint(self.files(), _footer_fingerprint)
+
+    @contextmanager
+    def _open(self, file: Union[Path, str]) -> Iterator[pq.ParquetFile]:
+        if not self.remote:
+            parquet_file = pq.ParquetFile(file, memory_map=self.source_options.use_mmap)
+            try:
+                yield parquet_file
+            finally:
+                parquet_file.close()
+            return
+        with open_source(file, self.source_options).open() as stream:
+            yield pq.ParquetFile(stream)
 
     def fetch_metadata(self) -> Dict[str, object]:
-        metadata = pq.read_metadata(self.path)
-        return {
-            "path": str(self.path),
-            "rows": metadata.num_rows,
-            "columns": metadata.num_columns,
+        files = self.inputs()
+        rows = 0
+        row_groups = 0
+        total_bytes = 0
+        num_columns = 0
+        failed = set(self._file_report.failed_files) if self._file_report else set()
+        for file in files:
+            if str(file) in failed:
+                continue
+            with self._open(file) as parquet_file:
+                footer = parquet_file.metadata
+            rows += footer.num_rows
+            row_groups += footer.num_row_groups
+            num_columns = max(num_columns, footer.num_columns)
+            total_bytes += self._scanned_bytes(footer)
+        metadata: Dict[str, object] = {
+            "path": self.location,
+            "files": len(files),
+            "rows": rows,
+            "row_groups": row_groups,
+            "bytes": total_bytes,
+            "columns": len(self.columns) if self.columns else num_columns,
+            "engine": "python" if self.remote else "duckdb",
         }
+        if self._file_report is not None:
+            metadata.update(
+                report_metadata(self._file_report, self.state if self.retry_files else None)
+            )
+        return metadata
+
+    def _scanned_bytes(self, metadata: pq.FileMetaData) -> int:
+        """Compressed bytes of the projected column chunks, read from the footer."""
+
+        wanted = set(self.columns) if self.columns else None
+        total = 0
+        for group_index in range(metadata.num_row_groups):
+            row_group = metadata.row_group(group_index)
+            for column_index in range(row_group.num_columns):
+                chunk = row_group.column(column_index)
+                if wanted is None or chunk.path_in_schema.split(".")[0] in wanted:
+                    total += chunk.total_compressed_size
+        return total
+
+    def scan_sql(self, files: Optional[List[Path]] = None) -> str:
+        """SELECT over ``read_parquet`` with projection and filter applied."""
+
+        projection = (
+            ", ".join(_quote_identifier(column) for column in self.columns) if self.columns else "*"
+        )
+        options = ""
+        if self.hive_partitioning:
+            options += ", hive_partitioning = true"
+        if self.union_by_name:
+            options += ", union_by_name = true"
+        file_list = sql_file_list(files or self.files())
+        sql = f"SELECT {projection} FROM read_parquet({file_list}{options})"
+        if self.filter:
+            sql += f" WHERE {self.filter}"
+        return sql
+
+    def materialize(self, context: IngestionContext) -> int:
+        if self.multi_file:
+            files = [Path(file) for file in self.retry_files] if self.retry_files else self.files()
+            self._file_report = load_files(
+                context.warehouse_path,
+                context.target_table,
+                files,
+                lambda file: self.scan_sql([file]),
+                overwrite=context.overwrite,
+                max_workers=self.file_workers,
+                on_error=self.on_file_error,
+            )
+            return self._file_report.rows
+        if self.remote:
+            # DuckDB cannot reach the URL without httpfs; stream row groups instead.
+            return super().materialize(context)
+        loader = DuckDBLoader(context.warehouse_path)
+        return loader.load_query(context.target_table, self.scan_sql(), overwrite=context.overwrite)
+
+    def stream_batches(self, batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterable[pa.RecordBatch]:
+        for file in self.inputs():
+            with self._open(file) as parquet_file:
+                yield from parquet_file.iter_batches(batch_size=batch_size, columns=self.columns)
+
+    def preview(self, limit: int) -> pa.Table:
+        """The first ``limit`` rows, normally from the first row group of the first file."""
+
+        if self.filter and not self.remote:
+            # The predicate may skip the first row groups; let DuckDB find matches.
+            con = duckdb.connect()
+            try:
+                scan = self.scan_sql()
+                preview_sql = f"SELECT * FROM ({scan}) AS pluto_preview LIMIT {int(limit)}"
+                return arrow_reader(con.execute(preview_sql)).read_all()
+            finally:
+                con.close()
+        with self._open(self.inputs()[0]) as parquet_file:
+            batches = parquet_file.iter_batches(batch_size=limit, columns=self.columns)
+            batch = next(batches, None)
+            if batch is None:
+                return parquet_file.schema_arrow.empty_table()
+            return pa.Table.from_batches([batch])
 
     def stream_rows(self) -> Iterable[Dict[str, object]]:
-        table = pq.read_table(self.path)
-        for batch in table.to_batches():
-            for row in batch.to_pylist():
-                yield row
+        for batch in self.stream_batches():
+            yield from batch.to_pylist()
+
 
+def _footer_fingerprint(path: Path) -> str:
+    """Size, mtime and a hash of the Parquet footer, which encodes every row group's stats."""
 
+    stat = path.stat()
+    digest = hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with path.open("rb") as handle:
+        if stat.st_size >= 8:
+            handle.seek(stat.st_size - 8)
+            tail = handle.read(8)
+            footer_length = struct.unpack("<I", tail[:4])[0]
+            if tail[4:] == b"PAR1" and footer_length + 8 <= stat.st_size:
+                handle.seek(stat.st_size - 8 - footer_length)
+                digest.update(handle.read(footer_length))
+            digest.update(tail)
+    return digest.hexdigest()
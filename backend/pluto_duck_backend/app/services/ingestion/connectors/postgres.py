@@ -1,22 +1,54 @@
-"""PostgreSQL connector."""
+"""PostgreSQL connector.
+
+Rows are read through a named (server-side) cursor so the client only ever holds
+``itersize`` rows, or with ``fetch_mode: "copy"`` via ``COPY ... TO STDOUT (FORMAT
+BINARY)``, which skips text parsing and per-row protocol round trips entirely.
+
+Partitioned extractions export the snapshot of a coordinating ``REPEATABLE READ``
+transaction (``pg_export_snapshot``) and import it on every worker connection, so
+all partitions, and the range bounds they were split on, see the same data. Where
+the server refuses to export one (e.g. behind a transaction-pooling proxy), each
+partition falls back to its own snapshot and the extract is not consistent.
+"""
 
 from __future__ import annotations
 
-from typing import Dict, Iterable
+import logging
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import psycopg
+import pyarrow as pa
+from psycopg import sql
 
 from ..base import BaseConnector
+from ..batches import DEFAULT_CHUNK_SIZE, tuples_to_record_batch
+from ..duckdb_loader import _quote_identifier
+from ..files import sql_string
+from ..partitioning import PartitionSpec, Predicate, parallel_batches
+from ..scanner import ScannerSource
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ITERSIZE = 10_000
+_CURSOR_NAME = "pluto_duck_extract"
 
 
 class PostgresConnector(BaseConnector):
     name = "postgres"
+    supports_watermark = True
 
     def __init__(self, config: Dict[str, object]) -> None:
         super().__init__(config)
         self.dsn = str(config.get("dsn"))
         self.query = str(config.get("query", "SELECT 1"))
+        self.fetch_mode = str(config.get("fetch_mode", "cursor"))
+        if self.fetch_mode not in ("cursor", "copy"):
+            raise ValueError(f"Unknown Postgres fetch_mode '{self.fetch_mode}'")
+        self.itersize = int(config.get("itersize", DEFAULT_ITERSIZE))
+        self.partition = PartitionSpec.from_config(config)
         self._conn: psycopg.Connection | None = None
+        self._partition_count: Optional[int] = None
 
     def open(self) -> None:
         self._conn = psycopg.connect(self.dsn)
@@ -25,17 +57,182 @@ class PostgresConnector(BaseConnector):
         if self._conn is not None:
             self._conn.close()
 
+    def _source_query(
+        self, predicate: Optional[Predicate] = None
+    ) -> Tuple[str, Optional[List[object]]]:
+        """The configured query, narrowed by the watermark and a partition predicate."""
+
+        conditions: List[str] = []
+        params: List[object] = []
+        if self.watermark is not None:
+            conditions.append(f"{_quote_identifier(self.watermark.column)} > %s")
+            params.append(self.watermark.value)
+        if predicate is not None:
+            clause, predicate_params = predicate
+            # Explicit predicates are raw SQL; keep any literal '%' intact.
+            conditions.append(clause if predicate_params else clause.replace("%", "%%"))
+            params.extend(predicate_params)
+        if not conditions:
+            return self.query, None
+        # Once parameters are bound psycopg treats '%' as a placeholder marker.
+        query = self.query.replace("%", "%%")
+        return (
+            f"SELECT * FROM ({query}) AS pluto_source WHERE {' AND '.join(conditions)}",
+            params,
+        )
+
+    def scanner_source(self) -> Optional[ScannerSource]:
+        query, params = self._source_query()
+        if params:
+            query = psycopg.ClientCursor(self._connection()).mogrify(query, params)
+        # postgres_query ships the statement to Postgres verbatim, keeping its dialect.
+        return ScannerSource(
+            extension="postgres",
+            attach_type="postgres",
+            attach_target=self.dsn,
+            select_sql=f"SELECT * FROM postgres_query({{source}}, {sql_string(query)})",
+        )
+
     def fetch_metadata(self) -> Dict[str, object]:
-        return {
+        metadata: Dict[str, object] = {
             "dsn": self.dsn,
             "query": self.query,
+            "fetch_mode": self.fetch_mode,
         }
+        if self._partition_count is not None:
+            metadata["partitions"] = self._partition_count
+        return metadata
 
-    def stream_rows(self) -> Iterable[Dict[str, object]]:
+    def _connection(self) -> psycopg.Connection:
         if self._conn is None:
             raise RuntimeError("Connector not opened")
-        with self._conn.cursor(row_factory=psycopg.rows.dict_row) as cur:
-            cur.execute(self.query)
+        return self._conn
+
+    def preview(self, limit: int) -> pa.Table:
+        query, params = self._source_query()
+        with self._connection().cursor() as cur:
+            cur.execute(f"SELECT * FROM ({query}) AS pluto_preview LIMIT {int(limit)}", params)
+            names = [column.name for column in cur.description or ()]
+            batch = tuples_to_record_batch(names, cur.fetchall())
+        return pa.Table.from_batches([batch])
+
+    def stream_rows(self) -> Iterable[Dict[str, object]]:
+        if self.fetch_mode == "copy":
+            for batch in self.stream_batches(self.itersize):
+                yield from batch.to_pylist()
+            return
+        conn = self._connection()
+        with conn.cursor(name=_CURSOR_NAME, row_factory=psycopg.rows.dict_row) as cur:
+            cur.itersize = self.itersize
+            cur.execute(*self._source_query())
             yield from cur
 
+    def stream_batches(self, batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterable[pa.RecordBatch]:
+        conn = self._connection()
+        if self.partition is None:
+            yield from self._fetch_batches(conn, batch_size)
+            return
+        # The coordinator's transaction must stay open until every worker has
+        # imported its snapshot, so it lives as long as the extraction.
+        with psycopg.connect(self.dsn) as coordinator:
+            coordinator.isolation_level = psycopg.IsolationLevel.REPEATABLE_READ
+            snapshot = _export_snapshot(coordinator)
+            predicates = self._partition_predicates(coordinator if snapshot else conn)
+            self._partition_count = len(predicates)
+            yield from parallel_batches(
+                predicates,
+                lambda: self._worker_connection(snapshot),
+                lambda worker, predicate: self._fetch_batches(worker, batch_size, predicate),
+                max_workers=self.partition.max_workers,
+            )
+
+    def _worker_connection(self, snapshot: Optional[str]) -> psycopg.Connection:
+        conn = psycopg.connect(self.dsn)
+        if snapshot is not None:
+            try:
+                conn.isolation_level = psycopg.IsolationLevel.REPEATABLE_READ
+                # Must be the first statement of the worker's transaction.
+                conn.execute(sql.SQL("SET TRANSACTION SNAPSHOT {}").format(sql.Literal(snapshot)))
+            except BaseException:
+                conn.close()
+                raise
+        return conn
+
+    def _partition_predicates(self, conn: psycopg.Connection) -> List[Predicate]:
+        spec = self.partition
+        assert spec is not None
+        if spec.needs_bounds:
+            query, params = self._source_query()
+            column = _quote_identifier(str(spec.column))
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"SELECT MIN({column}), MAX({column}) FROM ({query}) AS pluto_bounds", params
+                )
+                lower, upper = cur.fetchone()
+            spec = replace(
+                spec,
+                lower=spec.lower if spec.lower is not None else lower,
+                upper=spec.upper if spec.upper is not None else upper,
+            )
+        return spec.build_predicates("%s", _quote_identifier)
+
+    def _fetch_batches(
+        self,
+        conn: psycopg.Connection,
+        batch_size: int,
+        predicate: Optional[Predicate] = None,
+    ) -> Iterable[pa.RecordBatch]:
+        if self.fetch_mode == "copy":
+            yield from self._copy_batches(conn, batch_size, predicate)
+            return
+        with conn.cursor(name=_CURSOR_NAME) as cur:
+            cur.itersize = self.itersize
+            cur.execute(*self._source_query(predicate))
+            names = [column.name for column in cur.description or ()]
+            while True:
+                # Each fetchmany on a named cursor is a FETCH on the server, so only
+                # one batch is buffered client-side at a time.
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield tuples_to_record_batch(names, rows)
+
+    def _copy_batches(
+        self,
+        conn: psycopg.Connection,
+        batch_size: int,
+        predicate: Optional[Predicate] = None,
+    ) -> Iterable[pa.RecordBatch]:
+        query, params = self._source_query(predicate)
+        # COPY takes no bind parameters, so render them client-side.
+        query = psycopg.ClientCursor(conn).mogrify(query, params) if params else query
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT * FROM ({query}) AS pluto_source LIMIT 0")
+            description = cur.description or []
+            names = [column.name for column in description]
+            with cur.copy(f"COPY ({query}) TO STDOUT (FORMAT BINARY)") as copy:
+                copy.set_types([column.type_code for column in description])
+                rows: List[Tuple[object, ...]] = []
+                for row in copy.rows():
+                    rows.append(row)
+                    if len(rows) >= batch_size:
+                        yield tuples_to_record_batch(names, rows)
+                        rows = []
+                if rows:
+                    yield tuples_to_record_batch(names, rows)
+
+
+def _export_snapshot(conn: psycopg.Connection) -> Optional[str]:
+    """Export the snapshot of ``conn``'s transaction, or None when the server refuses."""
 
+    try:
+        row = conn.execute("SELECT pg_export_snapshot()").fetchone()
+    except psycopg.Error as exc:
+        conn.rollback()
+        logger.warning(
+            "Could not export a Postgres snapshot; partitions are read without a "
+            "consistent view: %s",
+            exc,
+        )
+        return None
+    return str(row[0]) if row else None
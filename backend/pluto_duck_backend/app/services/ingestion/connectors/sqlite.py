@@ -3,19 +3,29 @@
 from __future__ import annotations
 
 import sqlite3
-from typing import Dict, Iterable
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pyarrow as pa
 
 from ..base import BaseConnector
+from ..batches import DEFAULT_CHUNK_SIZE, tuples_to_record_batch
+from ..duckdb_loader import _quote_identifier
+from ..partitioning import PartitionSpec, Predicate, parallel_batches
+from ..scanner import ScannerSource
 
 
 class SQLiteConnector(BaseConnector):
     name = "sqlite"
+    supports_watermark = True
 
     def __init__(self, config: Dict[str, object]) -> None:
         super().__init__(config)
         self.path = str(config.get("path"))
         self.query = str(config.get("query", "SELECT 1"))
+        self.partition = PartitionSpec.from_config(config)
         self._conn: sqlite3.Connection | None = None
+        self._partition_count: Optional[int] = None
 
     def open(self) -> None:
         self._conn = sqlite3.connect(self.path)
@@ -25,17 +35,111 @@ class SQLiteConnector(BaseConnector):
         if self._conn is not None:
             self._conn.close()
 
+    def _source_query(self, predicate: Optional[Predicate] = None) -> Tuple[str, List[object]]:
+        """The configured query, narrowed by the watermark and a partition predicate."""
+
+        conditions: List[str] = []
+        params: List[object] = []
+        if self.watermark is not None:
+            conditions.append(f"{_quote_identifier(self.watermark.column)} > ?")
+            params.append(self.watermark.value)
+        if predicate is not None:
+            conditions.append(predicate[0])
+            params.extend(predicate[1])
+        if not conditions:
+            return self.query, []
+        return (
+            f"SELECT * FROM ({self.query}) AS pluto_source WHERE {' AND '.join(conditions)}",
+            params,
+        )
+
+    def scanner_source(self) -> Optional[ScannerSource]:
+        query, params = self._source_query()
+        return ScannerSource(
+            extension="sqlite",
+            attach_type="sqlite",
+            attach_target=self.path,
+            select_sql=query,
+            parameters=params,
+        )
+
     def fetch_metadata(self) -> Dict[str, object]:
-        return {
+        metadata: Dict[str, object] = {
             "path": self.path,
             "query": self.query,
         }
+        if self._partition_count is not None:
+            metadata["partitions"] = self._partition_count
+        return metadata
+
+    def preview(self, limit: int) -> pa.Table:
+        if self._conn is None:
+            raise RuntimeError("Connector not opened")
+        query, params = self._source_query()
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        try:
+            cursor.execute(f"SELECT * FROM ({query}) AS pluto_preview LIMIT {int(limit)}", params)
+            names = [column[0] for column in cursor.description or ()]
+            batch = tuples_to_record_batch(names, cursor.fetchall())
+        finally:
+            cursor.close()
+        return pa.Table.from_batches([batch])
 
     def stream_rows(self) -> Iterable[Dict[str, object]]:
         if self._conn is None:
             raise RuntimeError("Connector not opened")
-        cursor = self._conn.execute(self.query)
+        cursor = self._conn.execute(*self._source_query())
         for row in cursor:
             yield dict(row)
 
+    def stream_batches(self, batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterable[pa.RecordBatch]:
+        if self._conn is None:
+            raise RuntimeError("Connector not opened")
+        if self.partition is None:
+            yield from self._fetch_batches(self._conn, batch_size)
+            return
+        predicates = self._partition_predicates()
+        self._partition_count = len(predicates)
+        yield from parallel_batches(
+            predicates,
+            lambda: sqlite3.connect(self.path),
+            lambda conn, predicate: self._fetch_batches(conn, batch_size, predicate),
+            max_workers=self.partition.max_workers,
+        )
+
+    def _partition_predicates(self) -> List[Predicate]:
+        spec = self.partition
+        assert spec is not None and self._conn is not None
+        if spec.needs_bounds:
+            query, params = self._source_query()
+            column = _quote_identifier(str(spec.column))
+            lower, upper = self._conn.execute(
+                f"SELECT MIN({column}), MAX({column}) FROM ({query}) AS pluto_bounds",
+                params,
+            ).fetchone()
+            spec = replace(
+                spec,
+                lower=spec.lower if spec.lower is not None else lower,
+                upper=spec.upper if spec.upper is not None else upper,
+            )
+        return spec.build_predicates("?", _quote_identifier)
 
+    def _fetch_batches(
+        self,
+        conn: sqlite3.Connection,
+        batch_size: int,
+        predicate: Optional[Predicate] = None,
+    ) -> Iterable[pa.RecordBatch]:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        try:
+            cursor.execute(*self._source_query(predicate))
+            names = [column[0] for column in cursor.description or ()]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield tuples_to_record_batch(names, rows)
+        finally:
+            cursor.close()
@@ -2,11 +2,30 @@
 
 from __future__ import annotations
 
+import logging
+from dataclasses import dataclass
+from datetime import UTC, datetime
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import uuid4
 
 import duckdb
-import pandas as pd
+import pyarrow as pa
+
+from pluto_duck_backend.app.core import table_versions, warehouse
+
+from .batches import DEFAULT_CHUNK_SIZE, arrow_reader, chunked, rows_to_record_batch
+from .schema import SCHEMA_POLICIES, ColumnChange, SchemaDiff, SchemaDriftError, diff_schemas
+
+logger = logging.getLogger(__name__)
+
+# Internal tables (staging loads, retained previous versions) share this prefix.
+INTERNAL_TABLE_PREFIX = "__pluto_"
+_PREVIOUS_PREFIX = "__pluto_prev_"
+
+
+class SwapValidationError(RuntimeError):
+    """Raised when a staged table does not look like a complete load."""
 
 
 def _quote_identifier(identifier: str) -> str:
@@ -14,11 +33,44 @@ def _quote_identifier(identifier: str) -> str:
     return f'"{escaped}"'
 
 
+@dataclass
+class LoadProgress:
+    """Running totals reported to progress callbacks while a load is in flight."""
+
+    rows: int = 0
+    bytes: int = 0
+    batches: int = 0
+
+
+ProgressCallback = Callable[[LoadProgress], None]
+
+
+@dataclass
+class MergeResult:
+    """Row counts produced by merging a staged load into an existing table."""
+
+    inserted: int = 0
+    updated: int = 0
+
+_BATCH_VIEW = "__pluto_duck_batch"
+
+
+def _uncastable_predicate(changes: Sequence[ColumnChange]) -> str:
+    """SQL matching rows where any changed column does not cast back to its old type."""
+
+    return " OR ".join(
+        f"({_quote_identifier(change.column)} IS NOT NULL AND "
+        f"TRY_CAST({_quote_identifier(change.column)} AS {change.old_type}) IS NULL)"
+        for change in changes
+    )
+
+
 class DuckDBLoader:
     """Helper around DuckDB connections for ingestion tasks."""
 
-    def __init__(self, database_path: Path) -> None:
+    def __init__(self, database_path: Path, *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
         self.database_path = database_path
+        self.chunk_size = chunk_size
 
     def load_dicts(
         self,
@@ -26,25 +78,485 @@ class DuckDBLoader:
         rows: Iterable[Dict[str, object]],
         *,
         overwrite: bool = False,
+        chunk_size: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
     ) -> int:
-        rows_list: List[Dict[str, object]] = list(rows)
-        if not rows_list:
-            return 0
-
-        # Use pandas DataFrame for better type handling
-        df = pd.DataFrame(rows_list)
-        
-        con = duckdb.connect(str(self.database_path))
+        """Stream dict rows into ``target_table`` one chunk at a time."""
+
+        batches = (
+            rows_to_record_batch(chunk)
+            for chunk in chunked(rows, chunk_size or self.chunk_size)
+        )
+        return self.load_batches(target_table, batches, overwrite=overwrite, progress=progress)
+
+    def load_batches(
+        self,
+        target_table: str,
+        batches: Iterable[pa.RecordBatch],
+        *,
+        overwrite: bool = False,
+        progress: Optional[ProgressCallback] = None,
+    ) -> int:
+        """Create ``target_table`` from the first batch and append the rest.
+
+        The whole load runs in one transaction, so a failure part-way through leaves
+        the previous table (if any) untouched. Peak memory is bounded by batch size.
+        Each chunk's types are inferred on their own, so a later batch may widen a
+        column (e.g. BIGINT to DOUBLE or VARCHAR) or add one.
+        """
+
+        safe_table = _quote_identifier(target_table)
+        totals = LoadProgress()
+        columns: Dict[str, str] = {}
         try:
-            safe_table = _quote_identifier(target_table)
-            if overwrite:
-                con.execute(f"DROP TABLE IF EXISTS {safe_table}")
-            
-            # DuckDB can directly create table from pandas DataFrame
-            con.execute(f"CREATE TABLE {safe_table} AS SELECT * FROM df")
+            with warehouse.connect(self.database_path) as con:
+                con.begin()
+                try:
+                    for batch in batches:
+                        if batch.num_rows == 0:
+                            continue
+                        if totals.batches == 0:
+                            if overwrite:
+                                con.execute(f"DROP TABLE IF EXISTS {safe_table}")
+                            self._create_from_batch(con, safe_table, batch)
+                            columns = self._column_types(con, target_table)
+                        else:
+                            self._append_batch(con, safe_table, batch, columns)
+                        totals.rows += batch.num_rows
+                        totals.bytes += batch.nbytes
+                        totals.batches += 1
+                        if progress is not None:
+                            progress(totals)
+                except BaseException:
+                    con.rollback()
+                    raise
+                con.commit()
         finally:
-            con.close()
+            # Release source cursors now rather than whenever the generator is collected.
+            close = getattr(batches, "close", None)
+            if close is not None:
+                close()
+
+        return totals.rows
+
+    def load_query(
+        self,
+        target_table: str,
+        select_sql: str,
+        *,
+        overwrite: bool = False,
+    ) -> int:
+        """Create ``target_table`` from a SELECT evaluated entirely inside DuckDB.
+
+        Used by connectors that can hand DuckDB a native scan (``read_parquet`` etc.)
+        so no rows pass through Python.
+        """
+
+        safe_table = _quote_identifier(target_table)
+        with warehouse.connect(self.database_path) as con:
+            con.begin()
+            try:
+                if overwrite:
+                    con.execute(f"DROP TABLE IF EXISTS {safe_table}")
+                row = con.execute(f"CREATE TABLE {safe_table} AS {select_sql}").fetchone()
+                if row is None:
+                    row = con.execute(f"SELECT COUNT(*) FROM {safe_table}").fetchone()
+            except BaseException:
+                con.rollback()
+                raise
+            con.commit()
+
+        return int(row[0]) if row else 0
+
+    def staging_table_name(self, target_table: str) -> str:
+        return f"__pluto_staging_{target_table}_{uuid4().hex[:8]}"
+
+    def previous_table_name(self, target_table: str) -> str:
+        return f"{_PREVIOUS_PREFIX}{target_table}"
+
+    def swap_table(
+        self,
+        staging_table: str,
+        target_table: str,
+        *,
+        expected_rows: Optional[int] = None,
+        retain_previous: bool = True,
+    ) -> None:
+        """Replace ``target_table`` with a fully loaded ``staging_table``.
+
+        The staged table is validated first, then both renames happen in one
+        transaction, so concurrent readers see either the old or the new table and
+        never a gap. With ``retain_previous`` the replaced table is kept as
+        :meth:`previous_table_name` until :meth:`rollback_table` or
+        :meth:`purge_previous_versions`.
+        """
+
+        safe_staging = _quote_identifier(staging_table)
+        safe_target = _quote_identifier(target_table)
+        previous = self.previous_table_name(target_table)
+        safe_previous = _quote_identifier(previous)
+        with warehouse.connect(self.database_path) as con:
+            columns = con.execute(f"DESCRIBE {safe_staging}").fetchall()
+            if not columns:
+                raise SwapValidationError(f"Staged table for '{target_table}' has no columns")
+            if expected_rows is not None:
+                staged_rows = con.execute(f"SELECT COUNT(*) FROM {safe_staging}").fetchone()[0]
+                if staged_rows != expected_rows:
+                    raise SwapValidationError(
+                        f"Staged table for '{target_table}' has {staged_rows} rows, "
+                        f"expected {expected_rows}"
+                    )
+            target_exists = self._table_exists(con, target_table)
+            con.begin()
+            try:
+                con.execute(f"DROP TABLE IF EXISTS {safe_previous}")
+                if target_exists and retain_previous:
+                    con.execute(f"ALTER TABLE {safe_target} RENAME TO {safe_previous}")
+                    self._stamp_previous(con, previous)
+                elif target_exists:
+                    con.execute(f"DROP TABLE {safe_target}")
+                con.execute(f"ALTER TABLE {safe_staging} RENAME TO {safe_target}")
+            except BaseException:
+                con.rollback()
+                raise
+            con.commit()
 
-        return len(rows_list)
+    def rollback_table(self, target_table: str) -> bool:
+        """Swap ``target_table`` with its retained previous version, if there is one."""
+
+        previous = self.previous_table_name(target_table)
+        scratch = _quote_identifier(self.staging_table_name(target_table))
+        with warehouse.connect(self.database_path) as con:
+            if not self._table_exists(con, previous):
+                return False
+            con.begin()
+            try:
+                con.execute(f"ALTER TABLE {_quote_identifier(target_table)} RENAME TO {scratch}")
+                con.execute(
+                    f"ALTER TABLE {_quote_identifier(previous)} "
+                    f"RENAME TO {_quote_identifier(target_table)}"
+                )
+                con.execute(f"ALTER TABLE {scratch} RENAME TO {_quote_identifier(previous)}")
+                self._stamp_previous(con, previous)
+                table_versions.bump(con, [target_table])
+            except BaseException:
+                con.rollback()
+                raise
+            con.commit()
+        return True
+
+    def purge_previous_versions(self, retention_seconds: float) -> List[str]:
+        """Drop retained previous versions older than ``retention_seconds``."""
+
+        now = datetime.now(UTC)
+        dropped: List[str] = []
+        with warehouse.connect(self.database_path) as con:
+            rows = con.execute(
+                """
+                SELECT table_name, comment
+                FROM duckdb_tables()
+                WHERE database_name = current_database() AND starts_with(table_name, ?)
+                """,
+                [_PREVIOUS_PREFIX],
+            ).fetchall()
+            for table, comment in rows:
+                try:
+                    swapped_at = datetime.fromisoformat(comment)
+                except (TypeError, ValueError):
+                    swapped_at = None
+                age = (now - swapped_at).total_seconds() if swapped_at is not None else None
+                if age is not None and age < retention_seconds:
+                    continue
+                con.execute(f"DROP TABLE IF EXISTS {_quote_identifier(table)}")
+                dropped.append(table)
+        if dropped:
+            logger.debug("Purged previous table versions: %s", ", ".join(dropped))
+        return dropped
+
+    def _stamp_previous(self, con: duckdb.DuckDBPyConnection, previous: str) -> None:
+        # The table comment records when the version was retired (ISO-8601, no quotes).
+        stamp = datetime.now(UTC).isoformat()
+        con.execute(f"COMMENT ON TABLE {_quote_identifier(previous)} IS '{stamp}'")
+
+    def _table_exists(self, con: duckdb.DuckDBPyConnection, table: str) -> bool:
+        row = con.execute(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?",
+            [table],
+        ).fetchone()
+        return bool(row and row[0])
+
+    def table_exists(self, table: str) -> bool:
+        with warehouse.connect(self.database_path) as con:
+            return self._table_exists(con, table)
+
+    def drop_table(self, table: str) -> None:
+        with warehouse.connect(self.database_path) as con:
+            con.execute(f"DROP TABLE IF EXISTS {_quote_identifier(table)}")
+
+    def bump_version(self, table: str) -> None:
+        """Mark ``table`` as changed so cached query results over it are not reused."""
+
+        with warehouse.connect(self.database_path) as con:
+            table_versions.bump(con, [table])
+
+    def max_value(self, table: str, column: str) -> object:
+        with warehouse.connect(self.database_path) as con:
+            row = con.execute(
+                f"SELECT MAX({_quote_identifier(column)}) FROM {_quote_identifier(table)}"
+            ).fetchone()
+        return row[0] if row else None
+
+    def column_types(self, table: str) -> Dict[str, str]:
+        with warehouse.connect(self.database_path) as con:
+            return self._column_types(con, table)
+
+    def _column_types(self, con: duckdb.DuckDBPyConnection, table: str) -> Dict[str, str]:
+        rows = con.execute(f"DESCRIBE {_quote_identifier(table)}").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def table_schema(self, table: str) -> pa.Schema:
+        """Arrow schema of ``table``, as its rows would be streamed out."""
+
+        with warehouse.connect(self.database_path) as con:
+            result = con.execute(f"SELECT * FROM {_quote_identifier(table)} LIMIT 0")
+            return arrow_reader(result).schema
+
+    def quarantine_table_name(self, target_table: str) -> str:
+        return f"{target_table}_quarantine"
+
+    def reconcile_schema(
+        self,
+        staging_table: str,
+        target_table: str,
+        *,
+        policy: str = "evolve",
+        alter_target: bool = True,
+    ) -> SchemaDiff:
+        """Line ``staging_table`` up with ``target_table`` before they are combined.
+
+        New columns and widened types are applied to the target with ``ALTER TABLE``
+        when ``alter_target`` is set (appends and merges; a swap replaces the target
+        anyway). Incoming columns narrower than the target are cast up so the table
+        keeps a stable type. Incompatible changes raise :class:`SchemaDriftError`
+        under ``"evolve"``; under ``"quarantine"`` the rows that do not cast are moved
+        to :meth:`quarantine_table_name` (as text) and the rest are cast. ``"reject"``
+        refuses any change other than removed columns.
+        """
+
+        if policy not in SCHEMA_POLICIES:
+            raise ValueError(f"Unknown schema policy '{policy}'")
+        safe_staging = _quote_identifier(staging_table)
+        safe_target = _quote_identifier(target_table)
+        with warehouse.connect(self.database_path) as con:
+            diff = diff_schemas(
+                self._column_types(con, target_table),
+                self._column_types(con, staging_table),
+            )
+            blocking: List[ColumnChange] = []
+            if policy == "reject":
+                blocking = diff.notable
+            elif policy == "evolve":
+                blocking = diff.incompatible
+            if blocking:
+                raise SchemaDriftError(target_table, blocking)
+
+            con.begin()
+            try:
+                predicate = _uncastable_predicate(diff.incompatible)
+                if predicate:
+                    diff.quarantined_rows = self._quarantine(
+                        con, staging_table, self.quarantine_table_name(target_table), predicate
+                    )
+                recast = diff.of_kind("incompatible", "narrowed")
+                if recast:
+                    # Rewrite the staged table in one statement: DuckDB does not allow
+                    # altering a table that was modified earlier in the transaction.
+                    casts = ", ".join(
+                        f"TRY_CAST({_quote_identifier(change.column)} AS {change.old_type}) "
+                        f"AS {_quote_identifier(change.column)}"
+                        for change in recast
+                    )
+                    where = f" WHERE NOT ({predicate})" if predicate else ""
+                    con.execute(
+                        f"CREATE OR REPLACE TABLE {safe_staging} AS "
+                        f"SELECT * REPLACE ({casts}) FROM {safe_staging}{where}"
+                    )
+                if alter_target:
+                    for change in diff.of_kind("added"):
+                        con.execute(
+                            f"ALTER TABLE {safe_target} "
+                            f"ADD COLUMN {_quote_identifier(change.column)} {change.new_type}"
+                        )
+                    for change in diff.of_kind("widened"):
+                        con.execute(
+                            f"ALTER TABLE {safe_target} "
+                            f"ALTER {_quote_identifier(change.column)} TYPE {change.new_type}"
+                        )
+            except BaseException:
+                con.rollback()
+                raise
+            con.commit()
+        if diff.changes:
+            logger.info(
+                "Schema of %s drifted: %s",
+                target_table,
+                ", ".join(f"{change.column} {change.kind}" for change in diff.changes),
+            )
+        return diff
+
+    def _quarantine(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        staging_table: str,
+        quarantine_table: str,
+        predicate: str,
+    ) -> int:
+        """Copy staged rows matching ``predicate`` into the quarantine table."""
+
+        safe_quarantine = _quote_identifier(quarantine_table)
+        # Quarantined rows are stored as text so later, differently typed rejects fit too.
+        rejected = (
+            f"SELECT COLUMNS(*)::VARCHAR, current_timestamp AS _quarantined_at "
+            f"FROM {_quote_identifier(staging_table)} WHERE {predicate}"
+        )
+        if not self._table_exists(con, quarantine_table):
+            row = con.execute(f"CREATE TABLE {safe_quarantine} AS {rejected}").fetchone()
+            return int(row[0]) if row else 0
+        con.execute(f"CREATE TEMP TABLE __pluto_rejected AS {rejected}")
+        existing = set(self._column_types(con, quarantine_table))
+        for column in self._column_types(con, "__pluto_rejected"):
+            if column not in existing:
+                con.execute(
+                    f"ALTER TABLE {safe_quarantine} ADD COLUMN {_quote_identifier(column)} VARCHAR"
+                )
+        row = con.execute(
+            f"INSERT INTO {safe_quarantine} BY NAME SELECT * FROM __pluto_rejected"
+        ).fetchone()
+        con.execute("DROP TABLE __pluto_rejected")
+        return int(row[0]) if row else 0
+
+    def merge_table(
+        self,
+        source_table: str,
+        target_table: str,
+        *,
+        primary_key: Optional[Sequence[str]] = None,
+        watermark: Optional[Tuple[str, object]] = None,
+    ) -> MergeResult:
+        """Append ``source_table`` rows into ``target_table`` in one transaction.
+
+        With ``primary_key`` this is an upsert: target rows sharing a key with the
+        staged rows are replaced (the staged row with the highest watermark wins when
+        a key repeats). ``watermark`` is ``(column, value)``; only staged rows past it
+        are merged, which covers connectors that could not push the filter down.
+        """
+
+        safe_source = _quote_identifier(source_table)
+        safe_target = _quote_identifier(target_table)
+        conditions = []
+        parameters: list = []
+        if watermark is not None and watermark[1] is not None:
+            conditions.append(f"{_quote_identifier(watermark[0])} > ?")
+            parameters.append(watermark[1])
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        staged = f"SELECT * FROM {safe_source}{where}"
+        if primary_key:
+            keys = ", ".join(_quote_identifier(column) for column in primary_key)
+            order = f" ORDER BY {_quote_identifier(watermark[0])} DESC" if watermark else ""
+            staged += f" QUALIFY row_number() OVER (PARTITION BY {keys}{order}) = 1"
+
+        result = MergeResult()
+        with warehouse.connect(self.database_path) as con:
+            con.begin()
+            try:
+                con.execute(f"CREATE TEMP TABLE __pluto_merge AS {staged}", parameters)
+                if primary_key:
+                    keys = [_quote_identifier(column) for column in primary_key]
+                    matches = " AND ".join(
+                        f"{safe_target}.{key} = __pluto_merge.{key}" for key in keys
+                    )
+                    row = con.execute(
+                        f"DELETE FROM {safe_target} USING __pluto_merge WHERE {matches}"
+                    ).fetchone()
+                    result.updated = int(row[0]) if row else 0
+                row = con.execute(
+                    f"INSERT INTO {safe_target} BY NAME SELECT * FROM __pluto_merge"
+                ).fetchone()
+                result.inserted = (int(row[0]) if row else 0) - result.updated
+                con.execute("DROP TABLE __pluto_merge")
+            except BaseException:
+                con.rollback()
+                raise
+            con.commit()
+
+        return result
+
+    def _create_from_batch(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        safe_table: str,
+        batch: pa.RecordBatch,
+    ) -> None:
+        # An all-null column in the first chunk would otherwise be typed INTEGER and
+        # reject text values arriving in later chunks.
+        if any(pa.types.is_null(field.type) for field in batch.schema):
+            schema = pa.schema(
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                for field in batch.schema
+            )
+            batch = batch.cast(schema)
+        con.register(_BATCH_VIEW, batch)
+        try:
+            con.execute(f"CREATE TABLE {safe_table} AS SELECT * FROM {_BATCH_VIEW}")
+        finally:
+            con.unregister(_BATCH_VIEW)
+
+    def _append_batch(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        safe_table: str,
+        batch: pa.RecordBatch,
+        columns: Dict[str, str],
+    ) -> None:
+        con.register(_BATCH_VIEW, batch)
+        try:
+            self._widen_columns(con, safe_table, batch, columns)
+            con.execute(f"INSERT INTO {safe_table} BY NAME SELECT * FROM {_BATCH_VIEW}")
+        finally:
+            con.unregister(_BATCH_VIEW)
+
+    def _widen_columns(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        safe_table: str,
+        batch: pa.RecordBatch,
+        columns: Dict[str, str],
+    ) -> None:
+        """Alter ``safe_table`` so the registered batch inserts without a lossy cast.
 
+        ``columns`` maps the table's columns to their types and is kept up to date.
+        """
 
+        # All-null columns say nothing about the type (DuckDB reports them as INTEGER).
+        typed = {field.name for field in batch.schema if not pa.types.is_null(field.type)}
+        incoming = con.execute(f"DESCRIBE SELECT * FROM {_BATCH_VIEW}").fetchall()
+        for name, new_type, *_ in incoming:
+            column = _quote_identifier(name)
+            old_type = columns.get(name)
+            if old_type is None:
+                new_type = new_type if name in typed else "VARCHAR"
+                con.execute(f"ALTER TABLE {safe_table} ADD COLUMN {column} {new_type}")
+                columns[name] = new_type
+                continue
+            if name not in typed or new_type == old_type:
+                continue
+            try:
+                # The type DuckDB would unify both to, e.g. DOUBLE for BIGINT and DOUBLE.
+                row = con.execute(f"SELECT typeof([NULL::{old_type}, NULL::{new_type}][1])")
+                wider = row.fetchone()[0]
+            except duckdb.Error:
+                wider = "VARCHAR"
+            if wider != old_type:
+                logger.debug("Widening column %s from %s to %s", name, old_type, wider)
+                con.execute(f"ALTER TABLE {safe_table} ALTER COLUMN {column} TYPE {wider}")
+                columns[name] = wider
@@ -0,0 +1,89 @@
+"""Path resolution shared by file-based connectors."""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+from pathlib import Path
+from typing import Callable, List, Sequence
+
+_GLOB_CHARS = set("*?[")
+
+# Content sampled for text-file fingerprints: head and tail plus evenly spaced blocks.
+FINGERPRINT_EDGE_BYTES = 64 * 1024
+FINGERPRINT_BLOCK_BYTES = 4 * 1024
+FINGERPRINT_BLOCKS = 16
+
+
+def is_glob(path: str) -> bool:
+    return any(char in path for char in _GLOB_CHARS)
+
+
+def resolve_paths(path: str, suffixes: Sequence[str]) -> List[Path]:
+    """Expand a file, directory or glob pattern into a sorted list of files.
+
+    Directories are searched recursively for files ending in one of ``suffixes``
+    (so hive-style ``key=value/`` layouts are picked up).
+    """
+
+    if is_glob(path):
+        matches = [Path(match) for match in glob.glob(path, recursive=True)]
+    else:
+        candidate = Path(path)
+        if candidate.is_dir():
+            matches = [
+                child
+                for child in candidate.rglob("*")
+                if child.is_file() and child.name.lower().endswith(tuple(suffixes))
+            ]
+        else:
+            matches = [candidate]
+    files = sorted(match for match in matches if not match.is_dir())
+    if not files:
+        raise FileNotFoundError(f"No files match '{path}'")
+    return files
+
+
+def sql_string(value: str) -> str:
+    """Render ``value`` as a single-quoted SQL string literal."""
+
+    escaped = value.replace("'", "''")
+    return f"'{escaped}'"
+
+
+def sql_file_list(paths: Sequence[Path]) -> str:
+    """Render paths as a DuckDB list literal for ``read_*`` table functions."""
+
+    return "[" + ", ".join(sql_string(str(path)) for path in paths) + "]"
+
+
+def sampled_fingerprint(path: Path) -> str:
+    """Hash of size, mtime and a fixed sample of the file's bytes.
+
+    Reads at most ~200KB however large the file is; any edit that changes the size,
+    or touches the sampled regions, produces a different fingerprint.
+    """
+
+    stat = path.stat()
+    digest = hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with path.open("rb") as handle:
+        if stat.st_size <= 2 * FINGERPRINT_EDGE_BYTES:
+            digest.update(handle.read())
+            return digest.hexdigest()
+        digest.update(handle.read(FINGERPRINT_EDGE_BYTES))
+        stride = (stat.st_size - 2 * FINGERPRINT_EDGE_BYTES) // (FINGERPRINT_BLOCKS + 1)
+        for index in range(1, FINGERPRINT_BLOCKS + 1):
+            handle.seek(FINGERPRINT_EDGE_BYTES + stride * index)
+            digest.update(handle.read(FINGERPRINT_BLOCK_BYTES))
+        handle.seek(stat.st_size - FINGERPRINT_EDGE_BYTES)
+        digest.update(handle.read(FINGERPRINT_EDGE_BYTES))
+    return digest.hexdigest()
+
+
+def combined_fingerprint(paths: Sequence[Path], fingerprint: Callable[[Path], str]) -> str:
+    """One fingerprint for a set of files; adding, removing or changing any file alters it."""
+
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(f"{path}\0{fingerprint(path)}\n".encode())
+    return digest.hexdigest()
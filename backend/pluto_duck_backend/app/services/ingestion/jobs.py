@@ -0,0 +1,447 @@
+"""Background ingestion jobs with progress tracking and cooperative cancellation."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from queue import Queue
+from typing import Any, Callable, ContextManager, Dict, List, Optional
+from uuid import uuid4
+
+import duckdb
+
+from pluto_duck_backend.app.core import warehouse
+from pluto_duck_backend.app.core.config import get_settings
+
+from .duckdb_loader import LoadProgress
+from .registry import get_registry
+from .service import IngestionJob, IngestionService
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between progress writes to the job table while a load runs.
+_PROGRESS_FLUSH_INTERVAL = 1.0
+_INTERRUPTED = "Interrupted by server restart"
+
+
+class IngestionJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCESS = "success"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def finished(self) -> bool:
+        return self in (self.SUCCESS, self.FAILED, self.CANCELLED)
+
+
+class IngestionCancelled(Exception):
+    """Raised inside a running load once cancellation has been requested."""
+
+
+@dataclass
+class IngestionJobRecord:
+    job_id: str
+    connector: str
+    target_table: str
+    status: IngestionJobStatus
+    submitted_at: datetime
+    source_id: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    rows: int = 0
+    bytes: int = 0
+    batches: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def elapsed_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        end = self.completed_at or datetime.now(UTC)
+        return max((end - self.started_at).total_seconds(), 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "source_id": self.source_id,
+            "connector": self.connector,
+            "target_table": self.target_table,
+            "status": self.status.value,
+            "submitted_at": self.submitted_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "elapsed_seconds": self.elapsed_seconds,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "batches": self.batches,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+JobCallback = Callable[[IngestionJobRecord], None]
+
+
+@dataclass
+class _QueuedJob:
+    job: IngestionJob
+    cancel: threading.Event = field(default_factory=threading.Event)
+    on_finished: Optional[JobCallback] = None
+    last_flush: float = 0.0
+
+
+def _table_exists(con: duckdb.DuckDBPyConnection, table: str) -> bool:
+    row = con.execute(
+        "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = ? AND NOT temporary", [table]
+    ).fetchone()
+    return bool(row and row[0])
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value
+
+
+class IngestionJobManager:
+    """Runs ingestion jobs on a bounded pool of worker threads.
+
+    Job state is persisted to the ``ingestion_jobs`` table so it can be polled from
+    any request. Cancellation is cooperative: the loader's progress callback raises
+    :class:`IngestionCancelled`, which rolls back the load transaction. Loads that
+    run as a single DuckDB statement (native scans) are only cancellable before they
+    start.
+    """
+
+    def __init__(
+        self,
+        service: IngestionService,
+        warehouse_path: Path,
+        worker_count: int = 2,
+    ) -> None:
+        self.service = service
+        self.warehouse_path = warehouse_path
+        self._jobs: Dict[str, _QueuedJob] = {}
+        self._live: Dict[str, IngestionJobRecord] = {}
+        self._lock = threading.Lock()
+        self._queue: Queue[str] = Queue()
+        self._ensure_tables()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"ingest-worker-{idx}", daemon=True)
+            for idx in range(max(1, worker_count))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _connect(self) -> ContextManager[duckdb.DuckDBPyConnection]:
+        return warehouse.connect(self.warehouse_path)
+
+    def _ensure_tables(self) -> None:
+        with self._connect() as con:
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ingestion_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    source_id TEXT,
+                    connector TEXT,
+                    target_table TEXT,
+                    status TEXT,
+                    submitted_at TIMESTAMP,
+                    started_at TIMESTAMP,
+                    completed_at TIMESTAMP,
+                    rows BIGINT,
+                    bytes BIGINT,
+                    batches BIGINT,
+                    result JSON,
+                    error TEXT
+                )
+                """
+            )
+            # Jobs from a previous process can never finish; don't leave them "running".
+            now = datetime.now(UTC)
+            interrupted = con.execute(
+                """
+                UPDATE ingestion_jobs
+                SET status = ?, error = ?, completed_at = ?
+                WHERE status IN (?, ?)
+                RETURNING source_id
+                """,
+                [
+                    IngestionJobStatus.FAILED.value,
+                    _INTERRUPTED,
+                    now,
+                    IngestionJobStatus.PENDING.value,
+                    IngestionJobStatus.RUNNING.value,
+                ],
+            ).fetchall()
+            source_ids = sorted({row[0] for row in interrupted if row[0]})
+            if source_ids and _table_exists(con, "data_sources"):
+                # Their data sources would otherwise stay "syncing" and refuse new syncs.
+                con.executemany(
+                    """
+                    UPDATE data_sources SET status = 'error', error_message = ?, updated_at = ?
+                    WHERE id = ? AND status = 'syncing'
+                    """,
+                    [[_INTERRUPTED, now, source_id] for source_id in source_ids],
+                )
+
+    def submit(
+        self,
+        job: IngestionJob,
+        *,
+        source_id: Optional[str] = None,
+        on_finished: Optional[JobCallback] = None,
+    ) -> IngestionJobRecord:
+        """Queue ``job``; ``on_finished`` runs on the worker once it reaches a final state."""
+
+        record = IngestionJobRecord(
+            job_id=str(uuid4()),
+            connector=job.connector,
+            target_table=job.target_table,
+            status=IngestionJobStatus.PENDING,
+            submitted_at=datetime.now(UTC),
+            source_id=source_id,
+        )
+        with self._connect() as con:
+            con.execute(
+                """
+                INSERT INTO ingestion_jobs (
+                    job_id, source_id, connector, target_table, status, submitted_at,
+                    rows, bytes, batches
+                )
+                VALUES (?, ?, ?, ?, ?, ?, 0, 0, 0)
+                """,
+                [
+                    record.job_id,
+                    source_id,
+                    record.connector,
+                    record.target_table,
+                    record.status.value,
+                    record.submitted_at,
+                ],
+            )
+        with self._lock:
+            self._jobs[record.job_id] = _QueuedJob(job=job, on_finished=on_finished)
+            self._live[record.job_id] = record
+        logger.debug("Enqueuing ingestion job %s", record.job_id)
+        self._queue.put(record.job_id)
+        return _copy(record)
+
+    def cancel(self, job_id: str) -> Optional[IngestionJobRecord]:
+        """Request cancellation; returns the job's current state, or None if unknown."""
+
+        with self._lock:
+            queued = self._jobs.get(job_id)
+        if queued is not None:
+            queued.cancel.set()
+        return self.fetch(job_id)
+
+    def fetch(self, job_id: str) -> Optional[IngestionJobRecord]:
+        with self._lock:
+            live = self._live.get(job_id)
+            if live is not None:
+                return _copy(live)
+        with self._connect() as con:
+            row = con.execute(
+                f"SELECT {_COLUMNS} FROM ingestion_jobs WHERE job_id = ?",
+                [job_id],
+            ).fetchone()
+        return _row_to_record(row) if row else None
+
+    def list_jobs(
+        self, *, source_id: Optional[str] = None, limit: int = 50
+    ) -> List[IngestionJobRecord]:
+        with self._connect() as con:
+            if source_id:
+                rows = con.execute(
+                    f"SELECT {_COLUMNS} FROM ingestion_jobs WHERE source_id = ? "
+                    "ORDER BY submitted_at DESC LIMIT ?",
+                    [source_id, limit],
+                ).fetchall()
+            else:
+                rows = con.execute(
+                    f"SELECT {_COLUMNS} FROM ingestion_jobs ORDER BY submitted_at DESC LIMIT ?",
+                    [limit],
+                ).fetchall()
+        records = [_row_to_record(row) for row in rows]
+        with self._lock:
+            return [_copy(self._live[r.job_id]) if r.job_id in self._live else r for r in records]
+
+    def wait_for(self, job_id: str, timeout: float = 10.0, poll_interval: float = 0.1):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            record = self.fetch(job_id)
+            if record is None or record.status.finished:
+                return record
+            time.sleep(poll_interval)
+        return self.fetch(job_id)
+
+    def _worker(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._execute(job_id)
+            except Exception:  # pragma: no cover - logging only
+                logger.exception("Ingestion job %s failed during execution", job_id)
+            finally:
+                self._queue.task_done()
+
+    def _execute(self, job_id: str) -> None:
+        with self._lock:
+            queued = self._jobs.get(job_id)
+            record = self._live.get(job_id)
+        if queued is None or record is None:
+            return
+
+        if queued.cancel.is_set():
+            self._finish(
+                job_id, queued, IngestionJobStatus.CANCELLED, error="Cancelled before start"
+            )
+            return
+
+        with self._lock:
+            record.status = IngestionJobStatus.RUNNING
+            record.started_at = datetime.now(UTC)
+        self._flush(record, force=True, queued=queued)
+
+        job = queued.job
+        user_progress = job.progress
+
+        def _progress(totals: LoadProgress) -> None:
+            with self._lock:
+                record.rows, record.bytes = totals.rows, totals.bytes
+                record.batches = totals.batches
+            self._flush(record, queued=queued)
+            if user_progress is not None:
+                user_progress(totals)
+            if queued.cancel.is_set():
+                raise IngestionCancelled(f"Ingestion job {job_id} cancelled")
+
+        job.progress = _progress
+        try:
+            logger.debug("Executing ingestion job %s", job_id)
+            result = self.service.run(job)
+        except IngestionCancelled as exc:
+            self._finish(job_id, queued, IngestionJobStatus.CANCELLED, error=str(exc))
+        except Exception as exc:
+            logger.warning("Ingestion job %s failed: %s", job_id, exc)
+            self._finish(job_id, queued, IngestionJobStatus.FAILED, error=str(exc))
+        else:
+            with self._lock:
+                record.rows = max(record.rows, int(result.get("rows_ingested") or 0))
+            self._finish(job_id, queued, IngestionJobStatus.SUCCESS, result=result)
+
+    def _finish(
+        self,
+        job_id: str,
+        queued: _QueuedJob,
+        status: IngestionJobStatus,
+        *,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            record = self._live[job_id]
+            final = _copy(record)
+        final.status = status
+        final.completed_at = datetime.now(UTC)
+        final.result = result
+        final.error = error
+        # Run the callback before the job is seen as finished, so anyone polling the
+        # job also sees the callback's effects (e.g. the data source's status).
+        if queued.on_finished is not None:
+            try:
+                queued.on_finished(_copy(final))
+            except Exception:  # pragma: no cover - logging only
+                logger.exception("Completion callback for ingestion job %s failed", job_id)
+        with self._lock:
+            record.status = final.status
+            record.completed_at = final.completed_at
+            record.result = final.result
+            record.error = final.error
+        self._flush(record, force=True, queued=queued)
+        with self._lock:
+            self._live.pop(job_id, None)
+            self._jobs.pop(job_id, None)
+
+    def _flush(
+        self, record: IngestionJobRecord, *, queued: _QueuedJob, force: bool = False
+    ) -> None:
+        now = time.monotonic()
+        if not force and now - queued.last_flush < _PROGRESS_FLUSH_INTERVAL:
+            return
+        queued.last_flush = now
+        with self._lock:
+            snapshot = _copy(record)
+        with self._connect() as con:
+            con.execute(
+                """
+                UPDATE ingestion_jobs
+                SET status = ?, started_at = ?, completed_at = ?, rows = ?, bytes = ?,
+                    batches = ?, result = ?, error = ?
+                WHERE job_id = ?
+                """,
+                [
+                    snapshot.status.value,
+                    snapshot.started_at,
+                    snapshot.completed_at,
+                    snapshot.rows,
+                    snapshot.bytes,
+                    snapshot.batches,
+                    (
+                        json.dumps(snapshot.result, default=str)
+                        if snapshot.result is not None
+                        else None
+                    ),
+                    snapshot.error,
+                    snapshot.job_id,
+                ],
+            )
+
+
+_COLUMNS = (
+    "job_id, source_id, connector, target_table, status, submitted_at, started_at, "
+    "completed_at, rows, bytes, batches, result, error"
+)
+
+
+def _row_to_record(row: tuple) -> IngestionJobRecord:
+    return IngestionJobRecord(
+        job_id=row[0],
+        source_id=row[1],
+        connector=row[2],
+        target_table=row[3],
+        status=IngestionJobStatus(row[4]),
+        submitted_at=_utc(row[5]),
+        started_at=_utc(row[6]),
+        completed_at=_utc(row[7]),
+        rows=row[8] or 0,
+        bytes=row[9] or 0,
+        batches=row[10] or 0,
+        result=json.loads(row[11]) if row[11] else None,
+        error=row[12],
+    )
+
+
+def _copy(record: IngestionJobRecord) -> IngestionJobRecord:
+    return replace(record)
+
+
+@lru_cache(maxsize=1)
+def get_ingestion_job_manager() -> IngestionJobManager:
+    settings = get_settings()
+    return IngestionJobManager(
+        IngestionService(get_registry()),
+        settings.duckdb.path,
+        worker_count=settings.ingestion.worker_count,
+    )
@@ -0,0 +1,274 @@
+"""Process memory sampling and per-stage profiling of ingestion runs."""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+import pyarrow as pa
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+DEFAULT_SAMPLE_INTERVAL = 0.05
+# Rows pulled per timed stage by profile_rows.
+DEFAULT_ROW_BLOCK = 1024
+STAGES = ("open", "extract", "convert", "load", "metadata", "close")
+
+T = TypeVar("T")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, or None where it cannot be read.
+
+    Uses ``/proc`` on Linux; elsewhere only the lifetime peak is available, which
+    :class:`RSSSampler` falls back to.
+    """
+
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            return int(handle.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def max_rss() -> Optional[int]:
+    """Peak resident set size over the process lifetime in bytes."""
+
+    if resource is None:  # pragma: no cover - Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RSSSampler:
+    """Track the peak RSS reached while a block of code runs.
+
+    A daemon thread polls :func:`current_rss` every ``interval`` seconds, so short
+    spikes between samples can be missed; native allocations made by DuckDB are
+    included because they count towards the process RSS. ``on_sample`` is called
+    with every reading from the sampling thread.
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+        on_sample: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        self.interval = interval
+        self.on_sample = on_sample
+        self.start_rss: Optional[int] = None
+        self.peak_rss: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        rss = current_rss()
+        if rss is None:
+            return
+        if self.peak_rss is None or rss > self.peak_rss:
+            self.peak_rss = rss
+        if self.on_sample is not None:
+            self.on_sample(rss)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "RSSSampler":
+        self.start_rss = current_rss()
+        self.peak_rss = self.start_rss
+        if self.start_rss is not None:
+            self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._sample()
+        else:
+            self.peak_rss = max_rss()
+
+    @property
+    def peak_delta(self) -> Optional[int]:
+        """Growth of the RSS over its value when sampling started."""
+
+        if self.peak_rss is None or self.start_rss is None:
+            return None
+        return max(0, self.peak_rss - self.start_rss)
+
+
+@dataclass
+class StageStats:
+    wall_seconds: float = 0.0
+    # Process CPU time, so DuckDB's worker threads count towards the stage.
+    cpu_seconds: float = 0.0
+    rows: int = 0
+    calls: int = 0
+    peak_rss_bytes: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "wall_seconds": round(self.wall_seconds, 4),
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            "rows": self.rows,
+            "peak_rss_bytes": self.peak_rss_bytes,
+        }
+
+
+class RunProfile:
+    """Wall time, CPU time, rows and peak RSS per stage of one ingestion run.
+
+    Stages nest: time spent in an inner stage (``convert`` inside ``extract``,
+    ``extract`` inside ``load`` while batches are pulled through the loader) is
+    attributed to the inner stage only, so the stage times add up to the run.
+    Only the thread that entered the profile records; work on connector worker
+    threads is seen as time spent waiting by the stage that consumes it.
+    """
+
+    def __init__(self, sample_interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        self.stages: Dict[str, StageStats] = {name: StageStats() for name in STAGES}
+        self._stack: List[List[object]] = []
+        self._owner: Optional[int] = None
+        self._sampler = RSSSampler(sample_interval, on_sample=self._record_rss)
+        self._token = None
+        self._started = 0.0
+        self.total_seconds = 0.0
+
+    def _record_rss(self, rss: int) -> None:
+        for frame in list(self._stack):
+            stats = self.stages[str(frame[0])]
+            if stats.peak_rss_bytes is None or rss > stats.peak_rss_bytes:
+                stats.peak_rss_bytes = rss
+
+    def __enter__(self) -> "RunProfile":
+        self._owner = threading.get_ident()
+        self._token = _active_profile.set(self)
+        self._started = time.perf_counter()
+        self._sampler.__enter__()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._sampler.__exit__(*exc_info)
+        self.total_seconds = time.perf_counter() - self._started
+        if self._token is not None:
+            _active_profile.reset(self._token)
+            self._token = None
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0) -> Iterator[None]:
+        if threading.get_ident() != self._owner:
+            yield
+            return
+        stats = self.stages.setdefault(name, StageStats())
+        frame: List[object] = [name, 0.0, 0.0]
+        self._stack.append(frame)
+        if not stats.calls:
+            # Seed the peak so stages shorter than the sampling interval report one.
+            rss = current_rss()
+            if rss is not None:
+                self._record_rss(rss)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self._stack.pop()
+            stats.wall_seconds += wall - float(frame[1])  # type: ignore[arg-type]
+            stats.cpu_seconds += cpu - float(frame[2])  # type: ignore[arg-type]
+            stats.rows += rows
+            stats.calls += 1
+            if self._stack:
+                parent = self._stack[-1]
+                parent[1] = float(parent[1]) + wall  # type: ignore[arg-type]
+                parent[2] = float(parent[2]) + cpu  # type: ignore[arg-type]
+
+    def add_rows(self, name: str, rows: int) -> None:
+        self.stages.setdefault(name, StageStats()).rows += rows
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "total_seconds": round(self.total_seconds, 4),
+            "stages": {
+                name: stats.to_dict() for name, stats in self.stages.items() if stats.calls
+            },
+        }
+
+
+_active_profile: ContextVar[Optional[RunProfile]] = ContextVar("ingestion_profile", default=None)
+
+
+def profile_stage(name: str, rows: int = 0) -> ContextManager[None]:
+    """Time a block as ``name`` in the active run profile, if any."""
+
+    profile = _active_profile.get()
+    return profile.stage(name, rows) if profile is not None else nullcontext()
+
+
+def profile_batches(
+    batches: Iterable[pa.RecordBatch],
+    stage: str = "extract",
+) -> Iterator[pa.RecordBatch]:
+    """Attribute the time spent producing each batch to ``stage``."""
+
+    profile = _active_profile.get()
+    if profile is None:
+        yield from batches
+        return
+    iterator = iter(batches)
+    try:
+        while True:
+            with profile.stage(stage):
+                batch = next(iterator, None)
+            if batch is None:
+                return
+            profile.add_rows(stage, batch.num_rows)
+            yield batch
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+def profile_rows(
+    rows: Iterable[T],
+    stage: str = "extract",
+    block_size: int = DEFAULT_ROW_BLOCK,
+) -> Iterator[T]:
+    """Like :func:`profile_batches` for row-at-a-time connectors.
+
+    Rows are pulled ``block_size`` at a time inside one stage, so the per-stage
+    bookkeeping is paid once per block rather than once per row.
+    """
+
+    profile = _active_profile.get()
+    if profile is None:
+        yield from rows
+        return
+    iterator = iter(rows)
+    try:
+        while True:
+            with profile.stage(stage):
+                block = list(islice(iterator, block_size))
+            if not block:
+                return
+            profile.add_rows(stage, len(block))
+            yield from block
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
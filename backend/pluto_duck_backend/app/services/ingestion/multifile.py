@@ -0,0 +1,163 @@
+"""Concurrent per-file loading for directory and glob file sources.
+
+Each file is scanned by DuckDB into its own staging table on a small thread pool,
+so one unreadable file does not sink the rest. Staged files are then combined
+into the target with ``UNION ALL BY NAME`` in a single transaction: columns that
+only some files have are filled with NULLs, and columns new to an existing
+target are added before appending.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from uuid import uuid4
+
+import duckdb
+import pyarrow as pa
+
+from pluto_duck_backend.app.core import warehouse
+
+from .duckdb_loader import _quote_identifier
+from .files import sql_string
+
+logger = logging.getLogger(__name__)
+
+SOURCE_FILE_COLUMN = "_source_file"
+DEFAULT_FILE_WORKERS = 4
+FILE_ERROR_POLICIES = ("skip", "fail")
+
+
+class FileLoadError(RuntimeError):
+    """Raised when no file (or, with ``on_error="fail"``, any file) could be loaded."""
+
+    def __init__(self, failed_files: Dict[str, str]) -> None:
+        first = next(iter(failed_files.items()))
+        super().__init__(
+            f"{len(failed_files)} file(s) failed to load; first: {first[0]}: {first[1]}"
+        )
+        self.failed_files = failed_files
+
+
+@dataclass
+class FileLoadReport:
+    rows: int = 0
+    file_rows: Dict[str, int] = field(default_factory=dict)
+    failed_files: Dict[str, str] = field(default_factory=dict)
+
+
+def load_files(
+    database_path: Path,
+    target_table: str,
+    files: Sequence[Path],
+    scan_sql: Callable[[Path], Union[str, pa.RecordBatchReader]],
+    *,
+    overwrite: bool = False,
+    max_workers: int = DEFAULT_FILE_WORKERS,
+    on_error: str = "skip",
+) -> FileLoadReport:
+    """Load ``files`` into ``target_table`` tagging each row with its ``_source_file``.
+
+    ``scan_sql(file)`` returns a SELECT reading one file, or an Arrow reader over
+    its rows for files DuckDB cannot read itself. Without ``overwrite`` the rows
+    are appended to an existing target (this is how failed files are retried).
+    """
+
+    if on_error not in FILE_ERROR_POLICIES:
+        raise ValueError(f"Unknown file error policy '{on_error}'")
+    prefix = f"__pluto_file_{uuid4().hex[:8]}_"
+    staged: List[Tuple[str, str, int]] = []
+    report = FileLoadReport()
+
+    def _stage(index: int, file: Path) -> Tuple[str, str, Optional[int], Optional[str]]:
+        table = f"{prefix}{index}"
+        view = f"{table}_scan"
+        with warehouse.connect(database_path) as con:
+            try:
+                scan = scan_sql(file)
+                if isinstance(scan, pa.RecordBatchReader):
+                    con.register(view, scan)
+                    scan = f"SELECT * FROM {_quote_identifier(view)}"
+                row = con.execute(
+                    f"CREATE TABLE {_quote_identifier(table)} AS "
+                    f"SELECT *, {sql_string(str(file))} AS {SOURCE_FILE_COLUMN} "
+                    f"FROM ({scan}) AS pluto_file"
+                ).fetchone()
+                return table, str(file), int(row[0]) if row else 0, None
+            except (duckdb.Error, pa.ArrowException, OSError) as exc:
+                return table, str(file), None, str(exc)
+            finally:
+                con.unregister(view)
+
+    try:
+        workers = max(1, max_workers)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest-file") as pool:
+            for table, file, rows, error in pool.map(_stage, range(len(files)), files):
+                if error is not None:
+                    logger.warning("Failed to load %s: %s", file, error)
+                    report.failed_files[file] = error
+                else:
+                    staged.append((table, file, rows or 0))
+                    report.file_rows[file] = rows or 0
+
+        if not staged or (report.failed_files and on_error == "fail"):
+            raise FileLoadError(report.failed_files)
+
+        tables = [table for table, _, _ in staged]
+        report.rows = _combine(database_path, target_table, tables, overwrite)
+        return report
+    finally:
+        with warehouse.connect(database_path) as con:
+            for index in range(len(files)):
+                con.execute(f"DROP TABLE IF EXISTS {_quote_identifier(f'{prefix}{index}')}")
+
+
+def _combine(database_path: Path, target_table: str, tables: Sequence[str], overwrite: bool) -> int:
+    safe_target = _quote_identifier(target_table)
+    union = " UNION ALL BY NAME ".join(
+        f"SELECT * FROM {_quote_identifier(table)}" for table in tables
+    )
+    with warehouse.connect(database_path) as con:
+        exists = con.execute(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?",
+            [target_table],
+        ).fetchone()[0]
+        con.begin()
+        try:
+            if overwrite or not exists:
+                con.execute(f"DROP TABLE IF EXISTS {safe_target}")
+                row = con.execute(f"CREATE TABLE {safe_target} AS {union}").fetchone()
+            else:
+                con.execute(f"CREATE TEMP VIEW __pluto_files AS {union}")
+                current = {name for name, *_ in con.execute(f"DESCRIBE {safe_target}").fetchall()}
+                for name, column_type, *_ in con.execute("DESCRIBE __pluto_files").fetchall():
+                    if name not in current:
+                        con.execute(
+                            f"ALTER TABLE {safe_target} "
+                            f"ADD COLUMN {_quote_identifier(name)} {column_type}"
+                        )
+                row = con.execute(
+                    f"INSERT INTO {safe_target} BY NAME SELECT * FROM __pluto_files"
+                ).fetchone()
+                con.execute("DROP VIEW __pluto_files")
+        except BaseException:
+            con.rollback()
+            raise
+        con.commit()
+    return int(row[0]) if row else 0
+
+
+def report_metadata(
+    report: FileLoadReport,
+    previous: Optional[Dict[str, object]] = None,
+) -> Dict[str, object]:
+    """Per-file counts for data-source metadata; ``previous`` is the state being retried."""
+
+    file_rows: Dict[str, int] = {}
+    if previous and isinstance(previous.get("file_rows"), dict):
+        file_rows.update(previous["file_rows"])  # type: ignore[arg-type]
+    file_rows.update(report.file_rows)
+    return {"file_rows": file_rows, "failed_files": dict(report.failed_files)}
@@ -0,0 +1,186 @@
+"""Partitioned, concurrent extraction for SQL connectors.
+
+A partition spec splits a source query into disjoint predicates, either as equal
+ranges over a numeric/date column or as explicit predicates. Partitions are
+extracted on a small pool of worker threads, each holding its own source
+connection, and their batches are funnelled through a bounded queue to a single
+consumer (the DuckDB loader), so the target is still written in one transaction.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import pairwise
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+
+DEFAULT_MAX_WORKERS = 4
+_QUEUE_BATCHES_PER_WORKER = 2
+
+# (SQL fragment using the connector's placeholder style, bound parameters)
+Predicate = Tuple[str, List[Any]]
+
+
+@dataclass
+class PartitionSpec:
+    column: Optional[str] = None
+    partitions: int = 1
+    lower: Any = None
+    upper: Any = None
+    predicates: List[str] = field(default_factory=list)
+    max_workers: int = DEFAULT_MAX_WORKERS
+
+    @classmethod
+    def from_config(cls, config: Dict[str, object]) -> Optional["PartitionSpec"]:
+        raw = config.get("partition")
+        if not raw:
+            return None
+        if not isinstance(raw, dict):
+            raise ValueError("partition must be an object")
+        spec = cls(
+            column=raw.get("column"),
+            partitions=int(raw.get("partitions", 1)),
+            lower=raw.get("lower"),
+            upper=raw.get("upper"),
+            predicates=[str(predicate) for predicate in raw.get("predicates") or []],
+            max_workers=int(raw.get("max_workers", DEFAULT_MAX_WORKERS)),
+        )
+        if not spec.predicates and not spec.column:
+            raise ValueError("partition requires either 'column' or 'predicates'")
+        if spec.partitions < 1 or spec.max_workers < 1:
+            raise ValueError("partition counts must be positive")
+        return spec
+
+    @property
+    def needs_bounds(self) -> bool:
+        return not self.predicates and (self.lower is None or self.upper is None)
+
+    def build_predicates(self, placeholder: str, quote: Callable[[str], str]) -> List[Predicate]:
+        """Disjoint predicates covering every row, including NULLs in the range column."""
+
+        if self.predicates:
+            return [(f"({predicate})", []) for predicate in self.predicates]
+        column = quote(str(self.column))
+        if self.lower is None or self.upper is None:
+            # Empty source: a single partition that simply returns nothing.
+            return [("1 = 1", [])]
+        boundaries = _split_range(self.lower, self.upper, self.partitions)
+        result: List[Predicate] = []
+        for index, (low, high) in enumerate(pairwise(boundaries)):
+            last = index == len(boundaries) - 2
+            clause = f"{column} >= {placeholder} AND {column} {'<=' if last else '<'} {placeholder}"
+            if index == 0:
+                clause = f"({clause} OR {column} IS NULL)"
+            result.append((clause, [low, high]))
+        return result
+
+
+def _split_range(lower: Any, upper: Any, partitions: int) -> List[Any]:
+    if isinstance(lower, str) or isinstance(upper, str):
+        lower, upper = _parse_bound(lower), _parse_bound(upper)
+    if upper <= lower or partitions == 1:
+        return [lower, upper]
+    step = (upper - lower) / partitions
+    if isinstance(lower, int) and not isinstance(lower, bool):
+        points = [lower + int(step * index) for index in range(partitions)]
+    else:
+        points = [lower + step * index for index in range(partitions)]
+    # Integer division can collapse neighbouring boundaries on narrow ranges.
+    deduped = sorted(set(points))
+    return deduped + [upper]
+
+
+def _parse_bound(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    for parser in (int, float, datetime.fromisoformat, date.fromisoformat):
+        try:
+            return parser(value)
+        except ValueError:
+            continue
+    raise ValueError(f"Cannot split range on non-numeric, non-temporal bound {value!r}")
+
+
+_DONE = object()
+
+
+def parallel_batches(
+    predicates: Sequence[Predicate],
+    connect: Callable[[], Any],
+    extract: Callable[[Any, Predicate], Iterator[pa.RecordBatch]],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Iterator[pa.RecordBatch]:
+    """Run ``extract`` for each predicate on a worker pool and yield batches as they land.
+
+    Each worker opens one connection with ``connect`` and reuses it for every
+    partition it picks up. The first worker error is re-raised to the consumer;
+    closing the generator early stops the workers.
+    """
+
+    work: "queue.Queue[Predicate]" = queue.Queue()
+    for predicate in predicates:
+        work.put(predicate)
+    workers = max(1, min(max_workers, len(predicates)))
+    results: "queue.Queue[object]" = queue.Queue(maxsize=workers * _QUEUE_BATCHES_PER_WORKER)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+
+    def _put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _worker() -> None:
+        conn = None
+        try:
+            conn = connect()
+            while not stop.is_set():
+                try:
+                    predicate = work.get_nowait()
+                except queue.Empty:
+                    break
+                for batch in extract(conn, predicate):
+                    if not _put(batch):
+                        return
+        except BaseException as exc:  # surfaced to the consumer below
+            errors.append(exc)
+            stop.set()
+        finally:
+            if conn is not None:
+                conn.close()
+            _put(_DONE)
+
+    threads = [
+        threading.Thread(target=_worker, name=f"ingest-partition-{index}", daemon=True)
+        for index in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        finished = 0
+        while finished < workers:
+            try:
+                item = results.get(timeout=0.1)
+            except queue.Empty:
+                if errors:
+                    break
+                continue
+            if item is _DONE:
+                finished += 1
+                continue
+            yield item  # type: ignore[misc]
+        if errors:
+            raise errors[0]
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,158 @@
+"""Sampled previews of data sources without importing them.
+
+A preview opens the connector, asks it for at most ``limit`` rows through
+:meth:`BaseConnector.preview` (which pushes the limit down to the source) and
+reports the rows together with the DuckDB types they would be loaded as.
+Results are cached for a few seconds per connector/config/limit so UI
+re-renders do not hit the source again.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from datetime import date, datetime
+from datetime import time as time_of_day
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import duckdb
+import pyarrow as pa
+
+from pluto_duck_backend.app.core.config import get_settings
+
+from .registry import ConnectorRegistry
+
+DEFAULT_PREVIEW_ROWS = 50
+MAX_PREVIEW_ROWS = 1000
+DEFAULT_CACHE_ENTRIES = 64
+
+
+@dataclass
+class PreviewResult:
+    connector: str
+    columns: List[Dict[str, str]] = field(default_factory=list)
+    rows: List[Dict[str, object]] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+    cached: bool = False
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+class PreviewCache:
+    """Small LRU of preview results that expire ``ttl_seconds`` after they were taken."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = DEFAULT_CACHE_ENTRIES) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, PreviewResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[PreviewResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, result: PreviewResult) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _json_safe(value: object) -> object:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime, date, time_of_day)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(key): _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, bytes):
+        return value.hex()
+    if isinstance(value, Decimal):
+        return str(value)
+    return str(value)
+
+
+def describe_columns(table: pa.Table) -> List[Dict[str, str]]:
+    """Column names with the DuckDB types the Arrow columns would be loaded as."""
+
+    con = duckdb.connect()
+    try:
+        relation = con.from_arrow(table)
+        return [
+            {"name": name, "type": str(column_type)}
+            for name, column_type in zip(relation.columns, relation.types, strict=True)
+        ]
+    finally:
+        con.close()
+
+
+def preview_source(
+    registry: ConnectorRegistry,
+    connector_name: str,
+    config: Dict[str, object],
+    limit: int = DEFAULT_PREVIEW_ROWS,
+    *,
+    cache: Optional[PreviewCache] = None,
+    refresh: bool = False,
+) -> PreviewResult:
+    """Read at most ``limit`` rows of a source and describe its columns.
+
+    With ``refresh`` the source is read even if a cached preview exists, and the
+    cache is updated with the new result.
+    """
+
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    limit = min(limit, MAX_PREVIEW_ROWS)
+    key = json.dumps([connector_name, config, limit], sort_keys=True, default=str)
+    if cache is not None and not refresh:
+        cached = cache.get(key)
+        if cached is not None:
+            return replace(cached, cached=True)
+
+    started = time.perf_counter()
+    connector = registry.create(connector_name, config)
+    connector.open()
+    try:
+        table = connector.preview(limit).slice(0, limit)
+    finally:
+        connector.close()
+    result = PreviewResult(
+        connector=connector_name,
+        columns=describe_columns(table),
+        rows=[
+            {name: _json_safe(value) for name, value in row.items()}
+            for row in table.to_pylist()
+        ],
+    )
+    result.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+@lru_cache(maxsize=1)
+def get_preview_cache() -> PreviewCache:
+    return PreviewCache(get_settings().ingestion.preview_cache_seconds)
@@ -1,37 +1,170 @@
-"""Registry for ingestion connectors."""
+"""Registry for ingestion connectors.
+
+Connectors are registered either eagerly (a class) or lazily (an import target
+such as ``"package.module:Connector"``). Lazy connectors are imported on first
+use, so a connector whose optional dependency is missing only fails when it is
+actually needed and is otherwise reported as unavailable with the reason.
+
+Third-party packages add connectors without touching this codebase by declaring
+an entry point in the ``pluto_duck.connectors`` group::
+
+    [project.entry-points."pluto_duck.connectors"]
+    mysql = "pluto_duck_mysql.connector:MySQLConnector"
+"""
 
 from __future__ import annotations
 
-from typing import Dict, Iterable, Type
+import importlib
+import logging
+import threading
+from dataclasses import dataclass
+from importlib.metadata import EntryPoint, entry_points
+from typing import Dict, Iterable, List, Optional, Type
 
 from .base import BaseConnector, SupportsConnector
 
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "pluto_duck.connectors"
+
+
+class ConnectorUnavailable(RuntimeError):
+    """Raised when a registered connector cannot be imported (e.g. a missing extra)."""
+
+    def __init__(self, name: str, reason: str) -> None:
+        super().__init__(f"Connector '{name}' is unavailable: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+@dataclass
+class ConnectorInfo:
+    name: str
+    available: bool
+    # "bundled", "plugin:<distribution>" or "registered" for classes added in code.
+    source: str
+    target: Optional[str] = None
+    reason: Optional[str] = None
+
+
+@dataclass
+class _ConnectorSpec:
+    name: str
+    source: str
+    target: Optional[str] = None
+    entry_point: Optional[EntryPoint] = None
+    connector_cls: Optional[SupportsConnector] = None
+    error: Optional[str] = None
+
 
 class ConnectorRegistry:
     """Simple registry mapping connector names to constructors."""
 
     def __init__(self) -> None:
-        self._registry: Dict[str, SupportsConnector] = {}
+        self._registry: Dict[str, _ConnectorSpec] = {}
+        self._lock = threading.Lock()
 
     def register(self, connector_cls: Type[BaseConnector]) -> None:
         name = connector_cls.name
         if name in self._registry:
             raise ValueError(f"Connector '{name}' already registered")
-        self._registry[name] = connector_cls
+        self._registry[name] = _ConnectorSpec(
+            name=name,
+            source="registered",
+            target=f"{connector_cls.__module__}:{connector_cls.__qualname__}",
+            connector_cls=connector_cls,
+        )
+
+    def register_lazy(
+        self,
+        name: str,
+        target: str,
+        *,
+        source: str = "bundled",
+        entry_point: Optional[EntryPoint] = None,
+    ) -> None:
+        """Register ``"module:Class"`` under ``name`` without importing it yet."""
+
+        if name in self._registry:
+            raise ValueError(f"Connector '{name}' already registered")
+        self._registry[name] = _ConnectorSpec(
+            name=name, source=source, target=target, entry_point=entry_point
+        )
+
+    def discover_entry_points(self, group: str = ENTRY_POINT_GROUP) -> List[str]:
+        """Lazily register connectors advertised by installed packages; returns their names."""
+
+        discovered: List[str] = []
+        for entry_point in entry_points(group=group):
+            existing = self._registry.get(entry_point.name)
+            if existing is not None:
+                if existing.target != entry_point.value:
+                    logger.warning(
+                        "Ignoring connector entry point %s=%s; '%s' is already registered",
+                        entry_point.name,
+                        entry_point.value,
+                        entry_point.name,
+                    )
+                continue
+            distribution = getattr(entry_point.dist, "name", None) or "unknown"
+            self.register_lazy(
+                entry_point.name,
+                entry_point.value,
+                source=f"plugin:{distribution}",
+                entry_point=entry_point,
+            )
+            discovered.append(entry_point.name)
+        return discovered
+
+    def _load(self, spec: _ConnectorSpec) -> SupportsConnector:
+        if spec.connector_cls is not None:
+            return spec.connector_cls
+        with self._lock:
+            if spec.connector_cls is None and spec.error is None:
+                try:
+                    if spec.entry_point is not None:
+                        loaded = spec.entry_point.load()
+                    else:
+                        module_name, _, attribute = str(spec.target).partition(":")
+                        loaded = getattr(importlib.import_module(module_name), attribute)
+                except Exception as exc:  # noqa: BLE001 - any import failure disables it
+                    spec.error = f"{type(exc).__name__}: {exc}"
+                    logger.info("Connector '%s' unavailable: %s", spec.name, spec.error)
+                else:
+                    spec.connector_cls = loaded
+        if spec.connector_cls is None:
+            raise ConnectorUnavailable(spec.name, str(spec.error))
+        return spec.connector_cls
+
+    def get(self, name: str) -> SupportsConnector:
+        """The connector class for ``name``, importing it on first use."""
 
-    def create(self, name: str, config: Dict[str, object]) -> BaseConnector:
         if name not in self._registry:
             raise KeyError(f"Unknown connector '{name}'")
-        return self._registry[name](config)
+        return self._load(self._registry[name])
+
+    def create(self, name: str, config: Dict[str, object]) -> BaseConnector:
+        return self.get(name)(config)
 
     def list_connectors(self) -> Iterable[str]:
         return self._registry.keys()
 
+    def describe(self) -> List[ConnectorInfo]:
+        """Every registered connector with whether it can be imported here, and why not."""
+
+        infos: List[ConnectorInfo] = []
+        for name, spec in sorted(self._registry.items()):
+            try:
+                self._load(spec)
+            except ConnectorUnavailable as exc:
+                infos.append(ConnectorInfo(name, False, spec.source, spec.target, exc.reason))
+            else:
+                infos.append(ConnectorInfo(name, True, spec.source, spec.target))
+        return infos
+
 
 _registry = ConnectorRegistry()
 
 
 def get_registry() -> ConnectorRegistry:
     return _registry
-
-
@@ -0,0 +1,97 @@
+"""Attach-and-copy ingestion using DuckDB's database scanner extensions.
+
+When the relevant extension (``sqlite_scanner``, ``postgres_scanner``) is already
+installed, the source is ATTACHed read-only and the target is created with a
+single ``CREATE TABLE AS`` executed by DuckDB's vectorized engine, so no rows are
+converted in Python.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, List
+from uuid import uuid4
+
+import duckdb
+
+from pluto_duck_backend.app.core import warehouse
+
+from .duckdb_loader import _quote_identifier
+from .files import sql_string
+
+SOURCE_ALIAS_PLACEHOLDER = "{source}"
+
+
+class ScannerUnavailable(RuntimeError):
+    """Raised when the scanner extension for a source is not installed locally."""
+
+
+@dataclass
+class ScannerSource:
+    """How to reach a connector's data from inside DuckDB."""
+
+    extension: str
+    attach_type: str
+    attach_target: str
+    # SELECT run with the attached source as the default catalog; ``{source}`` is
+    # replaced with the (unique, quoted) attach alias for scanner table functions.
+    select_sql: str
+    parameters: List[Any] = field(default_factory=list)
+
+
+def extension_available(con: duckdb.DuckDBPyConnection, extension: str) -> bool:
+    """True if ``extension`` is loaded or installed, without triggering a download."""
+
+    row = con.execute(
+        """
+        SELECT bool_or(installed OR loaded)
+        FROM duckdb_extensions()
+        WHERE extension_name = ? OR list_contains(aliases, ?)
+        """,
+        [extension, extension],
+    ).fetchone()
+    return bool(row and row[0])
+
+
+def load_via_scanner(
+    database_path: Path,
+    target_table: str,
+    source: ScannerSource,
+    *,
+    overwrite: bool = False,
+) -> int:
+    """Copy ``source`` into ``target_table`` entirely inside DuckDB; returns the row count."""
+
+    alias = f"pluto_source_{uuid4().hex[:8]}"
+    with warehouse.connect(database_path) as con:
+        if not extension_available(con, source.extension):
+            raise ScannerUnavailable(f"DuckDB extension '{source.extension}' is not installed")
+        con.execute(f"LOAD {source.extension}")
+        catalog = con.execute("SELECT current_database()").fetchone()[0]
+        con.execute(
+            f"ATTACH {sql_string(source.attach_target)} AS {alias} "
+            f"(TYPE {source.attach_type}, READ_ONLY)"
+        )
+        try:
+            qualified = f"{_quote_identifier(catalog)}.main.{_quote_identifier(target_table)}"
+            select_sql = source.select_sql.replace(SOURCE_ALIAS_PLACEHOLDER, sql_string(alias))
+            con.begin()
+            try:
+                con.execute(f"USE {alias}")
+                if overwrite:
+                    con.execute(f"DROP TABLE IF EXISTS {qualified}")
+                row = con.execute(
+                    f"CREATE TABLE {qualified} AS {select_sql}", source.parameters
+                ).fetchone()
+                if row is None:
+                    row = con.execute(f"SELECT COUNT(*) FROM {qualified}").fetchone()
+            except BaseException:
+                con.rollback()
+                raise
+            con.commit()
+        finally:
+            con.execute(f"USE {_quote_identifier(catalog)}")
+            con.execute(f"DETACH {alias}")
+
+    return int(row[0]) if row else 0
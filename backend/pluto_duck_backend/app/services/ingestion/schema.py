@@ -0,0 +1,142 @@
+"""Schema drift detection between a staged load and its existing target table.
+
+Additive changes (new columns) and safe widenings (``INTEGER`` -> ``BIGINT``,
+``BIGINT`` -> ``DOUBLE``, ``DATE`` -> ``TIMESTAMP`` ...) are applied to the
+target with ``ALTER TABLE``. Anything else is incompatible and, depending on the
+policy, either rejects the load or diverts the offending rows to a quarantine
+table while the rest are cast back to the target's type.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA_POLICIES = ("evolve", "quarantine", "reject")
+SCHEMA_HISTORY_LIMIT = 50
+
+_INTEGERS = ("TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT")
+_FLOATS = ("FLOAT", "DOUBLE")
+_DECIMAL = re.compile(r"DECIMAL\((\d+),\s*(\d+)\)")
+
+
+class SchemaDriftError(ValueError):
+    """Raised when a load's schema changes in a way the policy does not allow."""
+
+    def __init__(self, target_table: str, changes: List["ColumnChange"]) -> None:
+        rendered = ", ".join(
+            f"{change.column} ({change.kind}: {change.old_type} -> {change.new_type})"
+            for change in changes
+        )
+        super().__init__(f"Schema of '{target_table}' changed incompatibly: {rendered}")
+        self.changes = changes
+
+
+@dataclass
+class ColumnChange:
+    column: str
+    # "added", "widened", "narrowed" (incoming fits the existing type), "removed"
+    # or "incompatible".
+    kind: str
+    old_type: Optional[str] = None
+    new_type: Optional[str] = None
+
+
+@dataclass
+class SchemaDiff:
+    changes: List[ColumnChange] = field(default_factory=list)
+    quarantined_rows: int = 0
+
+    def of_kind(self, *kinds: str) -> List[ColumnChange]:
+        return [change for change in self.changes if change.kind in kinds]
+
+    @property
+    def incompatible(self) -> List[ColumnChange]:
+        return self.of_kind("incompatible")
+
+    @property
+    def notable(self) -> List[ColumnChange]:
+        """Changes worth recording; narrowed and removed columns recur on every load."""
+
+        return self.of_kind("added", "widened", "incompatible")
+
+    def history_entry(self) -> Dict[str, object]:
+        entry: Dict[str, object] = {
+            "at": datetime.now(UTC).isoformat(),
+            "changes": [asdict(change) for change in self.notable],
+        }
+        if self.quarantined_rows:
+            entry["quarantined_rows"] = self.quarantined_rows
+        return entry
+
+
+def _decimal(column_type: str) -> Optional[Tuple[int, int]]:
+    match = _DECIMAL.fullmatch(column_type)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _fits(narrow: str, wide: str) -> bool:
+    """True if every ``narrow`` value converts losslessly (enough) into ``wide``."""
+
+    if narrow == wide or wide == "VARCHAR":
+        return True
+    if narrow in _INTEGERS and wide in _INTEGERS:
+        return _INTEGERS.index(narrow) <= _INTEGERS.index(wide)
+    if narrow in _FLOATS and wide in _FLOATS:
+        return _FLOATS.index(narrow) <= _FLOATS.index(wide)
+    if narrow in _INTEGERS and wide == "DOUBLE":
+        return True
+    if narrow in _INTEGERS and wide == "FLOAT":
+        return _INTEGERS.index(narrow) <= _INTEGERS.index("SMALLINT")
+    narrow_decimal, wide_decimal = _decimal(narrow), _decimal(wide)
+    if narrow_decimal and wide == "DOUBLE":
+        return True
+    if narrow_decimal and wide_decimal:
+        return (
+            wide_decimal[0] - wide_decimal[1] >= narrow_decimal[0] - narrow_decimal[1]
+            and wide_decimal[1] >= narrow_decimal[1]
+        )
+    if narrow in _INTEGERS[:3] and wide_decimal:
+        return wide_decimal[0] - wide_decimal[1] >= 10
+    if narrow == "DATE" and wide in ("TIMESTAMP", "TIMESTAMP WITH TIME ZONE"):
+        return True
+    return False
+
+
+def diff_schemas(existing: Dict[str, str], incoming: Dict[str, str]) -> SchemaDiff:
+    """Classify how ``incoming`` column types differ from the ``existing`` table."""
+
+    diff = SchemaDiff()
+    for column, new_type in incoming.items():
+        old_type = existing.get(column)
+        if old_type is None:
+            diff.changes.append(ColumnChange(column, "added", None, new_type))
+        elif old_type == new_type:
+            continue
+        elif _fits(old_type, new_type) and new_type != "VARCHAR":
+            diff.changes.append(ColumnChange(column, "widened", old_type, new_type))
+        elif _fits(new_type, old_type):
+            diff.changes.append(ColumnChange(column, "narrowed", old_type, new_type))
+        else:
+            diff.changes.append(ColumnChange(column, "incompatible", old_type, new_type))
+    for column, old_type in existing.items():
+        if column not in incoming:
+            diff.changes.append(ColumnChange(column, "removed", old_type, None))
+    return diff
+
+
+def append_history(
+    history: object,
+    diff: SchemaDiff,
+    *,
+    limit: int = SCHEMA_HISTORY_LIMIT,
+) -> List[Dict[str, object]]:
+    """Previous ``schema_history`` plus an entry for ``diff``, newest last."""
+
+    entries: List[Dict[str, object]] = []
+    if isinstance(history, list):
+        entries = [entry for entry in history if isinstance(entry, dict)]
+    entries.append(diff.history_entry())
+    return entries[-limit:]
@@ -2,12 +2,28 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
 from dataclasses import dataclass
+from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
-from .base import IngestionContext
+import duckdb
+
+from .base import BaseConnector, IngestionContext, Watermark
+from .duckdb_loader import DuckDBLoader, MergeResult, ProgressCallback
+from .metrics import RunProfile
 from .registry import ConnectorRegistry
+from .scanner import ScannerUnavailable, load_via_scanner
+from .schema import SCHEMA_POLICIES, SchemaDiff, append_history
+
+logger = logging.getLogger(__name__)
+
+SYNC_MODES = ("full", "append", "upsert")
+# "auto" prefers DuckDB's scanner extensions and falls back to Python extraction.
+ENGINES = ("auto", "scanner", "python")
 
 
 @dataclass
@@ -17,6 +33,30 @@ class IngestionJob:
     warehouse_path: Path
     overwrite: bool = False
     config: Dict[str, object] | None = None
+    chunk_size: Optional[int] = None
+    progress: Optional[ProgressCallback] = None
+    state: Dict[str, object] | None = None
+    # "append"/"upsert" merge rows past the stored watermark into an existing table.
+    sync_mode: str = "full"
+    watermark_column: Optional[str] = None
+    primary_key: Optional[List[str]] = None
+    engine: str = "auto"
+    # Seconds to keep the table replaced by an overwrite for rollback; 0 drops it at once.
+    rollback_window_seconds: float = 0
+    # Re-import even when the source fingerprint matches the previous run.
+    force: bool = False
+    # Append only the files recorded as failed in ``state`` to the existing table.
+    retry_failed_files: bool = False
+    # How to treat incoming schema changes against an existing table (see schema.py).
+    schema_policy: str = "evolve"
+
+
+def _json_value(value: object) -> object:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
 
 
 class IngestionService:
@@ -26,22 +66,257 @@ class IngestionService:
         self.registry = registry
 
     def run(self, job: IngestionJob) -> Dict[str, object]:
+        if job.sync_mode not in SYNC_MODES:
+            raise ValueError(f"Unknown sync mode '{job.sync_mode}'")
+        if job.sync_mode == "upsert" and not job.primary_key:
+            raise ValueError("upsert sync requires a primary_key")
+        if job.engine not in ENGINES:
+            raise ValueError(f"Unknown ingestion engine '{job.engine}'")
+        if job.schema_policy not in SCHEMA_POLICIES:
+            raise ValueError(f"Unknown schema policy '{job.schema_policy}'")
+
+        state = dict(job.state or {})
+        loader = DuckDBLoader(job.warehouse_path)
+        target_exists = loader.table_exists(job.target_table)
+        incremental = job.sync_mode != "full" and target_exists
+        previous_watermark = state.get("watermark") if job.watermark_column else None
+
         connector = self.registry.create(job.connector, job.config or {})
-        connector.open()
-        try:
-            context = IngestionContext(
-                target_table=job.target_table,
-                warehouse_path=job.warehouse_path,
-                overwrite=job.overwrite,
+        connector.state = state
+
+        retry_files: List[str] = []
+        if job.retry_failed_files:
+            if not connector.supports_file_retry:
+                raise ValueError(f"Connector '{connector.name}' cannot retry individual files")
+            retry_files = sorted(dict(state.get("failed_files") or {}))
+            if not retry_files or not target_exists:
+                result = self._unchanged_result(job, state.get("fingerprint"), previous_watermark)
+                result["metadata"] = {}
+                return result
+            connector.retry_files = retry_files
+            incremental = False
+
+        fingerprint = self._fingerprint(connector, job.config or {})
+        if (
+            fingerprint is not None
+            and not job.force
+            and not retry_files
+            and state.get("fingerprint") == fingerprint
+            and target_exists
+        ):
+            return self._unchanged_result(job, fingerprint, previous_watermark)
+
+        if target_exists and not (job.overwrite or incremental or retry_files):
+            raise ValueError(
+                f"Table '{job.target_table}' already exists; set overwrite to replace it "
+                "or use sync_mode 'append' to add rows"
             )
-            row_count = connector.materialize(context)
-            metadata = connector.fetch_metadata()
-        finally:
-            connector.close()
 
-        return {
+        if incremental and previous_watermark is not None and connector.supports_watermark:
+            connector.watermark = Watermark(job.watermark_column, previous_watermark)
+
+        profile = RunProfile()
+        with profile:
+            with profile.stage("open"):
+                connector.open()
+            try:
+                context = IngestionContext(
+                    target_table=job.target_table,
+                    warehouse_path=job.warehouse_path,
+                    overwrite=job.overwrite,
+                    chunk_size=job.chunk_size,
+                    progress=job.progress,
+                )
+                with profile.stage("load"):
+                    row_count, used_scanner, merge, schema_diff = self._load(
+                        job,
+                        connector,
+                        loader,
+                        context,
+                        target_exists=target_exists,
+                        incremental=incremental,
+                        retrying=bool(retry_files),
+                        previous_watermark=previous_watermark,
+                    )
+                with profile.stage("metadata"):
+                    metadata = connector.fetch_metadata()
+            finally:
+                with profile.stage("close"):
+                    connector.close()
+        loader.bump_version(job.target_table)
+
+        if used_scanner:
+            metadata["engine"] = "scanner"
+        else:
+            metadata.setdefault("engine", "python")
+        if fingerprint is not None:
+            metadata["fingerprint"] = fingerprint
+        profile.add_rows("load", row_count)
+        metadata["stages"] = profile.to_dict()
+
+        result: Dict[str, object] = {
             "rows_ingested": row_count,
             "metadata": metadata,
+            "stages": metadata["stages"],
         }
+        if retry_files:
+            result["retried_files"] = len(retry_files)
+        if schema_diff is not None and schema_diff.notable:
+            metadata["schema_history"] = append_history(state.get("schema_history"), schema_diff)
+            result["schema_changes"] = metadata["schema_history"][-1]["changes"]
+            if schema_diff.quarantined_rows:
+                result["rows_quarantined"] = schema_diff.quarantined_rows
+        if job.watermark_column or job.sync_mode != "full":
+            watermark = previous_watermark
+            if job.watermark_column:
+                watermark = _json_value(loader.max_value(job.target_table, job.watermark_column))
+                metadata["watermark"] = watermark
+            result.update(
+                {
+                    "sync_mode": job.sync_mode,
+                    "rows_inserted": merge.inserted if merge else row_count,
+                    "rows_updated": merge.updated if merge else 0,
+                    "watermark": watermark,
+                }
+            )
+        return result
+
+    def _load(
+        self,
+        job: IngestionJob,
+        connector: BaseConnector,
+        loader: DuckDBLoader,
+        context: IngestionContext,
+        *,
+        target_exists: bool,
+        incremental: bool,
+        retrying: bool,
+        previous_watermark: object,
+    ) -> Tuple[int, bool, Optional[MergeResult], Optional[SchemaDiff]]:
+        """Materialize the source into the target; returns (rows, used_scanner, merge, diff)."""
+
+        merge: Optional[MergeResult] = None
+        schema_diff: Optional[SchemaDiff] = None
+        if not target_exists:
+            row_count, used_scanner = self._materialize(connector, context, job.engine)
+        elif retrying or incremental:
+            # Stage, reconcile the schema, then merge into the live table. Retried
+            # files contributed no rows before, so appending them cannot duplicate.
+            context.target_table = loader.staging_table_name(job.target_table)
+            context.overwrite = True
+            try:
+                row_count, used_scanner = self._materialize(connector, context, job.engine)
+                if loader.table_exists(context.target_table):
+                    schema_diff = loader.reconcile_schema(
+                        context.target_table, job.target_table, policy=job.schema_policy
+                    )
+                    merge = loader.merge_table(
+                        context.target_table,
+                        job.target_table,
+                        primary_key=job.primary_key
+                        if incremental and job.sync_mode == "upsert"
+                        else None,
+                        watermark=(job.watermark_column, previous_watermark)
+                        if incremental and job.watermark_column
+                        else None,
+                    )
+            finally:
+                loader.drop_table(context.target_table)
+            row_count = merge.inserted + merge.updated if merge else 0
+        else:
+            # Load beside the live table and swap it in, so readers never see a gap.
+            context.target_table = loader.staging_table_name(job.target_table)
+            try:
+                row_count, used_scanner = self._materialize(connector, context, job.engine)
+                if loader.table_exists(context.target_table):
+                    schema_diff = loader.reconcile_schema(
+                        context.target_table,
+                        job.target_table,
+                        policy=job.schema_policy,
+                        alter_target=False,
+                    )
+                    row_count -= schema_diff.quarantined_rows
+                    loader.swap_table(
+                        context.target_table,
+                        job.target_table,
+                        expected_rows=row_count,
+                        retain_previous=job.rollback_window_seconds > 0,
+                    )
+            finally:
+                loader.drop_table(context.target_table)
+            loader.purge_previous_versions(job.rollback_window_seconds)
+        return row_count, used_scanner, merge, schema_diff
+
+    def _fingerprint(self, connector: BaseConnector, config: Dict[str, object]) -> Optional[str]:
+        """Source fingerprint bound to the connector config, so config edits force a load."""
+
+        try:
+            source = connector.fingerprint()
+        except OSError as exc:
+            logger.debug("Could not fingerprint %s source: %s", connector.name, exc)
+            return None
+        if source is None:
+            return None
+        settings = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha256(f"{settings}\0{source}".encode()).hexdigest()
+
+    def _unchanged_result(
+        self,
+        job: IngestionJob,
+        fingerprint: object,
+        watermark: object,
+    ) -> Dict[str, object]:
+        result: Dict[str, object] = {
+            "rows_ingested": 0,
+            "skipped": True,
+            "metadata": {"fingerprint": fingerprint},
+        }
+        if job.watermark_column or job.sync_mode != "full":
+            result.update(
+                {
+                    "sync_mode": job.sync_mode,
+                    "rows_inserted": 0,
+                    "rows_updated": 0,
+                    "watermark": watermark,
+                }
+            )
+        return result
 
+    def _materialize(
+        self,
+        connector: BaseConnector,
+        context: IngestionContext,
+        engine: str,
+    ) -> tuple[int, bool]:
+        """Load through DuckDB's scanner when possible; returns (rows, used_scanner)."""
 
+        source = connector.scanner_source() if engine != "python" else None
+        if source is not None:
+            try:
+                rows = load_via_scanner(
+                    context.warehouse_path,
+                    context.target_table,
+                    source,
+                    overwrite=context.overwrite,
+                )
+                return rows, True
+            except ScannerUnavailable as exc:
+                if engine == "scanner":
+                    raise
+                # Expected whenever the extension is not installed; not worth a warning.
+                logger.info(
+                    "Scanner ingestion for %s unavailable, falling back to Python: %s",
+                    connector.name,
+                    exc,
+                )
+            except duckdb.Error as exc:
+                if engine == "scanner":
+                    raise
+                logger.warning(
+                    "Scanner ingestion for %s failed, falling back to Python: %s",
+                    connector.name,
+                    exc,
+                )
+        elif engine == "scanner":
+            raise ValueError(f"Connector '{connector.name}' does not support the scanner engine")
+        return connector.materialize(context), False
@@ -10,7 +10,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
-import duckdb
+from pluto_duck_backend.app.core import table_versions, warehouse
 
 
 class DbtInvocationError(RuntimeError):
@@ -42,15 +42,18 @@ class DbtService:
     ) -> Dict[str, object]:
         command = ["dbt"] + args + ["--target-path", str(self.artifacts_dir)]
         try:
-            process = subprocess.run(
-                command,
-                cwd=self.project_dir,
-                env={**dict(os.environ), **(env or {})},
-                text=True,
-                capture_output=True,
-                check=False,
-            )
-        except FileNotFoundError as exc:
+            # dbt opens the warehouse from its own process, which DuckDB's file lock
+            # only allows while this process has the database closed.
+            with warehouse.get_warehouse_manager().release(self.warehouse_path):
+                process = subprocess.run(
+                    command,
+                    cwd=self.project_dir,
+                    env={**dict(os.environ), **(env or {})},
+                    text=True,
+                    capture_output=True,
+                    check=False,
+                )
+        except (FileNotFoundError, warehouse.WarehouseBusyError) as exc:
             raise DbtInvocationError(str(exc)) from exc
         if process.returncode != 0:
             raise DbtInvocationError(process.stderr)
@@ -111,8 +114,7 @@ class DbtService:
         models: List[Dict[str, object]],
         manifest_models: Dict[str, Dict[str, object]],
     ) -> None:
-        con = duckdb.connect(str(self.warehouse_path))
-        try:
+        with warehouse.connect(self.warehouse_path) as con:
             con.execute(
                 """
                 CREATE TABLE IF NOT EXISTS dbt_run_history (
@@ -130,6 +132,8 @@ class DbtService:
                 """,
                 [run_id, command_name, generated_at, str(self.artifacts_dir)],
             )
+            # dbt may have rebuilt any model; results cached before this run are stale.
+            table_versions.bump(con, [table_versions.ANY_TABLE])
 
             con.execute(
                 """
@@ -164,8 +168,6 @@ class DbtService:
                         generated_at,
                     ],
                 )
-        finally:
-            con.close()
 
     def run(
         self,
@@ -0,0 +1,120 @@
+from pathlib import Path
+from uuid import uuid4
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pluto_duck_backend.app.api.router import api_router
+from pluto_duck_backend.app.services.chat.repository import ChatRepository
+from pluto_duck_backend.app.services.data_sources import DataSourceRepository
+from pluto_duck_backend.app.services.ingestion import (
+    IngestionJob,
+    IngestionJobManager,
+    IngestionService,
+    get_ingestion_job_manager,
+    get_registry,
+)
+
+
+def create_app(warehouse: Path, *, inline: bool = False):
+    from pluto_duck_backend.app.api.v1.data_sources.router import get_repository
+
+    app = FastAPI()
+    repo = DataSourceRepository(warehouse, ChatRepository(warehouse)._default_project_id)
+    manager = IngestionJobManager(IngestionService(get_registry()), warehouse, worker_count=1)
+    original_submit = manager.submit
+
+    def submit_with_override(job: IngestionJob, **kwargs):
+        job.warehouse_path = warehouse
+        record = original_submit(job, **kwargs)
+        if inline:
+            # Finish before the endpoint continues, like a very fast job would.
+            manager.wait_for(record.job_id)
+        return record
+
+    manager.submit = submit_with_override  # type: ignore[assignment]
+    app.dependency_overrides[get_repository] = lambda: repo
+    app.dependency_overrides[get_ingestion_job_manager] = lambda: manager
+    app.include_router(api_router)
+    return app, repo, manager
+
+
+def create_payload(path: Path) -> dict:
+    return {
+        "name": "People",
+        "connector_type": "csv",
+        "source_config": {"path": str(path)},
+        "target_table": "people",
+        "overwrite": True,
+    }
+
+
+def test_fast_import_is_not_left_syncing(tmp_path: Path) -> None:
+    csv_file = tmp_path / "people.csv"
+    csv_file.write_text("id,name\n1,Alice\n2,Bob\n", encoding="utf-8")
+    app, repo, _ = create_app(tmp_path / "warehouse.duckdb", inline=True)
+    client = TestClient(app)
+
+    created = client.post("/api/v1/data-sources", json=create_payload(csv_file)).json()
+
+    source = repo.get(created["id"])
+    assert source.status == "active"
+    assert source.rows_count == 2
+
+
+def test_create_imports_in_background_and_activates_source(tmp_path: Path) -> None:
+    csv_file = tmp_path / "people.csv"
+    csv_file.write_text("id,name\n1,Alice\n2,Bob\n", encoding="utf-8")
+    app, _, manager = create_app(tmp_path / "warehouse.duckdb")
+    client = TestClient(app)
+
+    response = client.post("/api/v1/data-sources", json=create_payload(csv_file))
+    assert response.status_code == 200
+    created = response.json()
+    assert created["status"] == "syncing"
+    assert created["job_id"]
+
+    assert manager.wait_for(created["job_id"]).status == "success"
+    job = client.get(f"/api/v1/ingest/jobs/{created['job_id']}").json()
+    assert job["source_id"] == created["id"]
+    assert job["result"]["rows_ingested"] == 2
+    [source] = client.get("/api/v1/data-sources").json()
+    assert source["status"] == "active"
+    assert source["rows_count"] == 2
+    assert source["error_message"] is None
+
+    # Re-syncing an unchanged file is skipped but keeps the row count.
+    synced = client.post(f"/api/v1/data-sources/{created['id']}/sync").json()
+    assert manager.wait_for(synced["job_id"]).result["skipped"] is True
+    [source] = client.get("/api/v1/data-sources").json()
+    assert (source["status"], source["rows_count"]) == ("active", 2)
+
+
+def test_sync_and_rollback_conflict_while_syncing(tmp_path: Path) -> None:
+    app, repo, _ = create_app(tmp_path / "warehouse.duckdb")
+    client = TestClient(app)
+    source_id = repo.create("People", "csv", {"path": "people.csv"}, "people")
+    repo.update_import_status(source_id, status="syncing")
+
+    assert client.post(f"/api/v1/data-sources/{source_id}/sync").status_code == 409
+    assert client.post(f"/api/v1/data-sources/{source_id}/rollback").status_code == 409
+    assert client.post(f"/api/v1/data-sources/{uuid4()}/sync").status_code == 404
+
+
+def test_failed_import_marks_source_as_error(tmp_path: Path) -> None:
+    app, _, manager = create_app(tmp_path / "warehouse.duckdb")
+    client = TestClient(app)
+
+    created = client.post(
+        "/api/v1/data-sources", json=create_payload(tmp_path / "missing.csv")
+    ).json()
+
+    job = manager.wait_for(created["job_id"])
+    assert job.status == "failed"
+    assert job.error
+    [source] = client.get("/api/v1/data-sources").json()
+    assert source["status"] == "error"
+    assert source["error_message"] == job.error
+    # A failed source can be synced again.
+    retried = client.post(f"/api/v1/data-sources/{created['id']}/sync")
+    assert retried.status_code == 200
+    assert manager.wait_for(retried.json()["job_id"]).status == "failed"
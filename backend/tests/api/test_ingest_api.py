@@ -2,9 +2,8 @@ from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
-
 from pluto_duck_backend.app.api.router import api_router
-from pluto_duck_backend.app.services.ingestion import IngestionService, IngestionJob, get_registry
+from pluto_duck_backend.app.services.ingestion import IngestionJob, IngestionService, get_registry
 
 
 def create_app(warehouse: Path) -> FastAPI:
@@ -44,3 +43,44 @@ def test_ingest_endpoint(tmp_path: Path, monkeypatch) -> None:
     response = client.post("/api/v1/ingest", json=payload)
     assert response.status_code == 200
 
+
+
+def test_ingest_job_endpoints(tmp_path: Path) -> None:
+    from pluto_duck_backend.app.services.ingestion import (
+        IngestionJobManager,
+        get_ingestion_job_manager,
+    )
+
+    warehouse = tmp_path / "warehouse.duckdb"
+    manager = IngestionJobManager(IngestionService(get_registry()), warehouse, worker_count=1)
+    original_submit = manager.submit
+
+    def submit_with_override(job: IngestionJob, **kwargs):
+        job.warehouse_path = warehouse
+        return original_submit(job, **kwargs)
+
+    manager.submit = submit_with_override  # type: ignore[assignment]
+    app = FastAPI()
+    app.dependency_overrides[get_ingestion_job_manager] = lambda: manager
+    app.include_router(api_router)
+    client = TestClient(app)
+
+    (tmp_path / "data.csv").write_text("id,name\n1,Alice\n2,Bob\n", encoding="utf-8")
+    payload = {
+        "connector": "csv",
+        "target_table": "people",
+        "config": {"path": str(tmp_path / "data.csv")},
+    }
+    response = client.post("/api/v1/ingest/jobs", json=payload)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    rejected = client.get(f"/api/v1/ingest/jobs/{job_id}/events", params={"poll_interval": 0})
+    assert rejected.status_code == 422
+    events = client.get(f"/api/v1/ingest/jobs/{job_id}/events", params={"poll_interval": 0.1})
+    assert '"event": "completed"' in events.text
+
+    status = client.get(f"/api/v1/ingest/jobs/{job_id}").json()
+    assert status["status"] == "success"
+    assert status["result"]["rows_ingested"] == 2
+    assert client.get("/api/v1/ingest/jobs/missing").status_code == 404
@@ -3,9 +3,12 @@ from uuid import uuid4
 
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
-
 from pluto_duck_backend.app.api.router import api_router
-from pluto_duck_backend.app.services.execution import QueryExecutionService
+from pluto_duck_backend.app.services.execution import (
+    QueryExecutionService,
+    ResultRetention,
+    RetentionPolicy,
+)
 from pluto_duck_backend.app.services.execution.manager import QueryExecutionManager
 
 
@@ -14,6 +17,7 @@ def create_app(warehouse: Path) -> FastAPI:
 
     service = QueryExecutionService(warehouse)
     manager = QueryExecutionManager(service)
+    retention = ResultRetention(warehouse, RetentionPolicy(max_tables=0))
 
     def override_service() -> QueryExecutionService:
         return service
@@ -22,10 +26,15 @@ def create_app(warehouse: Path) -> FastAPI:
         return manager
 
     app.dependency_overrides = {}
-    from pluto_duck_backend.app.api.v1.query.router import get_execution_manager, get_execution_service
+    from pluto_duck_backend.app.api.v1.query.router import (
+        get_execution_manager,
+        get_execution_service,
+        get_result_retention,
+    )
 
     app.dependency_overrides[get_execution_service] = override_service
     app.dependency_overrides[get_execution_manager] = override_manager
+    app.dependency_overrides[get_result_retention] = lambda: retention
     app.include_router(api_router)
     return app
 
@@ -43,4 +52,137 @@ def test_submit_and_fetch_query(tmp_path):
     assert fetch_response.status_code == 200
     stream_response = client.get(f"/api/v1/query/{run_id}/events")
     assert stream_response.status_code == 200
+    # The cache route is not shadowed by /{run_id}.
+    assert client.get("/api/v1/query/cache").json() == {"enabled": False}
+
+
+
+def test_query_rows_pagination_and_formats(tmp_path):
+    import json
+
+    import pyarrow as pa
+
+    app = create_app(tmp_path / "warehouse.duckdb")
+    client = TestClient(app)
+    sql = "select range as id, 'row ' || range as label from range(25)"
+    run_id = client.post("/api/v1/query", json={"sql": sql}).json()["run_id"]
+
+    first = client.get(f"/api/v1/query/{run_id}/rows", params={"limit": 10, "columns": "id"})
+    assert first.status_code == 200
+    page = first.json()
+    assert page["columns"] == [{"name": "id", "type": "BIGINT"}]
+    assert [row["id"] for row in page["rows"]] == list(range(10))
+    assert page["next_cursor"] and first.headers["X-Next-Cursor"] == page["next_cursor"]
+
+    rest = client.get(
+        f"/api/v1/query/{run_id}/rows",
+        params={"cursor": page["next_cursor"]},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert rest.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in rest.text.splitlines()]
+    assert [row["id"] for row in rows] == list(range(10, 25))
+    assert rows[0]["label"] == "row 10"
+    assert "X-Next-Cursor" not in rest.headers
+
+    arrow = client.get(f"/api/v1/query/{run_id}/rows", params={"format": "arrow", "limit": 5})
+    table = pa.ipc.open_stream(arrow.content).read_all()
+    assert table.column_names == ["id", "label"]
+    assert table.column("id").to_pylist() == list(range(5))
+
+    assert client.get(f"/api/v1/query/{run_id}/rows", params={"columns": "nope"}).status_code == 400
+    assert client.get(f"/api/v1/query/{run_id}/rows", params={"cursor": "bad"}).status_code == 400
+    assert client.get(f"/api/v1/query/{uuid4()}/rows").status_code == 404
+
+
+def test_stream_mode_returns_rows_without_result_table(tmp_path):
+    import json
+
+    client = TestClient(create_app(tmp_path / "warehouse.duckdb"))
+    response = client.post(
+        "/api/v1/query", json={"sql": "select range as id from range(3)", "mode": "stream"}
+    )
+    assert response.status_code == 200
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [0, 1, 2]
+
+    job = client.get(f"/api/v1/query/{response.headers['X-Run-Id']}").json()
+    assert job["status"] == "success"
+    assert job["result_table"] is None
+
+
+def test_gc_drops_unpinned_results(tmp_path):
+    client = TestClient(create_app(tmp_path / "warehouse.duckdb"))
+    kept = client.post("/api/v1/query", json={"sql": "select 1 as value"}).json()["run_id"]
+    dropped = client.post("/api/v1/query", json={"sql": "select 2 as value"}).json()["run_id"]
+
+    pinned = client.put(f"/api/v1/query/{kept}/pin")
+    assert pinned.status_code == 200
+    assert pinned.json()["pinned"] is True
+
+    sweep = client.post("/api/v1/query/gc").json()
+    assert sweep["dropped"] == [f"query_result_{dropped.replace('-', '')}"]
+    assert sweep["pinned"] == 1
+
+    assert client.get(f"/api/v1/query/{kept}/rows").status_code == 200
+    assert client.get(f"/api/v1/query/{dropped}").json()["expired_at"] is not None
+    assert client.get(f"/api/v1/query/{dropped}/rows").status_code == 410
+    assert client.put(f"/api/v1/query/{dropped}/pin").status_code == 410
+    assert client.delete(f"/api/v1/query/{kept}/pin").json()["pinned"] is False
+
+
+def test_stream_mode_records_query_errors(tmp_path, monkeypatch):
+    import duckdb
+
+    client = TestClient(create_app(tmp_path / "warehouse.duckdb"))
+    run_id = str(uuid4())
+    response = client.post(
+        "/api/v1/query",
+        json={"sql": "select * from missing_table", "mode": "stream", "run_id": run_id},
+    )
+    assert response.status_code == 400
+    assert "missing_table" in response.json()["detail"]
+
+    job = client.get(f"/api/v1/query/{run_id}").json()
+    assert job["status"] == "failed"
+    assert "missing_table" in job["error"]
+
+    def unavailable(self, con, run_id):
+        raise duckdb.IOException("warehouse unavailable")
+
+    monkeypatch.setattr(QueryExecutionService, "_query_sql", unavailable)
+    run_id = str(uuid4())
+    response = client.post(
+        "/api/v1/query", json={"sql": "select 1", "mode": "stream", "run_id": run_id}
+    )
+    assert response.status_code == 400
+    job = client.get(f"/api/v1/query/{run_id}").json()
+    assert job["status"] == "failed"
+    assert job["error"] == "warehouse unavailable"
+
+
+def test_unread_stream_returns_its_warehouse_cursor(tmp_path):
+    import asyncio
+
+    import pytest
+    from pluto_duck_backend.app.api.v1.query.router import _stream_query
+    from pluto_duck_backend.app.core import warehouse
+
+    path = tmp_path / "warehouse.duckdb"
+    service = QueryExecutionService(path)
+    response = _stream_query("select range as id from range(3)", {}, None, service)
+
+    manager = warehouse.get_warehouse_manager()
+    with pytest.raises(warehouse.WarehouseBusyError):
+        with manager.release(path, timeout=0.1):
+            pass
+
+    async def disconnect():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
 
+    # The client goes away before any of the body is read.
+    asyncio.run(response({"type": "http", "asgi": {"spec_version": "2.4"}}, disconnect, send))
+    with manager.release(path, timeout=1):
+        pass
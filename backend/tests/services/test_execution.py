@@ -17,3 +17,116 @@ def test_query_execution_success(tmp_path: Path) -> None:
     assert fetched is not None
     assert fetched.result_table is not None
 
+
+
+def test_query_stream_spills_only_large_results(tmp_path: Path) -> None:
+    import duckdb
+    import pytest
+
+    service = QueryExecutionService(tmp_path / "warehouse.duckdb")
+
+    service.submit("small", "select range as id from range(10)")
+    with service.stream("small", spill_rows=100) as stream:
+        assert sum(batch.num_rows for batch in stream) == 10
+    small = service.fetch("small")
+    assert small.status == "success"
+    assert small.result_table is None
+    assert small.rows_affected == 10
+
+    service.submit("large", "select range as id from range(50000)")
+    with service.stream("large", spill_rows=100, batch_size=2048) as stream:
+        # Stop reading early: the spilled table is still completed.
+        assert next(iter(stream)).num_rows == 2048
+    large = service.fetch("large")
+    assert large.result_table == "query_result_large"
+    assert large.rows_affected == 50000
+    with duckdb.connect(str(tmp_path / "warehouse.duckdb")) as con:
+        assert con.execute("select count(*), max(id) from query_result_large").fetchone() == (
+            50000,
+            49999,
+        )
+
+    service.submit("broken", "select missing_column")
+    with pytest.raises(duckdb.Error):
+        service.stream("broken")
+    assert service.fetch("broken").status == "failed"
+
+
+def test_result_cache_reuses_fresh_results(tmp_path: Path) -> None:
+    from pluto_duck_backend.app.core import table_versions, warehouse
+    from pluto_duck_backend.app.services.execution import ResultCache
+
+    path = tmp_path / "warehouse.duckdb"
+    with warehouse.connect(path) as con:
+        con.execute("create table orders as select range as id from range(100)")
+    service = QueryExecutionService(path, cache=ResultCache(max_bytes=1024**2))
+
+    def run(sql: str, **kwargs) -> str:
+        run_id = str(uuid4())
+        service.submit(run_id, sql)
+        return service.execute(run_id, **kwargs).result_table
+
+    first = run("select count(*) as n from orders")
+    # Formatting, comments and keyword case do not change the cache key.
+    assert run("SELECT count(*) AS n\n  FROM orders -- again") == first
+    assert run("select count(*) as n from orders", use_cache=False) != first
+    assert run("select random() as r from orders") != run("select random() as r from orders")
+
+    with warehouse.connect(path) as con:
+        table_versions.bump(con, ["orders"])
+    refreshed = run("select count(*) as n from orders")
+    assert refreshed != first
+
+    stats = service.cache_stats()
+    assert stats["hits"] == 1
+    assert stats["bypassed"] == 3
+    assert stats["entries"] == 1
+
+    # A budget smaller than two results keeps only the most recent one.
+    service.cache.max_bytes = stats["size_bytes"] + 1
+    run("select max(id) as top from orders")
+    stats = service.cache_stats()
+    assert stats["entries"] == 1
+    assert stats["evictions"] == 2
+    with warehouse.connect(path) as con:
+        assert con.execute(
+            "select count(*) from duckdb_tables() where table_name = ?", [refreshed]
+        ).fetchone() == (0,)
+
+
+def test_retention_drops_old_and_excess_results(tmp_path: Path) -> None:
+    from datetime import UTC, datetime, timedelta
+
+    from pluto_duck_backend.app.core import warehouse
+    from pluto_duck_backend.app.services.execution import ResultRetention, RetentionPolicy
+
+    path = tmp_path / "warehouse.duckdb"
+    service = QueryExecutionService(path)
+    for run_id in ("old", "pinned", "a", "b", "c"):
+        service.submit(run_id, f"select '{run_id}' as name")
+        service.execute(run_id)
+    now = datetime.now(UTC)
+    with warehouse.connect(path) as con:
+        con.execute(
+            "update query_history set completed_at = ? where job_id in ('old', 'pinned')",
+            [now - timedelta(days=30)],
+        )
+    service.pin("pinned")
+
+    retention = ResultRetention(path, RetentionPolicy(max_age_seconds=86400, max_tables=2))
+    result = retention.sweep(now)
+
+    # "old" is past the age limit; "a" is the least recently used beyond two tables.
+    assert sorted(result.dropped) == ["query_result_a", "query_result_old"]
+    assert result.retained == 2
+    assert result.pinned == 1
+    assert service.fetch("old").expired_at is not None
+    assert service.fetch("pinned").expired_at is None
+    assert service.fetch("c").expired_at is None
+    with warehouse.connect(path) as con:
+        tables = {row[0] for row in con.execute("show tables").fetchall()}
+    assert {"query_result_pinned", "query_result_b", "query_result_c"} <= tables
+    assert not {"query_result_old", "query_result_a"} & tables
+
+    # Nothing left over the limits: a second sweep is a no-op.
+    assert retention.sweep(now).dropped == []
@@ -1,8 +1,8 @@
+import json
+import sqlite3
 from pathlib import Path
 
 import duckdb
-import sqlite3
-
 from pluto_duck_backend.app.services.ingestion.base import IngestionContext
 from pluto_duck_backend.app.services.ingestion.connectors.csv import CSVConnector
 from pluto_duck_backend.app.services.ingestion.connectors.sqlite import SQLiteConnector
@@ -44,6 +44,48 @@ def test_registry_creates_connector(tmp_path: Path) -> None:
     assert isinstance(connector, CSVConnector)
 
 
+def test_registry_lazy_connectors_and_entry_points(tmp_path: Path, monkeypatch) -> None:
+    from importlib.metadata import EntryPoint
+
+    import pytest
+    from pluto_duck_backend.app.services.ingestion import get_registry
+    from pluto_duck_backend.app.services.ingestion import registry as registry_module
+    from pluto_duck_backend.app.services.ingestion.registry import ConnectorUnavailable
+
+    plugins = [
+        EntryPoint(
+            "plugin_csv",
+            "pluto_duck_backend.app.services.ingestion.connectors.csv:CSVConnector",
+            registry_module.ENTRY_POINT_GROUP,
+        ),
+        EntryPoint(
+            "broken", "no_such_module.connector:Connector", registry_module.ENTRY_POINT_GROUP
+        ),
+        # Plugins cannot shadow a connector that is already registered.
+        EntryPoint("csv", "no_such_module:Shadow", registry_module.ENTRY_POINT_GROUP),
+    ]
+    monkeypatch.setattr(registry_module, "entry_points", lambda group: plugins)
+
+    registry = ConnectorRegistry()
+    registry.register_lazy("csv", plugins[0].value)
+    assert registry.discover_entry_points() == ["plugin_csv", "broken"]
+
+    connector = registry.create("plugin_csv", {"path": str(tmp_path / "fake.csv")})
+    assert isinstance(connector, CSVConnector)
+    assert isinstance(registry.create("csv", {"path": "x.csv"}), CSVConnector)
+    with pytest.raises(ConnectorUnavailable, match="no_such_module"):
+        registry.create("broken", {})
+
+    infos = {info.name: info for info in registry.describe()}
+    assert infos["broken"].available is False and "ModuleNotFoundError" in infos["broken"].reason
+    assert infos["plugin_csv"].available and infos["plugin_csv"].source == "plugin:unknown"
+    assert infos["csv"].source == "bundled"
+
+    bundled = {info.name: info for info in get_registry().describe()}
+    assert {"csv", "json", "parquet", "postgres", "sqlite"} <= set(bundled)
+    assert bundled["csv"].available
+
+
 def test_ingestion_service_runs_csv(tmp_path: Path) -> None:
     registry = ConnectorRegistry()
     registry.register(CSVConnector)
@@ -86,3 +128,1240 @@ def test_sqlite_connector(tmp_path: Path) -> None:
 
     assert rows == [{"id": 1, "name": "Alice"}]
 
+
+def test_sqlite_batches_keep_values_of_later_wider_chunks(tmp_path: Path) -> None:
+    db_path = tmp_path / "prices.db"
+    sqlite_conn = sqlite3.connect(str(db_path))
+    sqlite_conn.execute("CREATE TABLE prices (id INTEGER, price NUMERIC)")
+    sqlite_conn.executemany("INSERT INTO prices VALUES (?, ?)", [(1, 10), (2, 20), (3, 19.99)])
+    sqlite_conn.commit()
+    sqlite_conn.close()
+    warehouse = make_tmp_warehouse(tmp_path)
+    registry = ConnectorRegistry()
+    registry.register(SQLiteConnector)
+
+    IngestionService(registry).run(
+        IngestionJob(
+            connector="sqlite",
+            target_table="prices",
+            warehouse_path=warehouse,
+            overwrite=True,
+            chunk_size=2,
+            config={"path": str(db_path), "query": "SELECT * FROM prices"},
+        )
+    )
+
+    con = duckdb.connect(str(warehouse))
+    assert con.execute("SELECT id, price FROM prices ORDER BY id").fetchall() == [
+        (1, 10.0),
+        (2, 20.0),
+        (3, 19.99),
+    ]
+    con.close()
+
+
+
+def test_duckdb_loader_streams_in_chunks(tmp_path: Path) -> None:
+    warehouse = make_tmp_warehouse(tmp_path)
+    loader = DuckDBLoader(warehouse)
+    rows = ({"id": idx, "label": None if idx < 3 else f"row-{idx}"} for idx in range(10))
+    updates = []
+
+    inserted = loader.load_dicts(
+        "chunked",
+        rows,
+        overwrite=True,
+        chunk_size=3,
+        progress=lambda progress: updates.append((progress.rows, progress.batches)),
+    )
+
+    assert inserted == 10
+    assert updates[0] == (3, 1)
+    assert updates[-1] == (10, 4)
+    con = duckdb.connect(str(warehouse))
+    assert con.execute("SELECT COUNT(*), MAX(label) FROM chunked").fetchone() == (10, "row-9")
+    con.close()
+
+
+def test_duckdb_loader_widens_columns_across_chunks(tmp_path: Path) -> None:
+    warehouse = make_tmp_warehouse(tmp_path)
+    loader = DuckDBLoader(warehouse)
+    rows = [
+        {"a": 1, "b": 1},
+        {"a": 2, "b": 2},
+        {"a": 2.5, "b": "x"},
+        {"a": 3.7, "b": None, "c": True},
+    ]
+
+    assert loader.load_dicts("mixed", rows, overwrite=True, chunk_size=2) == 4
+
+    con = duckdb.connect(str(warehouse))
+    types = {row[0]: row[1] for row in con.execute("DESCRIBE mixed").fetchall()}
+    assert types == {"a": "DOUBLE", "b": "VARCHAR", "c": "BOOLEAN"}
+    assert con.execute("SELECT a, b, c FROM mixed ORDER BY rowid").fetchall() == [
+        (1.0, "1", None),
+        (2.0, "2", None),
+        (2.5, "x", None),
+        (3.7, None, True),
+    ]
+    con.close()
+
+
+def test_duckdb_loader_failure_keeps_previous_table(tmp_path: Path) -> None:
+    import pytest
+
+    warehouse = make_tmp_warehouse(tmp_path)
+    loader = DuckDBLoader(warehouse)
+    loader.load_dicts("stable", [{"id": 1}], overwrite=True)
+
+    def broken_rows():
+        yield {"id": 2}
+        raise RuntimeError("source went away")
+
+    with pytest.raises(RuntimeError, match="source went away"):
+        loader.load_dicts("stable", broken_rows(), overwrite=True, chunk_size=1)
+
+    con = duckdb.connect(str(warehouse))
+    assert con.execute("SELECT id FROM stable").fetchall() == [(1,)]
+    con.close()
+
+
+def test_connectors_stream_arrow_batches(tmp_path: Path) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pluto_duck_backend.app.services.ingestion.connectors.parquet import ParquetConnector
+
+    parquet_file = tmp_path / "data.parquet"
+    pq.write_table(pa.table({"id": list(range(5)), "name": list("abcde")}), parquet_file)
+    parquet = ParquetConnector({"path": str(parquet_file)})
+    assert parquet.supports_batches
+    assert [batch.num_rows for batch in parquet.stream_batches(batch_size=2)] == [2, 2, 1]
+
+    db_path = tmp_path / "example.db"
+    sqlite_conn = sqlite3.connect(str(db_path))
+    sqlite_conn.execute("CREATE TABLE example (id INTEGER, name TEXT)")
+    sqlite_conn.executemany("INSERT INTO example VALUES (?, ?)", [(1, "Alice"), (2, None)])
+    sqlite_conn.commit()
+    sqlite_conn.close()
+
+    sqlite = SQLiteConnector({"path": str(db_path), "query": "SELECT * FROM example"})
+    sqlite.open()
+    batches = list(sqlite.stream_batches(batch_size=10))
+    sqlite.close()
+    assert batches[0].to_pylist() == [{"id": 1, "name": "Alice"}, {"id": 2, "name": None}]
+
+
+def test_rows_only_connector_streams_batches_from_its_rows() -> None:
+    from pluto_duck_backend.app.services.ingestion.base import BaseConnector
+
+    class RowsConnector(BaseConnector):
+        name = "rows"
+
+        def fetch_metadata(self):
+            return {}
+
+        def stream_rows(self):
+            return ({"id": i, "name": f"n{i}"} for i in range(5))
+
+    connector = RowsConnector({})
+    assert not connector.supports_batches
+    batches = list(connector.stream_batches(batch_size=2))
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+    assert batches[2].to_pylist() == [{"id": 4, "name": "n4"}]
+    assert connector.preview(3).num_rows == 3
+
+
+
+def test_parquet_connector_scans_directory_in_duckdb(tmp_path: Path) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pluto_duck_backend.app.services.ingestion.connectors.parquet import ParquetConnector
+
+    for year, ids in (("2023", [1, 2]), ("2024", [3, 4, 5])):
+        partition = tmp_path / "events" / f"year={year}"
+        partition.mkdir(parents=True)
+        pq.write_table(
+            pa.table({"id": ids, "payload": [f"p{idx}" for idx in ids]}),
+            partition / "part-0.parquet",
+        )
+
+    warehouse = make_tmp_warehouse(tmp_path)
+    connector = ParquetConnector(
+        {
+            "path": str(tmp_path / "events"),
+            "columns": ["id", "year"],
+            "filter": "year = 2024",
+            "hive_partitioning": True,
+        }
+    )
+
+    rows = connector.materialize(
+        IngestionContext(target_table="events", warehouse_path=warehouse, overwrite=True)
+    )
+    metadata = connector.fetch_metadata()
+
+    assert rows == 3
+    assert metadata["files"] == 2
+    assert metadata["rows"] == 5
+    assert metadata["row_groups"] == 2
+    assert metadata["bytes"] > 0
+    con = duckdb.connect(str(warehouse))
+    assert con.execute("SELECT id, year FROM events ORDER BY id").fetchall() == [
+        (3, 2024),
+        (4, 2024),
+        (5, 2024),
+    ]
+    con.close()
+
+
+def test_csv_connector_uses_duckdb_reader_for_compressed_globs(tmp_path: Path) -> None:
+    import gzip
+
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    (landing / "a.csv").write_text("id;zip\n1;01234\n2;98765\n", encoding="utf-8")
+    with gzip.open(landing / "b.csv.gz", "wt", encoding="utf-8") as fh:
+        fh.write("id;zip\n3;55555\n")
+
+    warehouse = make_tmp_warehouse(tmp_path)
+    connector = CSVConnector(
+        {
+            "path": str(landing / "*.csv*"),
+            "delimiter": ";",
+            "column_types": {"zip": "VARCHAR"},
+        }
+    )
+    rows = connector.materialize(
+        IngestionContext(target_table="zips", warehouse_path=warehouse, overwrite=True)
+    )
+    metadata = connector.fetch_metadata()
+
+    assert rows == 3
+    assert metadata["engine"] == "duckdb"
+    assert metadata["files"] == 2
+    assert metadata["schema"] == {"id": "BIGINT", "zip": "VARCHAR"}
+    con = duckdb.connect(str(warehouse))
+    assert con.execute("SELECT zip FROM zips ORDER BY id").fetchall() == [
+        ("01234",),
+        ("98765",),
+        ("55555",),
+    ]
+    con.close()
+
+
+def test_csv_connector_python_engine(tmp_path: Path) -> None:
+    csv_file = tmp_path / "data.csv"
+    csv_file.write_text("id|name\n1|Alice\n", encoding="utf-8")
+    warehouse = make_tmp_warehouse(tmp_path)
+    connector = CSVConnector({"path": str(csv_file), "delimiter": "|", "engine": "python"})
+
+    rows = connector.materialize(
+        IngestionContext(target_table="people", warehouse_path=warehouse, overwrite=True)
+    )
+
+    assert rows == 1
+    assert connector.fetch_metadata()["engine"] == "python"
+    assert list(connector.stream_rows()) == [{"id": 1, "name": "Alice"}]
+
+
+def test_csv_without_header_reads_the_same_on_both_engines(tmp_path: Path) -> None:
+    csv_file = tmp_path / "data.csv"
+    csv_file.write_text("1,Alice\n2,Bob\n", encoding="utf-8")
+    warehouse = make_tmp_warehouse(tmp_path)
+
+    tables = {}
+    for engine in ("duckdb", "python"):
+        connector = CSVConnector({"path": str(csv_file), "header": False, "engine": engine})
+        rows = connector.materialize(
+            IngestionContext(target_table=f"people_{engine}", warehouse_path=warehouse)
+        )
+        assert rows == 2, engine
+        assert connector.fetch_metadata()["engine"] == engine
+        con = duckdb.connect(str(warehouse))
+        try:
+            relation = con.sql(f"SELECT * FROM people_{engine} ORDER BY column0")
+            tables[engine] = (relation.columns, relation.fetchall())
+        finally:
+            con.close()
+
+    assert tables["python"] == tables["duckdb"]
+    assert tables["python"] == (["column0", "column1"], [(1, "Alice"), (2, "Bob")])
+    connector = CSVConnector({"path": str(csv_file), "header": False, "engine": "python"})
+    assert list(connector.stream_rows())[0] == {"column0": 1, "column1": "Alice"}
+
+
+def test_csv_python_engine_accepts_any_duckdb_column_type(tmp_path: Path) -> None:
+    import pytest
+
+    csv_file = tmp_path / "amounts.csv"
+    csv_file.write_text("id,amt,wait\n1,10.25,1 day\n2,3,\n", encoding="utf-8")
+    warehouse = make_tmp_warehouse(tmp_path)
+    connector = CSVConnector(
+        {
+            "path": str(csv_file),
+            "engine": "python",
+            "column_types": {"id": "integer", "amt": "DECIMAL(10,2)", "wait": "interval"},
+        }
+    )
+
+    connector.materialize(
+        IngestionContext(target_table="amounts", warehouse_path=warehouse, overwrite=True)
+    )
+
+    con = duckdb.connect(str(warehouse))
+    types = {row[0]: row[1] for row in con.execute("DESCRIBE amounts").fetchall()}
+    assert types == {"id": "INTEGER", "amt": "DECIMAL(10,2)", "wait": "INTERVAL"}
+    assert [str(amt) for (amt,) in con.execute("SELECT amt FROM amounts").fetchall()] == [
+        "10.25",
+        "3.00",
+    ]
+    con.close()
+    with pytest.raises(ValueError, match="column_types\\['id'\\]"):
+        CSVConnector({"path": str(csv_file), "column_types": {"id": "NOTATYPE"}})
+
+
+def test_csv_python_engine_infers_column_types_once(tmp_path: Path) -> None:
+    csv_file = tmp_path / "typed.csv"
+    csv_file.write_text(
+        "id,price,active,day,note\n"
+        "1,2,true,2024-01-02,7\n"
+        "2,2.5,false,2024-01-03,\n"
+        "3,,TRUE,2024-01-04,x\n",
+        encoding="utf-8",
+    )
+    warehouse = make_tmp_warehouse(tmp_path)
+    connector = CSVConnector({"path": str(csv_file), "engine": "python"})
+
+    rows = connector.materialize(
+        IngestionContext(target_table="typed", warehouse_path=warehouse, overwrite=True)
+    )
+
+    assert rows == 3
+    schema = connector.fetch_metadata()["inferred_schema"]
+    assert schema == {
+        "id": "BIGINT",
+        "price": "DOUBLE",
+        "active": "BOOLEAN",
+        "day": "DATE",
+        "note": "VARCHAR",
+    }
+    con = duckdb.connect(str(warehouse))
+    types = {row[0]: row[1] for row in con.execute("DESCRIBE typed").fetchall()}
+    con.close()
+    assert types == schema
+
+
+def test_csv_python_engine_reuses_state_and_widens_unsampled_values(tmp_path: Path) -> None:
+    csv_file = tmp_path / "codes.csv"
+    csv_file.write_text("code\n1\n2\nA3\n", encoding="utf-8")
+    warehouse = make_tmp_warehouse(tmp_path)
+
+    connector = CSVConnector({"path": str(csv_file), "engine": "python", "inference_rows": 2})
+    connector.state = {"inferred_schema": {"code": "BIGINT"}}
+    assert connector.infer_schema() == {"code": "BIGINT"}
+
+    rows = connector.materialize(
+        IngestionContext(
+            target_table="codes", warehouse_path=warehouse, overwrite=True, chunk_size=2
+        )
+    )
+
+    assert rows == 3
+    assert connector.fetch_metadata()["inferred_schema"] == {"code": "VARCHAR"}
+
+
+def test_incremental_sync_appends_and_upserts_past_watermark(tmp_path: Path) -> None:
+    db_path = tmp_path / "orders.db"
+    sqlite_conn = sqlite3.connect(str(db_path))
+    sqlite_conn.execute("CREATE TABLE orders (id INTEGER, status TEXT, updated_at TEXT)")
+    sqlite_conn.executemany(
+        "INSERT INTO orders VALUES (?, ?, ?)",
+        [(1, "new", "2024-01-01"), (2, "new", "2024-01-02")],
+    )
+    sqlite_conn.commit()
+
+    registry = ConnectorRegistry()
+    registry.register(SQLiteConnector)
+    service = IngestionService(registry)
+    warehouse = make_tmp_warehouse(tmp_path)
+
+    def sync(state):
+        return service.run(
+            IngestionJob(
+                connector="sqlite",
+                target_table="orders",
+                warehouse_path=warehouse,
+                config={"path": str(db_path), "query": "SELECT * FROM orders"},
+                state=state,
+                sync_mode="upsert",
+                watermark_column="updated_at",
+                primary_key=["id"],
+            )
+        )
+
+    first = sync(None)
+    assert first["rows_inserted"] == 2
+    assert first["watermark"] == "2024-01-02"
+
+    sqlite_conn.execute(
+        "UPDATE orders SET status = 'shipped', updated_at = '2024-01-03' WHERE id = 1"
+    )
+    sqlite_conn.execute("INSERT INTO orders VALUES (3, 'new', '2024-01-04')")
+    sqlite_conn.commit()
+    sqlite_conn.close()
+
+    second = sync(first["metadata"])
+    assert second["rows_inserted"] == 1
+    assert second["rows_updated"] == 1
+    assert second["watermark"] == "2024-01-04"
+
+    con = duckdb.connect(str(warehouse))
+    assert con.execute("SELECT id, status FROM orders ORDER BY id").fetchall() == [
+        (1, "shipped"),
+        (2, "new"),
+        (3, "new"),
+    ]
+    con.close()
+
+
+def test_postgres_fetch_modes_agree() -> None:
+    import os
+
+    import pytest
+
+    dsn = os.environ.get("PLUTODUCK_TEST_POSTGRES_DSN")
+    if not dsn:
+        pytest.skip("PLUTODUCK_TEST_POSTGRES_DSN not set")
+
+    from pluto_duck_backend.app.services.ingestion.connectors.postgres import PostgresConnector
+
+    query = (
+        "SELECT g AS id, md5(g::text) AS digest, now() AS loaded_at "
+        "FROM generate_series(1, 2500) g"
+    )
+    results = {}
+    for mode in ("cursor", "copy"):
+        connector = PostgresConnector(
+            {"dsn": dsn, "query": query, "fetch_mode": mode, "itersize": 500}
+        )
+        connector.open()
+        try:
+            batches = list(connector.stream_batches(batch_size=1000))
+        finally:
+            connector.close()
+        assert [batch.num_rows for batch in batches] == [1000, 1000, 500]
+        results[mode] = [row["digest"] for batch in batches for row in batch.to_pylist()]
+    assert results["cursor"] == results["copy"]
+
+
+def test_postgres_partitions_share_one_snapshot() -> None:
+    import os
+
+    import pytest
+
+    dsn = os.environ.get("PLUTODUCK_TEST_POSTGRES_DSN")
+    if not dsn:
+        pytest.skip("PLUTODUCK_TEST_POSTGRES_DSN not set")
+
+    from pluto_duck_backend.app.services.ingestion.connectors.postgres import PostgresConnector
+
+    query = "SELECT g AS id, txid_current_snapshot()::text AS snap FROM generate_series(1, 1000) g"
+    for mode in ("cursor", "copy"):
+        connector = PostgresConnector(
+            {
+                "dsn": dsn,
+                "query": query,
+                "fetch_mode": mode,
+                "partition": {"column": "id", "partitions": 4, "max_workers": 4},
+            }
+        )
+        connector.open()
+        try:
+            batches = list(connector.stream_batches(batch_size=100))
+        finally:
+            connector.close()
+        rows = [row for batch in batches for row in batch.to_pylist()]
+        assert sorted(row["id"] for row in rows) == list(range(1, 1001))
+        assert len({row["snap"] for row in rows}) == 1, mode
+
+
+def test_sqlite_partitioned_extraction_covers_every_row(tmp_path: Path) -> None:
+    db_path = tmp_path / "events.db"
+    sqlite_conn = sqlite3.connect(str(db_path))
+    sqlite_conn.execute("CREATE TABLE events (id INTEGER, kind TEXT)")
+    sqlite_conn.executemany(
+        "INSERT INTO events VALUES (?, ?)",
+        [(idx, "even" if idx % 2 == 0 else "odd") for idx in range(1, 1001)] + [(None, "orphan")],
+    )
+    sqlite_conn.commit()
+    sqlite_conn.close()
+
+    warehouse = make_tmp_warehouse(tmp_path)
+    for table, partition in (
+        ("by_range", {"column": "id", "partitions": 4, "max_workers": 2}),
+        ("by_predicate", {"predicates": ["kind = 'even'", "kind <> 'even'"]}),
+    ):
+        connector = SQLiteConnector(
+            {"path": str(db_path), "query": "SELECT * FROM events", "partition": partition}
+        )
+        connector.open()
+        try:
+            rows = connector.materialize(
+                IngestionContext(
+                    target_table=table, warehouse_path=warehouse, overwrite=True, chunk_size=100
+                )
+            )
+        finally:
+            connector.close()
+        assert rows == 1001
+        expected_partitions = len(partition.get("predicates") or [1] * 4)
+        assert connector.fetch_metadata()["partitions"] == expected_partitions
+
+    con = duckdb.connect(str(warehouse))
+    counts = con.execute("SELECT COUNT(DISTINCT id), COUNT(*) - COUNT(id) FROM by_range").fetchone()
+    assert counts == (1000, 1)
+    con.close()
+
+
+def test_scanner_engine_falls_back_to_python_when_extension_missing(
+    tmp_path: Path, caplog
+) -> None:
+    import logging
+
+    db_path = tmp_path / "source.db"
+    sqlite_conn = sqlite3.connect(str(db_path))
+    sqlite_conn.execute("CREATE TABLE items (id INTEGER, name TEXT)")
+    sqlite_conn.executemany("INSERT INTO items VALUES (?, ?)", [(1, "a"), (2, "b"), (3, "c")])
+    sqlite_conn.commit()
+    sqlite_conn.close()
+
+    warehouse = make_tmp_warehouse(tmp_path)
+    service = IngestionService(ConnectorRegistry())
+    service.registry.register(SQLiteConnector)
+    result = service.run(
+        IngestionJob(
+            connector="sqlite",
+            target_table="items",
+            warehouse_path=warehouse,
+            overwrite=True,
+            config={"path": str(db_path), "query": "SELECT * FROM items WHERE id > 1"},
+        )
+    )
+
+    assert result["rows_ingested"] == 2
+    assert result["metadata"]["engine"] in {"scanner", "python"}
+    # A missing extension is an expected fallback, not a warning.
+    assert not [record for record in caplog.records if record.levelno >= logging.WARNING]
+    con = duckdb.connect(str(warehouse))
+    assert con.execute("SELECT list(name ORDER BY id) FROM items").fetchone()[0] == ["b", "c"]
+    con.close()
+
+    python_only = service.run(
+        IngestionJob(
+            connector="sqlite",
+            target_table="items_python",
+            warehouse_path=warehouse,
+            overwrite=True,
+            config={"path": str(db_path), "query": "SELECT * FROM items"},
+            engine="python",
+        )
+    )
+    assert python_only["metadata"]["engine"] == "python"
+
+
+def test_ingestion_job_manager_tracks_progress_and_cancels(tmp_path: Path) -> None:
+    import threading
+    import time
+
+    from pluto_duck_backend.app.services.ingestion.jobs import (
+        IngestionJobManager,
+        IngestionJobStatus,
+    )
+
+    db_path = tmp_path / "source.db"
+    sqlite_conn = sqlite3.connect(str(db_path))
+    sqlite_conn.execute("CREATE TABLE items (id INTEGER)")
+    sqlite_conn.executemany("INSERT INTO items VALUES (?)", [(idx,) for idx in range(500)])
+    sqlite_conn.commit()
+    sqlite_conn.close()
+
+    warehouse = make_tmp_warehouse(tmp_path)
+    registry = ConnectorRegistry()
+    registry.register(SQLiteConnector)
+    manager = IngestionJobManager(IngestionService(registry), warehouse, worker_count=1)
+    config = {"path": str(db_path), "query": "SELECT * FROM items"}
+
+    done = manager.submit(
+        IngestionJob(
+            connector="sqlite",
+            target_table="items",
+            warehouse_path=warehouse,
+            overwrite=True,
+            config=config,
+            chunk_size=100,
+            engine="python",
+        )
+    )
+    finished = manager.wait_for(done.job_id)
+    assert finished.status == IngestionJobStatus.SUCCESS
+    assert (finished.rows, finished.batches) == (500, 5)
+    assert finished.elapsed_seconds is not None
+    assert finished.result["rows_ingested"] == 500
+
+    started = threading.Event()
+
+    def slow_progress(_totals) -> None:
+        started.set()
+        time.sleep(0.05)
+
+    running = manager.submit(
+        IngestionJob(
+            connector="sqlite",
+            target_table="items_cancelled",
+            warehouse_path=warehouse,
+            overwrite=True,
+            config=config,
+            chunk_size=1,
+            progress=slow_progress,
+            engine="python",
+        )
+    )
+    assert started.wait(5)
+    manager.cancel(running.job_id)
+    cancelled = manager.wait_for(running.job_id)
+    assert cancelled.status == IngestionJobStatus.CANCELLED
+    assert 0 < cancelled.rows < 500
+    assert [record.job_id for record in manager.list_jobs()] == [running.job_id, done.job_id]
+
+    con = duckdb.connect(str(warehouse))
+    tables = {row[0] for row in con.execute("SHOW TABLES").fetchall()}
+    con.close()
+    assert "items" in tables and "items_cancelled" not in tables
+
+
+def test_job_manager_restart_fails_orphaned_jobs_and_their_sources(tmp_path: Path) -> None:
+    from pluto_duck_backend.app.services.chat.repository import ChatRepository
+    from pluto_duck_backend.app.services.data_sources import DataSourceRepository
+    from pluto_duck_backend.app.services.ingestion.jobs import (
+        IngestionJobManager,
+        IngestionJobStatus,
+    )
+
+    warehouse = make_tmp_warehouse(tmp_path)
+    chat = ChatRepository(warehouse)
+    sources = DataSourceRepository(warehouse, chat._default_project_id)
+    source_id = sources.create("people", "csv", {"path": "people.csv"}, "people")
+    sources.update_import_status(source_id, status="syncing")
+    # A manager from the previous process left one job behind mid-run.
+    IngestionJobManager(IngestionService(ConnectorRegistry()), warehouse, worker_count=1)
+    with duckdb.connect(str(warehouse)) as con:
+        con.execute(
+            "INSERT INTO ingestion_jobs (job_id, source_id, status) "
+            "VALUES ('orphan', ?, 'running')",
+            [source_id],
+        )
+
+    restarted = IngestionJobManager(
+        IngestionService(ConnectorRegistry()), warehouse, worker_count=1
+    )
+
+    assert restarted.fetch("orphan").status == IngestionJobStatus.FAILED
+    source = sources.get(source_id)
+    assert source.status == "error"
+    assert source.error_message == "Interrupted by server restart"
+
+
+def test_overwrite_swaps_staged_table_and_retains_previous_version(tmp_path: Path) -> None:
+    csv_file = tmp_path / "data.csv"
+    csv_file.write_text("id,name\n1,Alice\n", encoding="utf-8")
+    warehouse = make_tmp_warehouse(tmp_path)
+    registry = ConnectorRegistry()
+    registry.register(CSVConnector)
+    service = IngestionService(registry)
+
+    def sync(path: Path) -> dict:
+        return service.run(
+            IngestionJob(
+                connector="csv",
+                target_table="people",
+                warehouse_path=warehouse,
+                overwrite=True,
+                config={"path": str(path)},
+                rollback_window_seconds=3600,
+            )
+        )
+
+    sync(csv_file)
+    csv_file.write_text("id,name\n1,Alice\n2,Bob\n", encoding="utf-8")
+    assert sync(csv_file)["rows_ingested"] == 2
+
+    loader = DuckDBLoader(warehouse)
+    con = duckdb.connect(str(warehouse))
+    tables = {row[0] for row in con.execute("SHOW TABLES").fetchall()}
+    # table_versions records the load for the query result cache.
+    assert tables == {"people", loader.previous_table_name("people"), "table_versions"}
+    con.close()
+
+    # A failing load leaves the live table untouched and no staging table behind.
+    broken = tmp_path / "missing.csv"
+    try:
+        sync(broken)
+    except Exception:
+        pass
+    else:  # pragma: no cover - the load must fail
+        raise AssertionError("expected the load to fail")
+    con = duckdb.connect(str(warehouse))
+    assert con.execute("SELECT COUNT(*) FROM people").fetchone()[0] == 2
+    assert len(con.execute("SHOW TABLES").fetchall()) == 3
+    con.close()
+
+    assert loader.rollback_table("people")
+    con = duckdb.connect(str(warehouse))
+    assert con.execute("SELECT COUNT(*) FROM people").fetchone()[0] == 1
+    con.close()
+
+    assert loader.purge_previous_versions(3600) == []
+    assert loader.purge_previous_versions(0) == [loader.previous_table_name("people")]
+
+
+def test_unchanged_file_sources_are_skipped_by_fingerprint(tmp_path: Path) -> None:
+    import os
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pluto_duck_backend.app.services.ingestion.connectors.parquet import ParquetConnector
+
+    csv_file = tmp_path / "data.csv"
+    csv_file.write_text("id,name\n1,Alice\n2,Bob\n", encoding="utf-8")
+    parquet_file = tmp_path / "data.parquet"
+    pq.write_table(pa.table({"id": [1, 2, 3]}), parquet_file)
+    warehouse = make_tmp_warehouse(tmp_path)
+    registry = ConnectorRegistry()
+    registry.register(CSVConnector)
+    registry.register(ParquetConnector)
+    service = IngestionService(registry)
+
+    for connector, path in (("csv", csv_file), ("parquet", parquet_file)):
+        state: dict = {}
+
+        def sync(
+            force: bool = False,
+            connector: str = connector,
+            path: Path = path,
+            state: dict = state,
+        ) -> dict:
+            result = service.run(
+                IngestionJob(
+                    connector=connector,
+                    target_table=f"{connector}_table",
+                    warehouse_path=warehouse,
+                    overwrite=True,
+                    config={"path": str(path)},
+                    state=state,
+                    force=force,
+                )
+            )
+            state.update(result["metadata"])
+            return result
+
+        first = sync()
+        assert first["rows_ingested"] > 0 and "skipped" not in first
+        skipped = sync()
+        assert skipped["skipped"] and skipped["rows_ingested"] == 0
+        assert "skipped" not in sync(force=True)
+
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert "skipped" not in sync()
+
+
+def test_directory_sources_load_per_file_and_retry_failures(tmp_path: Path) -> None:
+    import gzip
+
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    (landing / "day1.csv").write_text("id,name\n1,Alice\n2,Bob\n", encoding="utf-8")
+    (landing / "day2.csv").write_text("id,name,score\n3,Carol,9.5\n", encoding="utf-8")
+    broken = landing / "day3.csv.gz"
+    broken.write_bytes(b"not gzip at all")
+
+    warehouse = make_tmp_warehouse(tmp_path)
+    registry = ConnectorRegistry()
+    registry.register(CSVConnector)
+    service = IngestionService(registry)
+    config = {"path": str(landing), "file_workers": 2}
+
+    first = service.run(
+        IngestionJob(
+            connector="csv",
+            target_table="events",
+            warehouse_path=warehouse,
+            overwrite=True,
+            config=config,
+        )
+    )
+    metadata = first["metadata"]
+    assert first["rows_ingested"] == 3
+    assert metadata["file_rows"] == {str(landing / "day1.csv"): 2, str(landing / "day2.csv"): 1}
+    assert list(metadata["failed_files"]) == [str(broken)]
+
+    con = duckdb.connect(str(warehouse))
+    rows = con.execute("SELECT id, score, _source_file FROM events ORDER BY id").fetchall()
+    con.close()
+    assert rows[0] == (1, None, str(landing / "day1.csv"))
+    assert rows[2] == (3, 9.5, str(landing / "day2.csv"))
+
+    broken.write_bytes(gzip.compress(b"id,name,region\n4,Dan,EU\n"))
+    retry = service.run(
+        IngestionJob(
+            connector="csv",
+            target_table="events",
+            warehouse_path=warehouse,
+            overwrite=True,
+            config=config,
+            state=metadata,
+            retry_failed_files=True,
+        )
+    )
+    assert retry["rows_ingested"] == 1 and retry["retried_files"] == 1
+    assert retry["metadata"]["failed_files"] == {}
+    assert retry["metadata"]["file_rows"][str(broken)] == 1
+
+    con = duckdb.connect(str(warehouse))
+    assert con.execute("SELECT COUNT(*), COUNT(region) FROM events").fetchone() == (4, 1)
+    con.close()
+
+
+def test_csv_python_engine_unions_headers_across_files(tmp_path: Path) -> None:
+    import pyarrow as pa
+
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    (landing / "day1.csv").write_text("id,name\n1,Alice\n", encoding="utf-8")
+    (landing / "day2.csv").write_text("score,id\n9.5,2\n", encoding="utf-8")
+
+    connector = CSVConnector({"path": str(landing), "engine": "python"})
+    assert list(connector.infer_schema()) == ["id", "name", "score"]
+    table = pa.Table.from_batches(list(connector.stream_batches(10)))
+    rows = sorted(
+        zip(*(table.column(name).to_pylist() for name in ("id", "name", "score")), strict=True)
+    )
+    assert rows == [(1, "Alice", None), (2, None, 9.5)]
+
+
+def test_schema_drift_evolves_quarantines_or_rejects(tmp_path: Path) -> None:
+    import pytest
+    from pluto_duck_backend.app.services.ingestion.schema import SchemaDriftError
+
+    warehouse = make_tmp_warehouse(tmp_path)
+    registry = ConnectorRegistry()
+    registry.register(CSVConnector)
+    service = IngestionService(registry)
+    state: dict = {}
+
+    def load(name: str, content: str, *, overwrite: bool = False, policy: str = "evolve") -> dict:
+        path = tmp_path / name
+        path.write_text(content, encoding="utf-8")
+        result = service.run(
+            IngestionJob(
+                connector="csv",
+                target_table="orders",
+                warehouse_path=warehouse,
+                overwrite=overwrite,
+                config={"path": str(path)},
+                state=state,
+                sync_mode="full" if overwrite else "append",
+                schema_policy=policy,
+            )
+        )
+        state.update(result["metadata"])
+        return result
+
+    load("v1.csv", "id,amount\n1,10\n2,20\n", overwrite=True)
+    with pytest.raises(ValueError, match="already exists"):
+        # A full import into an existing table must opt into replacing it.
+        service.run(
+            IngestionJob(
+                connector="csv",
+                target_table="orders",
+                warehouse_path=warehouse,
+                config={"path": str(tmp_path / "v1.csv")},
+                force=True,
+            )
+        )
+    evolved = load("v2.csv", "id,amount,region\n3,2.5,EU\n")
+    assert {(c["column"], c["kind"]) for c in evolved["schema_changes"]} == {
+        ("amount", "widened"),
+        ("region", "added"),
+    }
+    loader = DuckDBLoader(warehouse)
+    assert loader.column_types("orders") == {
+        "id": "BIGINT",
+        "amount": "DOUBLE",
+        "region": "VARCHAR",
+    }
+
+    with pytest.raises(SchemaDriftError):
+        load("v3.csv", "id,amount\n4,5.5\n5,n/a\n")
+    with pytest.raises(SchemaDriftError):
+        load("v4.csv", "id,amount,channel\n6,1,web\n", policy="reject")
+
+    quarantined = load("v3.csv", "id,amount\n4,5.5\n5,n/a\n", policy="quarantine")
+    assert quarantined["rows_ingested"] == 1 and quarantined["rows_quarantined"] == 1
+    assert loader.column_types("orders")["amount"] == "DOUBLE"
+    assert len(state["schema_history"]) == 2
+
+    con = duckdb.connect(str(warehouse))
+    assert con.execute("SELECT COUNT(*) FROM orders").fetchone()[0] == 4
+    assert con.execute("SELECT id, amount FROM orders_quarantine").fetchall() == [("5", "n/a")]
+    con.close()
+
+
+def _serve_with_ranges(directory: Path):
+    """A local stand-in for an object store: static files with HTTP Range support."""
+
+    import functools
+    import threading
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    class RangeHandler(SimpleHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            header = self.headers.get("Range")
+            if not header:
+                return super().do_GET()
+            data = (directory / self.path.lstrip("/")).read_bytes()
+            start, end = (int(part) for part in header.split("=", 1)[1].split("-"))
+            chunk = data[start : end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{start + len(chunk) - 1}/{len(data)}")
+            self.send_header("Content-Length", str(len(chunk)))
+            self.end_headers()
+            self.wfile.write(chunk)
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(RangeHandler, directory=str(directory))
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_byte_sources_decompress_mmap_and_read_remote_ranges(tmp_path: Path) -> None:
+    import bz2
+    import gzip
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import zstandard
+    from pluto_duck_backend.app.services.ingestion.connectors.parquet import ParquetConnector
+
+    text = "id,name\n" + "".join(f"{i},name-{i}\n" for i in range(2000))
+    (tmp_path / "data.csv.gz").write_bytes(gzip.compress(text.encode()))
+    (tmp_path / "data.csv.bz2").write_bytes(bz2.compress(text.encode()))
+    (tmp_path / "data.csv.zst").write_bytes(zstandard.ZstdCompressor().compress(text.encode()))
+    (tmp_path / "data.csv").write_text(text, encoding="utf-8")
+    pq.write_table(
+        pa.table({"id": list(range(5000)), "value": [i * 0.5 for i in range(5000)]}),
+        tmp_path / "data.parquet",
+        row_group_size=1000,
+    )
+
+    for name, extra in (
+        ("data.csv.gz", {}),
+        ("data.csv.bz2", {}),
+        ("data.csv.zst", {}),
+        ("data.csv", {"mmap": True}),
+    ):
+        connector = CSVConnector({"path": str(tmp_path / name), "engine": "python", **extra})
+        batches = list(connector.stream_batches(500))
+        assert sum(batch.num_rows for batch in batches) == 2000, name
+        assert batches[-1].column("name")[-1].as_py() == "name-1999"
+
+    server, base_url = _serve_with_ranges(tmp_path)
+    try:
+        remote = {"block_size": 1024, "read_ahead": 3, "max_parallel_requests": 2}
+        warehouse = make_tmp_warehouse(tmp_path)
+        service = IngestionService(ConnectorRegistry())
+        service.registry.register(CSVConnector)
+        service.registry.register(ParquetConnector)
+
+        result = service.run(
+            IngestionJob(
+                connector="csv",
+                target_table="remote_csv",
+                warehouse_path=warehouse,
+                config={"path": f"{base_url}/data.csv.zst", **remote},
+            )
+        )
+        assert result["rows_ingested"] == 2000
+        assert result["metadata"]["path"] == f"{base_url}/data.csv.zst"
+
+        parquet_job = dict(
+            connector="parquet",
+            target_table="remote_parquet",
+            warehouse_path=warehouse,
+            config={"path": f"{base_url}/data.parquet", "columns": ["id"], **remote},
+        )
+        result = service.run(IngestionJob(**parquet_job))
+        assert result["rows_ingested"] == 5000
+        assert result["metadata"]["row_groups"] == 5
+        # ETag / Content-Length validators make unchanged remote files skippable.
+        second = service.run(IngestionJob(**parquet_job, state=dict(result["metadata"])))
+        assert second["skipped"] is True
+    finally:
+        server.shutdown()
+
+    con = duckdb.connect(str(warehouse))
+    try:
+        assert con.execute("SELECT max(id), count(*) FROM remote_csv").fetchone() == (1999, 2000)
+        assert con.execute("SELECT sum(id) FROM remote_parquet").fetchone()[0] == sum(range(5000))
+    finally:
+        con.close()
+
+
+def test_open_decompressed_closes_the_source_stream(tmp_path: Path) -> None:
+    import bz2
+    import gzip
+
+    from pluto_duck_backend.app.services.ingestion.sources import LocalSource, open_decompressed
+
+    class TrackingSource(LocalSource):
+        def open(self):
+            self.raw = super().open()
+            return self.raw
+
+    (tmp_path / "data.csv.gz").write_bytes(gzip.compress(b"id\n1\n"))
+    (tmp_path / "data.csv.bz2").write_bytes(bz2.compress(b"id\n1\n"))
+    for name in ("data.csv.gz", "data.csv.bz2"):
+        source = TrackingSource(tmp_path / name)
+        with open_decompressed(source) as stream:
+            assert stream.read() == b"id\n1\n"
+        assert source.raw.closed, name
+
+
+def test_json_connector_keeps_nested_types_and_flattens(tmp_path: Path) -> None:
+    import gzip
+    import json
+
+    from pluto_duck_backend.app.services.ingestion.connectors.json import JSONConnector
+
+    events = [
+        {"id": i, "user": {"name": f"u{i}", "geo": {"lat": i * 0.5}}, "tags": ["a", "b"][: i % 3]}
+        for i in range(300)
+    ]
+    lines = "".join(json.dumps(event) + "\n" for event in events)
+    (tmp_path / "events.ndjson").write_text(lines, encoding="utf-8")
+    (tmp_path / "events.ndjson.gz").write_bytes(gzip.compress(lines.encode()))
+    warehouse = make_tmp_warehouse(tmp_path)
+    service = IngestionService(ConnectorRegistry())
+    service.registry.register(JSONConnector)
+
+    nested = JSONConnector({"path": str(tmp_path / "events.ndjson")})
+    batches = list(nested.stream_batches(100))
+    assert [batch.num_rows for batch in batches] == [100, 100, 100]
+    assert batches[0].schema.field("user").type.num_fields == 2
+    assert batches[0].column("tags")[2].as_py() == ["a", "b"]
+
+    flat = JSONConnector({"path": str(tmp_path / "events.ndjson.gz"), "flatten": 1})
+    assert next(iter(flat.stream_batches())).schema.names == ["id", "user_name", "user_geo", "tags"]
+
+    result = service.run(
+        IngestionJob(
+            connector="json",
+            target_table="events",
+            warehouse_path=warehouse,
+            config={"path": str(tmp_path / "events.ndjson.gz"), "flatten": True},
+        )
+    )
+    assert result["rows_ingested"] == 300
+    con = duckdb.connect(str(warehouse))
+    try:
+        columns = [name for name, *_ in con.execute("DESCRIBE events").fetchall()]
+        assert columns == ["id", "user_name", "user_geo_lat", "tags"]
+        assert con.execute("SELECT user_geo_lat FROM events WHERE id = 10").fetchone() == (5.0,)
+    finally:
+        con.close()
+
+    server, base_url = _serve_with_ranges(tmp_path)
+    try:
+        remote = JSONConnector(
+            {"path": f"{base_url}/events.ndjson.gz", "flatten": True, "block_size": 4096}
+        )
+        rows = list(remote.stream_rows())
+    finally:
+        server.shutdown()
+    assert len(rows) == 300
+    assert rows[7] == {"id": 7, "user_name": "u7", "user_geo_lat": 3.5, "tags": ["a"]}
+
+
+def test_json_connector_reports_schema_when_duckdb_loads_the_file(tmp_path: Path) -> None:
+    from pluto_duck_backend.app.services.ingestion.connectors.json import JSONConnector
+
+    lines = "".join(json.dumps({"id": i, "user": {"name": f"u{i}"}}) + "\n" for i in range(5))
+    (tmp_path / "events.ndjson").write_text(lines, encoding="utf-8")
+    warehouse = make_tmp_warehouse(tmp_path)
+
+    connector = JSONConnector({"path": str(tmp_path / "events.ndjson"), "flatten": True})
+    assert "schema" not in connector.fetch_metadata()
+    rows = connector.materialize(
+        IngestionContext(target_table="events", warehouse_path=warehouse, overwrite=True)
+    )
+    assert rows == 5
+    assert connector.fetch_metadata()["schema"] == {"id": "int64", "user_name": "string"}
+
+
+def test_json_connector_reads_bz2_files(tmp_path: Path) -> None:
+    import bz2
+
+    from pluto_duck_backend.app.services.ingestion.connectors.json import JSONConnector
+
+    def ndjson(start: int) -> str:
+        return "".join(
+            json.dumps({"id": i, "user": {"name": f"u{i}"}}) + "\n" for i in range(start, start + 3)
+        )
+
+    events = tmp_path / "events"
+    events.mkdir()
+    (events / "a.ndjson").write_text(ndjson(0), encoding="utf-8")
+    (events / "b.ndjson.bz2").write_bytes(bz2.compress(ndjson(3).encode()))
+    warehouse = make_tmp_warehouse(tmp_path)
+
+    single = JSONConnector({"path": str(events / "b.ndjson.bz2"), "flatten": True})
+    assert single.materialize(
+        IngestionContext(target_table="single", warehouse_path=warehouse, overwrite=True)
+    ) == 3
+    metadata = single.fetch_metadata()
+    assert metadata["engine"] == "python"
+    assert metadata["schema"] == {"id": "int64", "user_name": "string"}
+
+    directory = JSONConnector({"path": str(events), "flatten": True})
+    assert directory.materialize(
+        IngestionContext(target_table="events", warehouse_path=warehouse, overwrite=True)
+    ) == 6
+    assert directory.fetch_metadata()["failed_files"] == {}
+    con = duckdb.connect(str(warehouse))
+    try:
+        rows = con.execute("SELECT id, user_name FROM events ORDER BY id").fetchall()
+        assert rows == [(i, f"u{i}") for i in range(6)]
+        assert con.execute("SELECT * FROM single ORDER BY id").fetchall() == [
+            (3, "u3"),
+            (4, "u4"),
+            (5, "u5"),
+        ]
+    finally:
+        con.close()
+
+
+def test_benchmark_reports_throughput_for_each_path(tmp_path: Path) -> None:
+    from pluto_duck_backend.app.services.ingestion.benchmark import parse_scale, run_benchmarks
+
+    assert parse_scale("10K") == 10_000 and parse_scale("100M") == 100_000_000
+    report = run_benchmarks(
+        tmp_path,
+        scales=[2_000],
+        shapes=["narrow", "wide"],
+        connectors=["csv", "parquet", "json", "sqlite", "postgres"],
+    )
+    results = report["results"]
+    # Postgres paths need a DSN; the scanner path may lack the sqlite extension offline.
+    assert {result["connector"] for result in results} == {"csv", "parquet", "json", "sqlite"}
+    for result in results:
+        if result["error"]:
+            assert result["path"] == "scanner"
+            continue
+        assert result["rows_ingested"] == 2_000, result
+        assert result["rows_per_second"] > 0 and result["input_bytes"] > 0
+        assert result["peak_rss_bytes"] is None or result["peak_rss_bytes"] > 0
+    assert sorted(path.name for path in tmp_path.iterdir() if "warehouse" in path.name) == []
+    assert json.dumps(report)
+
+
+def test_ingestion_run_reports_per_stage_timings(tmp_path: Path) -> None:
+    csv_file = tmp_path / "data.csv"
+    csv_file.write_text(
+        "id,name\n" + "".join(f"{i},n{i}\n" for i in range(5000)), encoding="utf-8"
+    )
+    registry = ConnectorRegistry()
+    registry.register(CSVConnector)
+    result = IngestionService(registry).run(
+        IngestionJob(
+            connector="csv",
+            target_table="profiled",
+            warehouse_path=make_tmp_warehouse(tmp_path),
+            config={"path": str(csv_file), "engine": "python"},
+            chunk_size=1000,
+        )
+    )
+
+    profile = result["stages"]
+    assert result["metadata"]["stages"] == profile
+    stages = profile["stages"]
+    assert set(stages) == {"open", "extract", "convert", "load", "metadata", "close"}
+    assert {stages[name]["rows"] for name in ("extract", "convert", "load")} == {5000}
+    for stage in stages.values():
+        assert stage["wall_seconds"] >= 0 and stage["cpu_seconds"] >= 0
+    # Nested stages are exclusive, so they never add up to more than the whole run.
+    staged = sum(stage["wall_seconds"] for stage in stages.values())
+    assert staged <= profile["total_seconds"] + 0.01
+
+
+def test_profile_rows_times_rows_in_blocks() -> None:
+    from pluto_duck_backend.app.services.ingestion.metrics import RunProfile, profile_rows
+
+    with RunProfile() as profile:
+        rows = list(profile_rows(({"id": i} for i in range(2500)), block_size=1000))
+
+    assert [row["id"] for row in rows] == list(range(2500))
+    extract = profile.stages["extract"]
+    assert extract.rows == 2500
+    # Three full or partial blocks plus the empty read that ends the stream.
+    assert extract.calls == 4
+
+
+def test_preview_reads_a_limited_sample_and_caches_it(tmp_path: Path) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pluto_duck_backend.app.services.ingestion.connectors.parquet import ParquetConnector
+    from pluto_duck_backend.app.services.ingestion.preview import PreviewCache, preview_source
+
+    csv_file = tmp_path / "data.csv"
+    csv_file.write_text(
+        "id,name,joined\n" + "".join(f"{i},n{i},2024-01-0{i % 9 + 1}\n" for i in range(10_000)),
+        encoding="utf-8",
+    )
+    pq.write_table(
+        pa.table({"id": list(range(10_000))}), tmp_path / "data.parquet", row_group_size=1000
+    )
+    sqlite_file = tmp_path / "source.db"
+    with sqlite3.connect(sqlite_file) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER, label TEXT)")
+        conn.executemany("INSERT INTO items VALUES (?, ?)", [(i, f"x{i}") for i in range(500)])
+
+    registry = ConnectorRegistry()
+    for connector in (CSVConnector, ParquetConnector, SQLiteConnector):
+        registry.register(connector)
+    cache = PreviewCache(ttl_seconds=60)
+
+    preview = preview_source(registry, "csv", {"path": str(csv_file)}, 5, cache=cache)
+    assert [column["type"] for column in preview.columns] == ["BIGINT", "VARCHAR", "DATE"]
+    assert preview.rows[1] == {"id": 1, "name": "n1", "joined": "2024-01-02"}
+    assert not preview.cached
+
+    csv_file.write_text("id\n1\n", encoding="utf-8")
+    again = preview_source(registry, "csv", {"path": str(csv_file)}, 5, cache=cache)
+    assert again.cached and again.rows == preview.rows
+    fresh = preview_source(registry, "csv", {"path": str(csv_file)}, 5, cache=cache, refresh=True)
+    assert fresh.rows == [{"id": 1}] and not fresh.cached
+
+    parquet = preview_source(registry, "parquet", {"path": str(tmp_path / "data.parquet")}, 3)
+    assert parquet.rows == [{"id": 0}, {"id": 1}, {"id": 2}]
+    sqlite = preview_source(
+        registry, "sqlite", {"path": str(sqlite_file), "query": "SELECT * FROM items"}, 2
+    )
+    assert sqlite.columns == [
+        {"name": "id", "type": "BIGINT"},
+        {"name": "label", "type": "VARCHAR"},
+    ]
+    assert len(sqlite.rows) == 2
@@ -0,0 +1,95 @@
+import threading
+from pathlib import Path
+
+import duckdb
+import pytest
+from pluto_duck_backend.app.core.warehouse import WarehouseBusyError, WarehouseManager
+
+
+def test_cursors_share_one_configured_database(tmp_path: Path) -> None:
+    manager = WarehouseManager(threads=2, memory_limit="512MB")
+    path = tmp_path / "warehouse.duckdb"
+
+    with manager.connect(path) as con:
+        con.execute("CREATE TABLE t AS SELECT 1 AS id")
+        assert con.execute("SELECT current_setting('threads')").fetchone()[0] == 2
+    with manager.connect(str(path)) as con:
+        assert con.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+
+    stats = manager.stats()[str(path.resolve())]
+    assert stats["checkouts"] == 2
+    assert stats["active"] == 0
+    assert stats["reconnects"] == 0
+    manager.close()
+
+
+def test_release_closes_database_for_other_connections(tmp_path: Path) -> None:
+    manager = WarehouseManager()
+    path = tmp_path / "warehouse.duckdb"
+    with manager.connect(path) as con:
+        con.execute("CREATE TABLE t AS SELECT 1 AS id")
+
+    holding = threading.Event()
+    draining = threading.Event()
+    nested_rows = []
+    other_rows = []
+
+    def hold_cursor() -> None:
+        with manager.connect(path):
+            holding.set()
+            draining.wait(5)
+            # A nested checkout while a release is draining must not deadlock.
+            with manager.connect(path) as nested:
+                nested_rows.append(nested.execute("SELECT COUNT(*) FROM t").fetchone()[0])
+
+    def release() -> None:
+        with manager.release(path):
+            # Opening with a different configuration only works once the shared
+            # instance is closed, as for another process taking the file lock.
+            with duckdb.connect(str(path), read_only=True) as other:
+                other_rows.append(other.execute("SELECT COUNT(*) FROM t").fetchone()[0])
+
+    holder = threading.Thread(target=hold_cursor)
+    holder.start()
+    holding.wait(5)
+    releaser = threading.Thread(target=release)
+    releaser.start()
+    database = manager._database(path)
+    while not database._released:
+        releaser.join(0.01)
+    draining.set()
+    holder.join(5)
+    releaser.join(5)
+
+    assert nested_rows == [1]
+    assert other_rows == [1]
+    with manager.connect(path) as con:
+        assert con.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+    manager.close()
+
+
+def test_release_gives_up_on_cursors_that_are_not_returned(tmp_path: Path) -> None:
+    manager = WarehouseManager()
+    path = tmp_path / "warehouse.duckdb"
+    holding = threading.Event()
+    done = threading.Event()
+
+    def hold_cursor() -> None:
+        with manager.connect(path):
+            holding.set()
+            done.wait(5)
+
+    holder = threading.Thread(target=hold_cursor)
+    holder.start()
+    holding.wait(5)
+    try:
+        with pytest.raises(WarehouseBusyError, match="not returned within 0.1s"):
+            with manager.release(path, timeout=0.1):
+                pass
+        # Checkouts are not blocked by the abandoned release.
+        with manager.connect(path) as con:
+            assert con.execute("SELECT 1").fetchone()[0] == 1
+    finally:
+        done.set()
+        holder.join(5)
+    manager.close()
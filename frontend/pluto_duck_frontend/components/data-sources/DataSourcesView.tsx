@@ -2,7 +2,13 @@
 
 import { useEffect, useState } from 'react';
 import { DatabaseIcon, FileTextIcon, PackageIcon, ServerIcon } from 'lucide-react';
-import { fetchDataSources, deleteDataSource, syncDataSource, type DataSource } from '../../lib/dataSourcesApi';
+import {
+  fetchDataSources,
+  deleteDataSource,
+  syncDataSource,
+  waitForIngestionJob,
+  type DataSource,
+} from '../../lib/dataSourcesApi';
 import { SourceCard } from './SourceCard';
 import { ConnectorGrid } from './ConnectorGrid';
 
@@ -49,8 +55,17 @@ export function DataSourcesView({ onImportClick, refreshTrigger }: DataSourcesVi
         prev.map(s => (s.id === sourceId ? { ...s, status: 'syncing' } : s))
       );
       
-      await syncDataSource(sourceId);
+      const response = await syncDataSource(sourceId);
       await loadSources();
+
+      // The sync runs in the background; refresh once it has finished
+      if (response.job_id) {
+        const job = await waitForIngestionJob(response.job_id);
+        await loadSources();
+        if (job.status !== 'success') {
+          setError(job.error || `Sync ${job.status}`);
+        }
+      }
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to sync data source');
       await loadSources();
@@ -13,7 +13,11 @@ import {
 } from '../ui/dialog';
 import { Button } from '../ui/button';
 import { Input } from '../ui/input';
-import { createDataSource, type CreateDataSourceRequest } from '../../lib/dataSourcesApi';
+import {
+  createDataSource,
+  waitForIngestionJob,
+  type CreateDataSourceRequest,
+} from '../../lib/dataSourcesApi';
 
 interface ImportCSVModalProps {
   open: boolean;
@@ -71,6 +75,21 @@ export function ImportCSVModal({ open, onOpenChange, onImportSuccess }: ImportCS
       
       const response = await createDataSource(request);
       setSuccessMessage(response.message);
+
+      // The import runs in the background; wait for it to finish
+      if (response.job_id) {
+        const job = await waitForIngestionJob(response.job_id, progress => {
+          setSuccessMessage(`Importing... ${progress.rows.toLocaleString()} rows`);
+        });
+        if (job.status !== 'success') {
+          setSuccessMessage(null);
+          setError(job.error || `Import ${job.status}`);
+          // The source exists (with its error), so refresh the list anyway
+          onImportSuccess?.();
+          return;
+        }
+        setSuccessMessage(`Imported ${job.rows.toLocaleString()} rows`);
+      }
       
       // Reset form
       setName('');
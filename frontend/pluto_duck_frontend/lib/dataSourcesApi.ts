@@ -13,6 +13,7 @@ export interface DataSource {
   error_message: string | null;
   created_at: string;
   updated_at: string;
+  last_import_stages?: Record<string, any> | null;
 }
 
 export interface CreateDataSourceRequest {
@@ -29,12 +30,50 @@ export interface CreateDataSourceResponse {
   status: string;
   rows_imported: number | null;
   message: string;
+  job_id?: string | null;
 }
 
 export interface SyncResponse {
   status: string;
   rows_imported: number | null;
   message: string;
+  job_id?: string | null;
+}
+
+export type IngestionJobStatus = 'pending' | 'running' | 'success' | 'failed' | 'cancelled';
+
+export interface IngestionJob {
+  job_id: string;
+  source_id: string | null;
+  connector: string;
+  target_table: string;
+  status: IngestionJobStatus;
+  submitted_at: string;
+  started_at: string | null;
+  completed_at: string | null;
+  elapsed_seconds: number | null;
+  rows: number;
+  bytes: number;
+  batches: number;
+  result: Record<string, any> | null;
+  error: string | null;
+}
+
+const FINISHED_JOB_STATUSES: IngestionJobStatus[] = ['success', 'failed', 'cancelled'];
+
+export interface PreviewDataSourceRequest {
+  connector_type: string;
+  source_config: Record<string, any>;
+  limit?: number;
+  refresh?: boolean;
+}
+
+export interface PreviewDataSourceResponse {
+  connector_type: string;
+  columns: { name: string; type: string }[];
+  rows: Record<string, any>[];
+  elapsed_ms: number;
+  cached: boolean;
 }
 
 export async function fetchDataSources(): Promise<DataSource[]> {
@@ -66,6 +105,25 @@ export async function createDataSource(
   return response.json();
 }
 
+export async function previewDataSource(
+  request: PreviewDataSourceRequest
+): Promise<PreviewDataSourceResponse> {
+  const response = await fetch(`${getBackendUrl()}/api/v1/data-sources/preview`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(request),
+  });
+  
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.detail || `Failed to preview data source: ${response.status}`);
+  }
+  
+  return response.json();
+}
+
 export async function syncDataSource(sourceId: string): Promise<SyncResponse> {
   const response = await fetch(`${getBackendUrl()}/api/v1/data-sources/${sourceId}/sync`, {
     method: 'POST',
@@ -91,3 +149,29 @@ export async function deleteDataSource(sourceId: string, dropTable: boolean = fa
   }
 }
 
+export async function fetchIngestionJob(jobId: string): Promise<IngestionJob> {
+  const response = await fetch(`${getBackendUrl()}/api/v1/ingest/jobs/${jobId}`);
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.detail || `Failed to fetch import job: ${response.status}`);
+  }
+
+  return response.json();
+}
+
+/** Poll an import job until it succeeds, fails or is cancelled. */
+export async function waitForIngestionJob(
+  jobId: string,
+  onProgress?: (job: IngestionJob) => void,
+  intervalMs: number = 500
+): Promise<IngestionJob> {
+  while (true) {
+    const job = await fetchIngestionJob(jobId);
+    if (FINISHED_JOB_STATUSES.includes(job.status)) {
+      return job;
+    }
+    onProgress?.(job);
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+}
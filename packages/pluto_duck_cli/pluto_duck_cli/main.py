@@ -7,6 +7,7 @@ import sys
 import threading
 import time
 from pathlib import Path
+from typing import List, Optional
 
 import typer
 import uvicorn
@@ -15,6 +16,11 @@ from pluto_duck_backend import __version__
 from pluto_duck_backend.agent.core.orchestrator import get_agent_manager, run_agent_once
 from pluto_duck_backend.app.core.config import get_settings
 from pluto_duck_backend.app.services.ingestion import IngestionJob, IngestionService, get_registry
+from pluto_duck_backend.app.services.ingestion.benchmark import (
+    SHAPES,
+    parse_scale,
+    run_benchmarks,
+)
 from pluto_duck_backend.app.services.transformation import DbtService
 from pluto_duck_backend.app.services.execution import QueryExecutionManager, QueryJobStatus
 
@@ -140,6 +146,46 @@ def ingest(
     typer.echo(service.run(job))
 
 
+@app.command()
+def benchmark(
+    rows: str = typer.Option("10K", "--rows", help="Comma-separated scales, e.g. 10K,1M,100M"),
+    shape: str = typer.Option(",".join(SHAPES), "--shape", help="narrow and/or wide"),
+    connector: str = typer.Option(
+        None, "--connector", help="Comma-separated connectors to benchmark (default: all)"
+    ),
+    work_dir: str = typer.Option(
+        None, "--work-dir", help="Where datasets and scratch warehouses are kept"
+    ),
+    postgres_dsn: Optional[str] = typer.Option(
+        None,
+        "--postgres-dsn",
+        envvar="PLUTODUCK_BENCHMARK_POSTGRES_DSN",
+        help="Disposable local Postgres to benchmark against",
+    ),
+    output: str = typer.Option(None, "--output", help="Write the JSON report here"),
+) -> None:
+    """Benchmark ingestion throughput of every bundled connector path."""
+
+    settings = get_settings()
+    report = run_benchmarks(
+        Path(work_dir) if work_dir else settings.data_dir.runtime / "benchmarks",
+        scales=[parse_scale(value) for value in _split_list(rows)],
+        shapes=_split_list(shape),
+        connectors=_split_list(connector) or None,
+        postgres_dsn=postgres_dsn,
+    )
+    rendered = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(rendered, encoding="utf-8")
+        typer.echo(f"Benchmark report written to {output}")
+    else:
+        typer.echo(rendered)
+
+
+def _split_list(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
 @app.command()
 def query(sql: str = typer.Argument(..., help="SQL query to execute")) -> None:
     """Execute a SQL query."""